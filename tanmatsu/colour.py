@@ -0,0 +1,123 @@
+SYSTEM_COLOURS: list[tuple[int, int, int]] = [
+	(  0,   0,   0),  # black
+	(205,   0,   0),  # red
+	(  0, 205,   0),  # green
+	(205, 205,   0),  # yellow
+	(  0,   0, 238),  # blue
+	(205,   0, 205),  # magenta
+	(  0, 205, 205),  # cyan
+	(229, 229, 229),  # white
+	(127, 127, 127),  # bright black
+	(255,   0,   0),  # bright red
+	(  0, 255,   0),  # bright green
+	(255, 255,   0),  # bright yellow
+	( 92,  92, 255),  # bright blue
+	(255,   0, 255),  # bright magenta
+	(  0, 255, 255),  # bright cyan
+	(255, 255, 255),  # bright white
+]
+"""
+The 16 system colours, as rendered by xterm. Indices 0-7 are the normal
+colours, and indices 8-15 are their bright counterparts.
+"""
+
+CUBE_LEVELS: tuple[int, ...] = (0, 95, 135, 175, 215, 255)
+"""The intensity of each of the six steps of the xterm 6×6×6 colour cube."""
+
+
+def xterm_256_to_rgb(n: int) -> tuple[int, int, int]:
+	"""
+	Returns the 24 bit colour corresponding to entry `n` of the
+	xterm 256 colour palette.
+	
+	:raises ValueError: if `n` is outside the range 0-255.
+	"""
+	if n < 0 or n > 255:
+		raise ValueError(f"xterm_256_to_rgb(): {n} is not a valid palette index")
+	
+	# The 16 system colours
+	if n < 16:
+		return SYSTEM_COLOURS[n]
+	
+	# The 6×6×6 colour cube
+	if n < 232:
+		n -= 16
+		return (CUBE_LEVELS[n // 36], CUBE_LEVELS[(n // 6) % 6], CUBE_LEVELS[n % 6])
+	
+	# The 24 step greyscale ramp
+	grey = 8 + (n - 232) * 10
+	return (grey, grey, grey)
+
+
+XTERM_256: list[tuple[int, int, int]] = [ xterm_256_to_rgb(i) for i in range(0, 256) ]
+"""The xterm 256 colour palette, as 24 bit colours."""
+
+
+# For each intensity, the index of the nearest step of the colour cube. For
+#   each sum of the three channels of a colour, the index of the step of the
+#   greyscale ramp nearest to their mean.
+_CUBE_STEPS: list[int] = [
+	min(range(6), key=lambda i: abs(CUBE_LEVELS[i] - v)) for v in range(0, 256)
+]
+_GREY_STEPS: list[int] = [
+	min(range(24), key=lambda i: abs((8 + i * 10) * 3 - v)) for v in range(0, 256 * 3)
+]
+
+# Results of `nearest_xterm_256()` and `nearest_system()`.
+_nearest_xterm_256: dict[tuple[int, int, int], int] = { }
+_nearest_system: dict[tuple[int, int, int], int] = { }
+
+
+def _distance(a: tuple[int, int, int], b: tuple[int, int, int]) -> int:
+	return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+def nearest_xterm_256(c: tuple[int, int, int]) -> int:
+	"""
+	Returns the index of the entry of the xterm 256 colour palette nearest to
+	the 24 bit colour `c`.
+	
+	Only the colour cube and the greyscale ramp are considered, as many
+	terminals change the 16 system colours to suit their theme.
+	"""
+	try:
+		return _nearest_xterm_256[c]
+	except KeyError:
+		pass
+	
+	# The cube is the same along each axis, so the nearest colour in it is
+	#   made up of the nearest step for each channel. Likewise, the nearest
+	#   grey is the step nearest to the mean of the channels.
+	(r, g, b) = c
+	cube = 16 + _CUBE_STEPS[r] * 36 + _CUBE_STEPS[g] * 6 + _CUBE_STEPS[b]
+	grey = 232 + _GREY_STEPS[r + g + b]
+	
+	if _distance(XTERM_256[grey], c) < _distance(XTERM_256[cube], c):
+		n = grey
+	else:
+		n = cube
+	
+	if len(_nearest_xterm_256) >= 4096:
+		_nearest_xterm_256.clear()
+	
+	_nearest_xterm_256[c] = n
+	return n
+
+
+def nearest_system(c: tuple[int, int, int]) -> int:
+	"""
+	Returns the index of the system colour (see :data:`SYSTEM_COLOURS`) nearest
+	to the 24 bit colour `c`.
+	"""
+	try:
+		return _nearest_system[c]
+	except KeyError:
+		pass
+	
+	n = min(range(16), key=lambda i: _distance(SYSTEM_COLOURS[i], c))
+	
+	if len(_nearest_system) >= 4096:
+		_nearest_system.clear()
+	
+	_nearest_system[c] = n
+	return n
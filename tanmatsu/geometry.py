@@ -12,6 +12,8 @@ class Point():
 	:vartype y: int
 	"""
 	
+	__slots__ = ("x", "y")
+	
 	def __init__(self, x: int, y: int):
 		self.x = x
 		self.y = y
@@ -45,6 +47,8 @@ class Dimensions():
 	:vartype h: int
 	"""
 	
+	__slots__ = ("w", "h")
+	
 	def __init__(self, w: int, h: int):
 		self.w = w
 		self.h = h
@@ -120,12 +124,32 @@ class Rectangle():
 	:vartype h: int
 	"""
 	
+	__slots__ = ("x", "y", "w", "h")
+	
+	EMPTY: Rectangle
+	"""
+	The empty rectangle, returned by :meth:`__and__` when two rectangles
+	don't overlap. It is shared, so it can't be modified.
+	"""
+	
 	def __init__(self, x: int, y: int, w: int, h: int):
 		self.x = x
 		self.y = y
 		self.w = w
 		self.h = h
 	
+	def set(self, x: int, y: int, w: int, h: int):
+		"""Set the coordinates to `x`, `y`, and the dimensions to `w`, `h`."""
+		self.x = x
+		self.y = y
+		self.w = w
+		self.h = h
+	
+	@property
+	def is_empty(self) -> bool:
+		"""Whether the rectangle has no area (i.e., contains no points)."""
+		return self.w <= 0 or self.h <= 0
+	
 	@property
 	def x1(self):
 		"""Alias of `x`."""
@@ -158,6 +182,14 @@ class Rectangle():
 		return self.x <= other.x <= self.x2\
 		   and self.y <= other.y <= self.y2
 	
+	def contains_xy(self, x: int, y: int) -> bool:
+		"""
+		Whether this rectangle contains the point at `x`, `y`. The same as
+		:meth:`containsp`, without having to create a :class:`Point`.
+		"""
+		return self.x <= x < self.x + self.w\
+		   and self.y <= y < self.y + self.h
+	
 	def containsr(self, other: Rectangle) -> bool:
 		"""Whether this rectangle contains rectangle `other`."""
 		return self.x1 <= other.x1\
@@ -235,7 +267,7 @@ class Rectangle():
 		return self.w > other.w\
 		   and self.h > other.h
 	
-	def __gt__(self, other: Rectangle | Dimensions) -> bool:
+	def __ge__(self, other: Rectangle | Dimensions) -> bool:
 		"""
 		Whether this rectangle's width and height are both
 		greater than or equal to the width and height of object `other`.
@@ -243,22 +275,61 @@ class Rectangle():
 		return self.w >= other.w\
 		   and self.h >= other.h
 	
+	def intersect_into(self, other: Rectangle) -> Self:
+		"""
+		Shrinks this rectangle, in place, to its overlap with rectangle
+		`other`. If they don't overlap, this rectangle is left empty (see
+		:attr:`is_empty`).
+		
+		:return: This rectangle, for chaining.
+		"""
+		x1 = max(self.x, other.x)
+		y1 = max(self.y, other.y)
+		
+		x2 = min(self.x + self.w, other.x + other.w)
+		y2 = min(self.y + self.h, other.y + other.h)
+		
+		self.x = x1
+		self.y = y1
+		self.w = max(x2 - x1, 0)
+		self.h = max(y2 - y1, 0)
+		
+		return self
+	
 	def __and__(self, other: Rectangle) -> Rectangle:
 		"""
 		Returns the rectangle that represents the overlap
-		between this rectangle and rectangle `other`.
+		between this rectangle and rectangle `other`, or :attr:`EMPTY`
+		if there is none.
 		"""
-		x1 = max(self.x1, other.x1)
-		y1 = max(self.y1, other.y1)
+		x1 = max(self.x, other.x)
+		y1 = max(self.y, other.y)
 		
-		x2 = min(self.x2, other.x2)
-		y2 = min(self.y2, other.y2)
+		x2 = min(self.x + self.w, other.x + other.w)
+		y2 = min(self.y + self.h, other.y + other.h)
 		
-		w = x2 - x1 + 1
-		h = y2 - y1 + 1
+		if x2 <= x1 or y2 <= y1:
+			return Rectangle.EMPTY
 		
-		return Rectangle(x1, y1, w, h)
+		return Rectangle(x1, y1, x2 - x1, y2 - y1)
 	
 	def __str__(self) -> str:
 		"""Returns a string representation of the rectangle."""
 		return f"Rectangle: {self.w}w by {self.h}h at {self.x}x, {self.y}y"
+
+
+class _EmptyRectangle(Rectangle):
+	__slots__ = ()
+	
+	def __init__(self):
+		for i in Rectangle.__slots__:
+			object.__setattr__(self, i, 0)
+	
+	def __setattr__(self, name: str, value):
+		raise AttributeError("Rectangle.EMPTY can't be modified")
+	
+	def intersect_into(self, other: Rectangle) -> Rectangle:
+		return self
+
+
+Rectangle.EMPTY = _EmptyRectangle()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from typing import Any
+
+from tanmatsu.geometry import Rectangle
+
+
+class HitIndex:
+	"""
+	An index of the rectangles drawn to the screen during one frame, for
+	finding which widgets are under a point (e.g., the mouse).
+	
+	Rectangles are added in drawing order, so rectangles added later are on
+	top of (i.e., deeper in the widget tree than) rectangles added earlier.
+	
+	The index is stored as a centered interval tree over the `x` extent of each
+	rectangle, with each node holding an interval tree over the `y` extent of
+	its rectangles. It is built on the first lookup after a rectangle is
+	added. Looking up a point then takes O(log² n + k) time, where `k` is the
+	number of rectangles containing the point (i.e., roughly the depth of the
+	widget tree).
+	"""
+	
+	def __init__(self):
+		self.__rectangles = []
+		self.__tree = None
+	
+	def add(self, rectangle: Rectangle, item: Any):
+		"""
+		Add `item` (e.g., a widget), occupying `rectangle`, on top of every
+		item added so far. Empty rectangles are ignored.
+		"""
+		if rectangle.is_empty:
+			return
+		
+		self.__rectangles.append((
+			rectangle.x, rectangle.x + rectangle.w - 1,
+			rectangle.y, rectangle.y + rectangle.h - 1,
+			len(self.__rectangles), item,
+		))
+		self.__tree = None
+	
+	def clear(self):
+		"""Remove every item."""
+		self.__rectangles = []
+		self.__tree = None
+	
+	def __len__(self) -> int:
+		return len(self.__rectangles)
+	
+	def entries(self, start: int = 0) -> list[tuple[Rectangle, Any]]:
+		"""
+		Returns the `(rectangle, item)` pairs added so far, in the order they
+		were added, skipping the first `start`. Adding them again (e.g., in
+		a later frame) reproduces them.
+		"""
+		return [
+			(Rectangle(x1, y1, x2 - x1 + 1, y2 - y1 + 1), item)
+			for (x1, x2, y1, y2, _, item) in self.__rectangles[start:]
+		]
+	
+	def items_at(self, x: int, y: int) -> list[Any]:
+		"""
+		Returns every item whose rectangle contains the point at `x`, `y`,
+		from the bottom-most (e.g., the root widget) to the top-most (e.g., the
+		deepest widget).
+		"""
+		if self.__tree is None:
+			self.__tree = _build(self.__rectangles, 0)
+		
+		hits = []
+		node = self.__tree
+		
+		# Walk down the tree over `x`. The rectangles at each node span its
+		#   center, so only their `y` extent (in the node's inner tree)
+		#   needs searching, before checking their `x` extent.
+		while node is not None:
+			(center, inner, left, right) = node
+			
+			for r in _query(inner, 2, y):
+				if r[0] <= x <= r[1]:
+					hits.append(r)
+			
+			node = left if x < center else right
+		
+		hits.sort(key=lambda r: r[4])
+		return [ r[5] for r in hits ]
+	
+	def item_at(self, x: int, y: int) -> Any | None:
+		"""
+		Returns the top-most item whose rectangle contains the point at `x`,
+		`y`, or `None` if there isn't one.
+		"""
+		items = self.items_at(x, y)
+		return items[-1] if items else None
+
+
+# The rectangles are `(x1, x2, y1, y2, z, item)` tuples, so the extent of
+#   a rectangle along an axis starts at index `lo` (0 for `x`, 2 for `y`) and
+#   ends at index `lo + 1`.
+
+
+# Builds a centered interval tree over the extent of `rectangles` starting
+#   at index `lo`, as nested `(center, inner, left, right)` tuples.
+# 
+# Each node holds the rectangles spanning its `center`. Rectangles entirely
+#   before `center` go to the `left` subtree, and rectangles entirely after
+#   it to the `right` one. Picking the median start as the center keeps the
+#   tree balanced.
+# 
+# Along `x` (`lo == 0`), `inner` is a tree along `y` of the rectangles at
+#   the node. Along `y`, `inner` is a `(by_start, by_end)` tuple of the
+#   rectangles at the node, sorted by their start, and by their end
+#   (descending).
+def _build(rectangles: list[tuple], lo: int) -> tuple | None:
+	if not rectangles:
+		return None
+	
+	starts = sorted(r[lo] for r in rectangles)
+	center = starts[len(starts) // 2]
+	
+	here = []
+	left = []
+	right = []
+	
+	for r in rectangles:
+		if r[lo + 1] < center:
+			left.append(r)
+		elif r[lo] > center:
+			right.append(r)
+		else:
+			here.append(r)
+	
+	if lo == 0:
+		inner = _build(here, 2)
+	else:
+		inner = (
+			sorted(here, key=lambda r: r[lo]),
+			sorted(here, key=lambda r: r[lo + 1], reverse=True),
+		)
+	
+	return (center, inner, _build(left, lo), _build(right, lo))
+
+
+# Yields the rectangles in a tree built by `_build(..., lo)` (with `lo` not
+#   0) whose extent contains `v`.
+def _query(node: tuple | None, lo: int, v: int):
+	while node is not None:
+		(center, (by_start, by_end), left, right) = node
+		
+		# Every rectangle here spans `center`. If `v` is before `center`,
+		#   only the ones starting at or before `v` contain it, and they come
+		#   first in `by_start`. Likewise for `v` after `center`, and `by_end`.
+		if v < center:
+			for r in by_start:
+				if r[lo] > v:
+					break
+				yield r
+			
+			node = left
+		else:
+			for r in by_end:
+				if r[lo + 1] < v:
+					break
+				yield r
+			
+			node = right
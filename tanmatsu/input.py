@@ -26,6 +26,9 @@ class Mouse_button(Enum):
 	MMB = auto()
 	RMB = auto()
 	
+	NONE = auto()
+	"""No button. Only reported when the mouse moves (see :class:`Mouse_motion`)."""
+	
 	SCROLL_UP    = auto()
 	SCROLL_DOWN  = auto()
 	SCROLL_LEFT  = auto()
@@ -36,6 +39,7 @@ mouse_button_lookup = {
 	0: Mouse_button.LMB,
 	1: Mouse_button.MMB,
 	2: Mouse_button.RMB,
+	3: Mouse_button.NONE,
 	
 	64: Mouse_button.SCROLL_UP,
 	65: Mouse_button.SCROLL_DOWN,
@@ -62,6 +66,22 @@ class Mouse_state(Enum):
 	
 	PRESSED  = auto()
 	RELEASED = auto()
+	
+	MOVED = auto()
+	"""The mouse moved (see :class:`Mouse_motion`), with `button` held."""
+
+
+class Mouse_motion(Enum):
+	"""Which mouse movements the terminal reports."""
+	
+	NONE = auto()
+	"""Report only button presses and releases."""
+	
+	DRAG = auto()
+	"""Also report movement while a button is held (e.g., for dragging)."""
+	
+	ANY = auto()
+	"""Also report all movement, with or without a button held (e.g., for hover)."""
 
 
 @generate
@@ -78,10 +98,16 @@ def mouse_sequence():
 	released = string(b"m").result(Mouse_state.RELEASED)
 	
 	button = mouse_button_lookup[raw_code & 0b1000011]  # peek at bits 1, 2, and 7
-	modifier_bitmask = raw_code & 0b0111100  # peek at the remaining bits
+	modifier_bitmask = raw_code & 0b0011100  # peek at bits 3, 4, and 5
+	motion = raw_code & 0b0100000  # peek at bit 6
 	
 	state = yield pressed | released
-	position = Point(x, y)
+	
+	if motion:
+		state = Mouse_state.MOVED
+	
+	# The terminal counts from 1, but the screenbuffer counts from 0
+	position = Point(x - 1, y - 1)
 	return (Event_type.MOUSE, (button, modifier_bitmask, state, position))
 
 
@@ -377,6 +403,33 @@ mouse_t    = tuple[Mouse_button, Mouse_state, Point]
 keyboard_t = tuple[Keyboard_key | str, Keyboard_modifier]
 
 
+def coalesce_mouse_motion(
+	events: list[tuple[Event_type, mouse_t | keyboard_t]]
+) -> list[tuple[Event_type, mouse_t | keyboard_t]]:
+	"""
+	Collapses each run of consecutive mouse motion events (with the same
+	button and modifiers) into the last event of the run, as only the latest
+	position matters. That way, a fast mouse movement costs one event (and one
+	redraw), rather than one for every cell the mouse passed over.
+	"""
+	result = []
+	
+	for event in events:
+		(event_type, data) = event
+		
+		if (
+			event_type == Event_type.MOUSE and data[2] == Mouse_state.MOVED and
+			result and result[-1][0] == Event_type.MOUSE and
+			result[-1][1][2] == Mouse_state.MOVED and
+			result[-1][1][:2] == data[:2]
+		):
+			result[-1] = event
+		else:
+			result.append(event)
+	
+	return result
+
+
 def parse_input(input: bytes) -> list[tuple[Event_type, mouse_t | keyboard_t]]:
 	parser = mouse_sequence \
 		| key_sequence \
@@ -0,0 +1,474 @@
+import bisect
+import contextlib
+from typing import Any, Callable, Iterable, Iterator
+
+
+class ListModel:
+	"""
+	A list of data items that notifies its subscribers whenever it changes,
+	so that widgets displaying it (e.g., :class:`tanmatsu.widgets.ModelList`)
+	can update incrementally instead of starting over.
+	
+	:param items: The initial items.
+	:paramtype items: Iterable[Any]
+	
+	Subscribers must provide the following methods:
+	
+	- `items_inserted(index, count)`: `count` items were inserted at `index`.
+	- `items_removed(index, count)`: `count` items were removed from `index`.
+	- `items_changed(index, count)`: the `count` items starting at `index`
+	  were replaced.
+	- `item_moved(old_index, new_index)`: the item at `old_index` was moved,
+	  and is now at `new_index`.
+	- `model_reset()`: the contents of the model changed completely.
+	"""
+	
+	def __init__(self, items: Iterable[Any] = ()):
+		self._items = list(items)
+		self.__subscribers = []
+	
+	def subscribe(self, subscriber: Any):
+		"""Start notifying `subscriber` of changes to the model."""
+		self.__subscribers.append(subscriber)
+	
+	def unsubscribe(self, subscriber: Any):
+		"""
+		Stop notifying `subscriber` of changes to the model.
+		
+		:raises ValueError: if `subscriber` is not subscribed to the model.
+		"""
+		self.__subscribers.remove(subscriber)
+	
+	# Notifications
+	# ‾‾‾‾‾‾‾‾‾‾‾‾‾
+	
+	def _notify_inserted(self, index: int, count: int):
+		for i in self.__subscribers:
+			i.items_inserted(index, count)
+	
+	def _notify_removed(self, index: int, count: int):
+		for i in self.__subscribers:
+			i.items_removed(index, count)
+	
+	def _notify_changed(self, index: int, count: int):
+		for i in self.__subscribers:
+			i.items_changed(index, count)
+	
+	def _notify_moved(self, old_index: int, new_index: int):
+		for i in self.__subscribers:
+			i.item_moved(old_index, new_index)
+	
+	def _notify_reset(self):
+		for i in self.__subscribers:
+			i.model_reset()
+	
+	# Sequence
+	# ‾‾‾‾‾‾‾‾
+	
+	def __len__(self) -> int:
+		return len(self._items)
+	
+	def __getitem__(self, index: int) -> Any:
+		return self._items[index]
+	
+	def __iter__(self) -> Iterator[Any]:
+		return iter(self._items)
+	
+	# Mutation
+	# ‾‾‾‾‾‾‾‾
+	
+	def __normalise_index(self, index: int, length: int) -> int:
+		if index < 0:
+			index += length
+		
+		if index < 0 or index >= length:
+			raise IndexError("ListModel index out of range")
+		
+		return index
+	
+	def __setitem__(self, index: int, item: Any):
+		index = self.__normalise_index(index, len(self._items))
+		self._items[index] = item
+		self._notify_changed(index, 1)
+	
+	def __delitem__(self, index: int):
+		index = self.__normalise_index(index, len(self._items))
+		del self._items[index]
+		self._notify_removed(index, 1)
+	
+	def insert(self, index: int, item: Any):
+		"""Insert `item` before `index`, like :meth:`list.insert`."""
+		index = min(max(index + len(self._items) if index < 0 else index, 0), len(self._items))
+		self._items.insert(index, item)
+		self._notify_inserted(index, 1)
+	
+	def append(self, item: Any):
+		"""Append `item` to the end of the model."""
+		self._items.append(item)
+		self._notify_inserted(len(self._items) - 1, 1)
+	
+	def extend(self, items: Iterable[Any]):
+		"""Append all of `items` to the end of the model."""
+		index = len(self._items)
+		self._items.extend(items)
+		
+		if len(self._items) > index:
+			self._notify_inserted(index, len(self._items) - index)
+	
+	def pop(self, index: int = -1) -> Any:
+		"""Remove and return the item at `index` (the last item by default)."""
+		index = self.__normalise_index(index, len(self._items))
+		item = self._items.pop(index)
+		self._notify_removed(index, 1)
+		return item
+	
+	def remove_range(self, index: int, count: int):
+		"""Remove the `count` items starting at `index`."""
+		count = min(count, len(self._items) - index)
+		
+		if count <= 0:
+			return
+		
+		del self._items[index:index + count]
+		self._notify_removed(index, count)
+	
+	def clear(self):
+		"""Remove all items."""
+		self.reset([])
+	
+	def reset(self, items: Iterable[Any]):
+		"""Replace the contents of the model with `items`."""
+		self._items = list(items)
+		self._notify_reset()
+
+
+class SortedListModel(ListModel):
+	"""
+	A :class:`ListModel` that keeps its items sorted by a key, and only
+	exposes the items that pass a filter.
+	
+	Adding, removing, or updating an item finds its position with a binary
+	search and notifies subscribers of just that one insertion, removal, or
+	change, so keeping a large model up to date costs O(changes · log n),
+	rather than a full re-sort.
+	
+	Items are tracked by identity, so an item that has been mutated must be
+	passed to :meth:`update` as the same object. Items with equal keys are
+	kept in the order they were added.
+	
+	:param items: The initial items.
+	:paramtype items: Iterable[Any]
+	
+	:param key: Returns the key to sort an item by. Defaults to the item itself.
+	:paramtype key: Callable[[Any], Any] | None
+	
+	:param predicate: Returns whether an item should be exposed. Defaults to
+	                  exposing every item.
+	:paramtype predicate: Callable[[Any], bool] | None
+	"""
+	
+	def __init__(
+		self,
+		items: Iterable[Any] = (),
+		key: Callable[[Any], Any] | None = None,
+		predicate: Callable[[Any], bool] | None = None,
+	):
+		super().__init__()
+		
+		self.__key = key
+		self.__predicate = predicate
+		
+		# `id(item)` -> [item, (sort key, sequence number), exposed]
+		# 
+		# Holds every item, exposed or not. The sequence number breaks ties
+		#   between equal sort keys, so that every item has a unique position.
+		self.__entries = { }
+		self.__sequence = 0
+		
+		# The (sort key, sequence number) of every exposed item, in the same
+		#   order as `self._items`. This is what we binary search.
+		self.__keys = []
+		
+		# Notifications held back by `batch()`.
+		self.__batch_depth = 0
+		self.__batched = []
+		
+		for i in items:
+			self.__track(i)
+		
+		self.__rebuild()
+	
+	@property
+	def key(self) -> Callable[[Any], Any] | None:
+		"""
+		:getter: Get the sort key function.
+		:setter: Set the sort key function. Re-sorts the whole model.
+		"""
+		return self.__key
+	
+	@key.setter
+	def key(self, key: Callable[[Any], Any] | None):
+		self.__key = key
+		
+		for entry in self.__entries.values():
+			entry[1] = (self.__sort_key(entry[0]), entry[1][1])
+		
+		self.__rebuild()
+		self._notify_reset()
+	
+	@property
+	def predicate(self) -> Callable[[Any], bool] | None:
+		"""
+		:getter: Get the filter predicate.
+		:setter: Set the filter predicate. Re-filters the whole model.
+		"""
+		return self.__predicate
+	
+	@predicate.setter
+	def predicate(self, predicate: Callable[[Any], bool] | None):
+		self.__predicate = predicate
+		self.__rebuild()
+		self._notify_reset()
+	
+	def __sort_key(self, item: Any) -> Any:
+		return item if self.__key is None else self.__key(item)
+	
+	def __exposed(self, item: Any) -> bool:
+		return self.__predicate is None or bool(self.__predicate(item))
+	
+	def __track(self, item: Any) -> list:
+		if id(item) in self.__entries:
+			raise ValueError("SortedListModel: item has already been added")
+		
+		entry = [item, (self.__sort_key(item), self.__sequence), False]
+		self.__entries[id(item)] = entry
+		self.__sequence += 1
+		
+		return entry
+	
+	# Rebuild the exposed items from scratch. Only used when everything has
+	#   to change anyway (i.e., a new key or predicate).
+	def __rebuild(self):
+		exposed = []
+		
+		for entry in self.__entries.values():
+			entry[2] = self.__exposed(entry[0])
+			if entry[2]:
+				exposed.append(entry)
+		
+		exposed.sort(key=lambda entry: entry[1])
+		
+		self.__keys = [ entry[1] for entry in exposed ]
+		self._items = [ entry[0] for entry in exposed ]
+	
+	# Notifications
+	# ‾‾‾‾‾‾‾‾‾‾‾‾‾
+	
+	def _notify_inserted(self, index: int, count: int):
+		if self.__batch_depth > 0:
+			self.__batched.append((super()._notify_inserted, index, count))
+		else:
+			super()._notify_inserted(index, count)
+	
+	def _notify_removed(self, index: int, count: int):
+		if self.__batch_depth > 0:
+			self.__batched.append((super()._notify_removed, index, count))
+		else:
+			super()._notify_removed(index, count)
+	
+	def _notify_changed(self, index: int, count: int):
+		if self.__batch_depth > 0:
+			self.__batched.append((super()._notify_changed, index, count))
+		else:
+			super()._notify_changed(index, count)
+	
+	def _notify_moved(self, old_index: int, new_index: int):
+		if self.__batch_depth > 0:
+			self.__batched.append((super()._notify_moved, old_index, new_index))
+		else:
+			super()._notify_moved(old_index, new_index)
+	
+	def _notify_reset(self):
+		if self.__batch_depth > 0:
+			self.__batched.append((super()._notify_reset,))
+		else:
+			super()._notify_reset()
+	
+	@contextlib.contextmanager
+	def batch(self):
+		"""
+		Context manager that holds back change notifications until the end of
+		the block. If the block changed a large part of the model, subscribers
+		are sent a single reset instead of one notification per change.
+		
+		For example:
+		
+		.. code-block:: python
+		   
+		   with model.batch():
+		       for process in changed_processes:
+		           model.update(process)
+		"""
+		self.__batch_depth += 1
+		
+		try:
+			yield self
+		finally:
+			self.__batch_depth -= 1
+			
+			if self.__batch_depth == 0:
+				(batched, self.__batched) = (self.__batched, [])
+				reset = super()._notify_reset
+				
+				# Notifications after a reset would be relative to the model
+				#   as it was at the reset, which subscribers never get to see.
+				if (
+					len(batched) > max(len(self._items) // 4, 16)
+					or any(notify == reset for (notify, *_) in batched)
+				):
+					reset()
+				else:
+					for (notify, *args) in batched:
+						notify(*args)
+	
+	# Mutation
+	# ‾‾‾‾‾‾‾‾
+	
+	def __insert_exposed(self, entry: list):
+		index = bisect.bisect_left(self.__keys, entry[1])
+		
+		self.__keys.insert(index, entry[1])
+		self._items.insert(index, entry[0])
+		self._notify_inserted(index, 1)
+	
+	def __remove_exposed(self, entry: list):
+		index = bisect.bisect_left(self.__keys, entry[1])
+		
+		del self.__keys[index]
+		del self._items[index]
+		self._notify_removed(index, 1)
+	
+	def add(self, item: Any):
+		"""
+		Add `item` to the model, at the position given by its sort key.
+		
+		:raises ValueError: if `item` has already been added.
+		"""
+		entry = self.__track(item)
+		entry[2] = self.__exposed(item)
+		
+		if entry[2]:
+			self.__insert_exposed(entry)
+	
+	def remove(self, item: Any):
+		"""
+		Remove `item` from the model.
+		
+		:raises ValueError: if `item` is not in the model.
+		"""
+		try:
+			entry = self.__entries.pop(id(item))
+		except KeyError:
+			raise ValueError("SortedListModel.remove(): item not in model") from None
+		
+		if entry[2]:
+			self.__remove_exposed(entry)
+	
+	def update(self, item: Any):
+		"""
+		Re-sort and re-filter `item` after it has been changed.
+		
+		:raises ValueError: if `item` is not in the model.
+		"""
+		try:
+			entry = self.__entries[id(item)]
+		except KeyError:
+			raise ValueError("SortedListModel.update(): item not in model") from None
+		
+		new_key = (self.__sort_key(item), entry[1][1])
+		exposed = self.__exposed(item)
+		
+		if not entry[2]:
+			entry[1] = new_key
+			entry[2] = exposed
+			
+			if exposed:
+				self.__insert_exposed(entry)
+			return
+		
+		index = bisect.bisect_left(self.__keys, entry[1])
+		
+		# Still exposed, and still sorted between its neighbours? Then the item
+		#   only needs to be redrawn.
+		if (
+			exposed
+			and (index == 0                     or self.__keys[index - 1] < new_key)
+			and (index == len(self.__keys) - 1 or new_key < self.__keys[index + 1])
+		):
+			entry[1] = new_key
+			self.__keys[index] = new_key
+			self._notify_changed(index, 1)
+			return
+		
+		del self.__keys[index]
+		del self._items[index]
+		
+		entry[1] = new_key
+		entry[2] = exposed
+		
+		if not exposed:
+			self._notify_removed(index, 1)
+			return
+		
+		# Moved as a single notification, so that subscribers can tell it's
+		#   the same item (e.g., to keep a cursor on it).
+		new_index = bisect.bisect_left(self.__keys, new_key)
+		
+		self.__keys.insert(new_index, new_key)
+		self._items.insert(new_index, item)
+		self._notify_moved(index, new_index)
+	
+	def __contains__(self, item: Any) -> bool:
+		"""Whether `item` is in the model (exposed or not)."""
+		return id(item) in self.__entries
+	
+	def __setitem__(self, index: int, item: Any):
+		raise TypeError("SortedListModel: items are positioned by their key; use add() instead")
+	
+	def insert(self, index: int, item: Any):
+		raise TypeError("SortedListModel: items are positioned by their key; use add() instead")
+	
+	def __delitem__(self, index: int):
+		self.remove(self._items[index])
+	
+	def append(self, item: Any):
+		"""Same as :meth:`add`."""
+		self.add(item)
+	
+	def extend(self, items: Iterable[Any]):
+		"""Add all of `items`, in a single :meth:`batch`."""
+		with self.batch():
+			for i in items:
+				self.add(i)
+	
+	def pop(self, index: int = -1) -> Any:
+		"""Remove and return the exposed item at `index` (the last by default)."""
+		item = self._items[index]
+		self.remove(item)
+		return item
+	
+	def remove_range(self, index: int, count: int):
+		"""Remove the `count` exposed items starting at `index`."""
+		with self.batch():
+			for item in self._items[index:index + count]:
+				self.remove(item)
+	
+	def reset(self, items: Iterable[Any]):
+		"""Replace every item in the model (exposed or not) with `items`."""
+		self.__entries = { }
+		
+		for i in items:
+			self.__track(i)
+		
+		self.__rebuild()
+		self._notify_reset()
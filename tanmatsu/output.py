@@ -1,5 +1,11 @@
+from __future__ import annotations
+
 import os
 import sys
+from enum import Enum
+from typing import Mapping
+
+from tanmatsu.colour import nearest_system, nearest_xterm_256
 
 # Otherwise known as:
 #     ESC
@@ -13,6 +19,110 @@ LOW  = b"l"
 """The low signal. Used to turn a mode off."""
 
 
+# ==============================================================================
+# Output Profile
+# ==============================================================================
+
+class ColourDepth(Enum):
+	"""The colours a terminal can display."""
+	
+	TRUECOLOUR = 0
+	"""Any 24 bit colour."""
+	
+	XTERM_256 = 1
+	"""The xterm 256 colour palette (see :data:`tanmatsu.colour.XTERM_256`)."""
+	
+	SYSTEM = 2
+	"""The 16 system colours (see :data:`tanmatsu.colour.SYSTEM_COLOURS`)."""
+
+
+class OutputProfile:
+	"""
+	The optional escape codes a terminal supports, which
+	:meth:`tanmatsu.Screenbuffer.render` may use to output fewer bytes.
+	
+	:param colour_depth: The colours the terminal can display. Colours are
+	                     output as the nearest colour the terminal can display.
+	                     As well as looking right on terminals that can't
+	                     display 24 bit colours, this makes the output shorter.
+	:paramtype colour_depth: ColourDepth
+	
+	:param repeat: Whether runs of the same character may be written with REP
+	               (:func:`str_repeat`).
+	:paramtype repeat: bool
+	
+	:param synchronized_output: Whether frames may be bracketed with
+	                            synchronized output mode
+	                            (:func:`str_mode_synchronized_output`), so that
+	                            the terminal shows them all at once.
+	:paramtype synchronized_output: bool
+	
+	:param erase: Whether runs of spaces may be written by erasing them with
+	              ECH/EL (:func:`str_erase_characters`/:func:`str_erase_line`).
+	              Erased characters must take on the background colour that
+	              is set at the time (known as "background colour erase").
+	:paramtype erase: bool
+	"""
+	
+	def __init__(
+		self,
+		colour_depth: ColourDepth = ColourDepth.TRUECOLOUR,
+		repeat: bool = False,
+		erase: bool = False,
+		synchronized_output: bool = False,
+	):
+		self.colour_depth = colour_depth
+		self.repeat = repeat
+		self.erase = erase
+		self.synchronized_output = synchronized_output
+	
+	@staticmethod
+	def detect(environ: Mapping[str, str] | None = None) -> OutputProfile:
+		"""
+		Returns the profile of the terminal described by the environment
+		variables `environ` (defaulting to :data:`os.environ`).
+		
+		The colour depth comes from `COLORTERM` (`truecolor` or `24bit` for
+		24 bit colours), or else from `TERM` (e.g., `xterm-256color` for the
+		xterm 256 colour palette, and `xterm-direct` for 24 bit colours).
+		
+		Everything else, apart from synchronized output (which can only be
+		detected by asking the terminal), comes from the terminfo entry named
+		by `TERM`. Capabilities that can't be looked up are assumed to be
+		unsupported.
+		"""
+		if environ is None:
+			environ = os.environ
+		
+		term = environ.get("TERM", "")
+		profile = OutputProfile()
+		
+		try:
+			import curses
+			
+			curses.setupterm(term or None, sys.stdout.fileno())
+		except Exception:
+			colours = 0
+		else:
+			colours = curses.tigetnum("colors")
+			
+			profile.repeat = curses.tigetstr("rep") is not None
+			profile.erase = (
+				curses.tigetstr("ech") is not None and
+				curses.tigetstr("el") is not None and
+				curses.tigetflag("bce") == 1
+			)
+		
+		if environ.get("COLORTERM") in ("truecolor", "24bit") or term.endswith("-direct"):
+			profile.colour_depth = ColourDepth.TRUECOLOUR
+		elif "256color" in term or colours >= 256:
+			profile.colour_depth = ColourDepth.XTERM_256
+		else:
+			profile.colour_depth = ColourDepth.SYSTEM
+		
+		return profile
+
+
 # ==============================================================================
 # General Output
 # ==============================================================================
@@ -24,25 +134,139 @@ def write(s: str):
 
 def write_bytes(b: bytes):
 	"""Write the given bytes to stdout."""
-	os.write(sys.stdout.fileno(), b)
+	# `os.write` may write less than it was given (e.g., a whole frame at
+	#   once to a slow terminal), so keep going until everything is written.
+	b = memoryview(b)
+	
+	while b:
+		b = b[os.write(sys.stdout.fileno(), b):]
 
 
 # ==============================================================================
 # Cursor Positioning
 # ==============================================================================
 
-def set_position(x: int, y: int):
-	"""
-	Set the cursor position to (`x`, `y`). Output from :func:`write`/
-	:func:`write_bytes` is produced from the cursor position.
-	"""
+def str_position(x: int, y: int) -> bytes:
+	"""Returns the escape code for setting the cursor position to (`x`, `y`)."""
 	
 	# Legacy nonsense: cursor control is 1-normalised instead of 0-normalised,
 	# so adjust for that here rather than ruining the rest of the code.
 	# 
 	# Even more legacy nonsense: the column and row parameters are the
 	# wrong way round(!).
-	write_bytes(ESCAPE + b'[%d;%dH' % (y + 1, x + 1))
+	# 
+	# Omitted parameters default to 1, i.e., the first column.
+	if x == 0:
+		return ESCAPE + b'[%dH' % (y + 1)
+	
+	return ESCAPE + b'[%d;%dH' % (y + 1, x + 1)
+
+
+def set_position(x: int, y: int):
+	"""
+	Set the cursor position to (`x`, `y`). Output from :func:`write`/
+	:func:`write_bytes` is produced from the cursor position.
+	"""
+	write_bytes(str_position(x, y))
+
+
+def str_column(x: int) -> bytes:
+	"""
+	Returns the escape code for moving the cursor to column `x`, on the same
+	row.
+	
+	See: https://terminalguide.namepad.de/seq/csi_cg/
+	"""
+	if x == 0:
+		return ESCAPE + b'[G'
+	
+	return ESCAPE + b'[%dG' % (x + 1)
+
+
+def str_cursor_up(n: int) -> bytes:
+	"""
+	Returns the escape code for moving the cursor up by `n` rows.
+	
+	See: https://terminalguide.namepad.de/seq/csi_ca/
+	"""
+	return _str_cursor_relative(n, b'A')
+
+
+def str_cursor_down(n: int) -> bytes:
+	"""
+	Returns the escape code for moving the cursor down by `n` rows.
+	
+	See: https://terminalguide.namepad.de/seq/csi_cb/
+	"""
+	return _str_cursor_relative(n, b'B')
+
+
+def str_cursor_forward(n: int) -> bytes:
+	"""
+	Returns the escape code for moving the cursor right by `n` columns.
+	
+	See: https://terminalguide.namepad.de/seq/csi_cc/
+	"""
+	return _str_cursor_relative(n, b'C')
+
+
+def str_cursor_back(n: int) -> bytes:
+	"""
+	Returns the escape code for moving the cursor left by `n` columns.
+	
+	See: https://terminalguide.namepad.de/seq/csi_cd/
+	"""
+	return _str_cursor_relative(n, b'D')
+
+
+def _str_cursor_relative(n: int, final: bytes) -> bytes:
+	# An omitted parameter defaults to 1.
+	if n == 1:
+		return ESCAPE + b'[' + final
+	
+	return ESCAPE + b'[%d' % n + final
+
+
+# ==============================================================================
+# Scrolling
+# ==============================================================================
+
+def str_scroll_region(top: int, bottom: int) -> bytes:
+	"""
+	Returns the escape code for limiting scrolling to the rows from `top` to
+	`bottom` (inclusive). Also moves the cursor to the top left of the screen.
+	
+	See: https://terminalguide.namepad.de/seq/csi_sr/
+	"""
+	return ESCAPE + b'[%d;%dr' % (top + 1, bottom + 1)
+
+
+def str_reset_scroll_region() -> bytes:
+	"""
+	Returns the escape code for letting the whole screen scroll again. Also
+	moves the cursor to the top left of the screen.
+	"""
+	return ESCAPE + b'[r'
+
+
+def str_scroll_up(n: int) -> bytes:
+	"""
+	Returns the escape code for scrolling the contents of the scroll region up
+	by `n` rows, leaving `n` blank rows at the bottom.
+	
+	See: https://terminalguide.namepad.de/seq/csi_cs/
+	"""
+	return ESCAPE + b'[%dS' % n
+
+
+def str_scroll_down(n: int) -> bytes:
+	"""
+	Returns the escape code for scrolling the contents of the scroll region
+	down by `n` rows, leaving `n` blank rows at the top.
+	
+	See: https://terminalguide.namepad.de/seq/csi_ct_1param/
+	"""
+	return ESCAPE + b'[%dT' % n
 
 
 # ==============================================================================
@@ -54,16 +278,129 @@ def clear_screen():
 	write_bytes(ESCAPE + b'[2J')
 
 
+def str_erase_characters(n: int) -> bytes:
+	"""
+	Returns the escape code for erasing the `n` characters starting at the
+	cursor, without moving the cursor.
+	
+	See: https://terminalguide.namepad.de/seq/csi_cx/
+	"""
+	return _str_cursor_relative(n, b'X')
+
+
+def str_erase_line() -> bytes:
+	"""
+	Returns the escape code for erasing the characters from the cursor to the
+	end of the row, without moving the cursor.
+	
+	See: https://terminalguide.namepad.de/seq/csi_ck/
+	"""
+	return ESCAPE + b'[K'
+
+
+# ==============================================================================
+# Repeating Characters
+# ==============================================================================
+
+def str_repeat(n: int) -> bytes:
+	"""
+	Returns the escape code for writing the character that was just written
+	another `n` times.
+	
+	See: https://terminalguide.namepad.de/seq/csi_b/
+	"""
+	return _str_cursor_relative(n, b'b')
+
+
+# ==============================================================================
+# Select Graphic Rendition
+# ==============================================================================
+
+# The format codes below (colours, text attributes) are all SGR sequences. Their
+#   parameters can be combined into a single sequence with :func:`str_sgr`.
+
+SGR_RESET = b'0'
+"""The SGR parameter for resetting every colour and text attribute."""
+
+
+def str_sgr(parameters: list[bytes]) -> bytes:
+	"""
+	Returns the format code that applies all of the SGR `parameters` (e.g.,
+	from :func:`sgr_bold`), in order.
+	"""
+	return ESCAPE + b'[' + b';'.join(parameters) + b'm'
+
+
 # ==============================================================================
 # Text Colours
 # ==============================================================================
 
+def sgr_foreground_colour(c: tuple[int, int, int], depth: ColourDepth) -> bytes:
+	"""
+	Returns the SGR parameter for setting the foreground colour to the colour
+	nearest to the 24 bit colour `c` that can be displayed at `depth`.
+	"""
+	match depth:
+		case ColourDepth.TRUECOLOUR:
+			return sgr_foreground_colour_24bit(c)
+		case ColourDepth.XTERM_256:
+			return sgr_foreground_colour_8bit(nearest_xterm_256(c))
+		case ColourDepth.SYSTEM:
+			return sgr_foreground_colour_4bit(nearest_system(c))
+
+
+def sgr_background_colour(c: tuple[int, int, int], depth: ColourDepth) -> bytes:
+	"""
+	Returns the SGR parameter for setting the background colour to the colour
+	nearest to the 24 bit colour `c` that can be displayed at `depth`.
+	"""
+	match depth:
+		case ColourDepth.TRUECOLOUR:
+			return sgr_background_colour_24bit(c)
+		case ColourDepth.XTERM_256:
+			return sgr_background_colour_8bit(nearest_xterm_256(c))
+		case ColourDepth.SYSTEM:
+			return sgr_background_colour_4bit(nearest_system(c))
+
+
+def sgr_foreground_colour_4bit(c: int) -> bytes:
+	"""
+	Returns the SGR parameter for setting the foreground colour to system
+	colour `c` (0-15).
+	"""
+	return b'%d' % (30 + c if c < 8 else 90 + c - 8)
+
+
+def sgr_background_colour_4bit(c: int) -> bytes:
+	"""
+	Returns the SGR parameter for setting the background colour to system
+	colour `c` (0-15).
+	"""
+	return b'%d' % (40 + c if c < 8 else 100 + c - 8)
+
+
+def sgr_foreground_colour_8bit(c: int) -> bytes:
+	"""
+	Returns the SGR parameter for setting the foreground colour to an 8 bit
+	colour.
+	"""
+	return b'38;5;%d' % c
+
+
 def set_foreground_colour_8bit(c: int):
 	"""
 	Set the foreground to an 8 bit colour. The new colour applies to all
 	output from then on, until overwritten.
 	"""
-	write_bytes(ESCAPE + b'[38;5;%dm' % c)
+	write_bytes(str_sgr([sgr_foreground_colour_8bit(c)]))
+
+
+def sgr_background_colour_8bit(c: int) -> bytes:
+	"""
+	Returns the SGR parameter for setting the background colour to an 8 bit
+	colour.
+	"""
+	return b'48;5;%d' % c
 
 
 def set_background_colour_8bit(c: int):
@@ -71,7 +408,15 @@ def set_background_colour_8bit(c: int):
 	Set the background to an 8 bit colour. The new colour applies to all
 	output from then on, until overwritten.
 	"""
-	write_bytes(ESCAPE + b'[48;5;%dm' % c)
+	write_bytes(str_sgr([sgr_background_colour_8bit(c)]))
+
+
+def sgr_foreground_colour_24bit(c: tuple[int, int, int]) -> bytes:
+	"""
+	Returns the SGR parameter for setting the foreground colour to a 24bit
+	colour.
+	"""
+	return b'38;2;%d;%d;%d' % (c[0], c[1], c[2])
 
 
 def str_foreground_colour_24bit(c: tuple[int, int, int]) -> bytes:
@@ -79,7 +424,7 @@ def str_foreground_colour_24bit(c: tuple[int, int, int]) -> bytes:
 	Returns the format code for setting the foreground colour
 	to a 24bit colour.
 	"""
-	return ESCAPE + b'[38;2;%d;%d;%dm' % (c[0], c[1], c[2])
+	return str_sgr([sgr_foreground_colour_24bit(c)])
 
 
 def set_foreground_colour_24bit(c: tuple[int, int, int]):
@@ -90,12 +435,20 @@ def set_foreground_colour_24bit(c: tuple[int, int, int]):
 	write_bytes(str_foreground_colour_24bit(c))
 
 
+def sgr_background_colour_24bit(c: tuple[int, int, int]) -> bytes:
+	"""
+	Returns the SGR parameter for setting the background colour to a 24bit
+	colour.
+	"""
+	return b'48;2;%d;%d;%d' % (c[0], c[1], c[2])
+
+
 def str_background_colour_24bit(c: tuple[int, int, int]) -> bytes:
 	"""
 	Returns the format code for setting the background colour
 	to a 24bit colour.
 	"""
-	return ESCAPE + b'[48;2;%d;%d;%dm' % (c[0], c[1], c[2])
+	return str_sgr([sgr_background_colour_24bit(c)])
 
 
 def set_background_colour_24bit(c: tuple[int, int, int]):
@@ -110,12 +463,17 @@ def set_background_colour_24bit(c: tuple[int, int, int]):
 # Text Attributes
 # ==============================================================================
 
-def str_bold(bold: bool):
-	"""Returns the format code for setting the output text weight."""
+def sgr_bold(bold: bool) -> bytes:
+	"""Returns the SGR parameter for setting the output text weight."""
 	if bold:
-		return ESCAPE + b'[1m'
+		return b'1'
 	else:
-		return ESCAPE + b'[22m'
+		return b'22'
+
+
+def str_bold(bold: bool):
+	"""Returns the format code for setting the output text weight."""
+	return str_sgr([sgr_bold(bold)])
 
 
 def set_bold(bold: bool):
@@ -143,6 +501,41 @@ def set_mode_alternate_screenbuffer(signal: bytes):
 	write_bytes(ESCAPE + b'[?1049' + signal)
 
 
+def str_mode_cursor_visible(signal: bytes) -> bytes:
+	"""
+	Returns the escape code for showing, or hiding, the cursor.
+	
+	See: https://terminalguide.namepad.de/mode/p25/
+	
+	:param signal: Must be either :attr:`HIGH` or :attr:`LOW`.
+	"""
+	return ESCAPE + b'[?25' + signal
+
+
+def set_mode_cursor_visible(signal: bytes):
+	"""
+	Show, or hide, the cursor.
+	
+	:param signal: Must be either :attr:`HIGH` or :attr:`LOW`.
+	"""
+	write_bytes(str_mode_cursor_visible(signal))
+
+
+MODE_SYNCHRONIZED_OUTPUT = 2026
+"""The number of synchronized output mode, for :func:`str_request_mode`."""
+
+
+def str_mode_synchronized_output(signal: bytes) -> bytes:
+	"""
+	Returns the escape code for starting, or finishing, a synchronized update.
+	The terminal keeps showing what it showed before the update started until
+	it is finished, and then shows all of the update at once.
+	
+	:param signal: Must be either :attr:`HIGH` or :attr:`LOW`.
+	"""
+	return ESCAPE + b'[?%d' % MODE_SYNCHRONIZED_OUTPUT + signal
+
+
 def set_mode_line_wrap(signal: bytes):
 	"""
 	Turn automatic line wrap on or off.
@@ -165,6 +558,30 @@ def set_mode_mouse_up_down_tracking(signal: bytes):
 	write_bytes(ESCAPE + b'[?1000' + signal)
 
 
+def set_mode_mouse_button_motion_tracking(signal: bytes):
+	"""
+	Turn reporting mouse movement while a button is held on or off.
+	Requires :func:`set_mode_mouse_up_down_tracking`.
+	
+	See: https://terminalguide.namepad.de/mode/p1002/
+	
+	:param signal: Must be either :attr:`HIGH` or :attr:`LOW`.
+	"""
+	write_bytes(ESCAPE + b'[?1002' + signal)
+
+
+def set_mode_mouse_any_motion_tracking(signal: bytes):
+	"""
+	Turn reporting all mouse movement on or off.
+	Requires :func:`set_mode_mouse_up_down_tracking`.
+	
+	See: https://terminalguide.namepad.de/mode/p1003/
+	
+	:param signal: Must be either :attr:`HIGH` or :attr:`LOW`.
+	"""
+	write_bytes(ESCAPE + b'[?1003' + signal)
+
+
 def set_mode_mouse_report_format_digits(signal: bytes):
 	"""
 	Turn sensible mouse input formatting on or off.
@@ -176,6 +593,31 @@ def set_mode_mouse_report_format_digits(signal: bytes):
 	write_bytes(ESCAPE + b'[?1006' + signal)
 
 
+# ==============================================================================
+# Terminal Queries
+# ==============================================================================
+
+# Terminals answer these through stdin.
+
+def str_request_mode(mode: int) -> bytes:
+	"""
+	Returns the escape code (DECRQM) for asking the terminal whether private
+	mode `mode` is set. Terminals that support the query answer with
+	`ESC [ ? <mode> ; <value> $ y`, where `value` is 0 if the mode isn't
+	supported, 1 or 3 if it's set, and 2 or 4 if it's reset.
+	"""
+	return ESCAPE + b'[?%d$p' % mode
+
+
+def str_request_device_attributes() -> bytes:
+	"""
+	Returns the escape code (DA1) for asking the terminal what it is. Nearly
+	every terminal answers with `ESC [ ? <attributes> c`, so the answer also
+	shows that the terminal has answered every query sent before it.
+	"""
+	return ESCAPE + b'[c'
+
+
 # ==============================================================================
 # Terminal Title
 # ==============================================================================
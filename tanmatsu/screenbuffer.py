@@ -2,16 +2,27 @@ from wcwidth import wcswidth
 
 import tanmatsu.output as to
 from tanmatsu import theme
-from tanmatsu.geometry import Point, Rectangle
+from tanmatsu.geometry import Rectangle
 from tanmatsu.style import Style
 
 
 class Screenbuffer:
 	"""
 	Buffer holding characters to be written to the screen.
+	
+	:ivar hit_index: If set, widgets record the area they are drawn to here,
+	                 so that mouse events can be sent to the widget under the
+	                 mouse (see :class:`tanmatsu.hittest.HitIndex`).
+	:vartype hit_index: tanmatsu.hittest.HitIndex | None
+	
+	:ivar profile: The optional escape codes the terminal supports, which
+	               :meth:`render` may use to output fewer bytes.
+	:vartype profile: tanmatsu.output.OutputProfile
 	"""
 	
-	def __init__(self, w: int, h: int):
+	def __init__(self, w: int, h: int, profile: to.OutputProfile | None = None):
+		self.hit_index = None
+		self.profile = profile if profile is not None else to.OutputProfile()
 		self.resize(w, h)
 	
 	def resize(self, w: int, h: int):
@@ -21,6 +32,10 @@ class Screenbuffer:
 		ds = theme.DefaultTheme.default
 		self.buffer       = [ [ ' ' for j in range(0, w) ] for i in range(0, h) ]
 		self.style_buffer = [ [ ds  for j in range(0, w) ] for i in range(0, h) ]
+		
+		# What the screen is showing, as one `(characters, styles)` tuple per
+		#   row, or `None` for rows where that's unknown (see `render()`).
+		self.__front = [ None ] * h
 	
 	def clear(self):
 		for i in range(len(self.buffer)):
@@ -81,7 +96,7 @@ class Screenbuffer:
 			raise ValueError("Screenbuffer.set(): cannot set to an empty string")
 		
 		# Exit if we're outside the clip zone.
-		if (clip and not clip.containsp(Point(x, y))):
+		if clip is not None and not clip.contains_xy(x, y):
 			return 0
 		
 		try:
@@ -91,7 +106,10 @@ class Screenbuffer:
 		
 		self.set_style(x, y, style, clip=clip)
 		
-		return wcswidth(character)
+		try:
+			return _glyphs[character][1]
+		except KeyError:
+			return _glyph(character)[1]
 	
 	def set_style(self,
 		x: int,
@@ -109,7 +127,7 @@ class Screenbuffer:
 		if style is None:
 			return
 		
-		if (clip and not clip.containsp(Point(x, y))):
+		if clip is not None and not clip.contains_xy(x, y):
 			return
 		
 		try:
@@ -145,39 +163,409 @@ class Screenbuffer:
 		return x_offset
 	
 	def write(self):
-		last_seen_style = None
-		
-		# Loop over each row in both buffers:
-		for (i, (bl, sl)) in enumerate(zip(self.buffer, self.style_buffer)):
-			line_buffer = b''
-			error = 0  # number of columns we need to skip due to multi-column character we just encountered
-			
-			# Loop over each column in both rows:
-			for (bv, sv) in zip(bl, sl):
-				if error > 0:
-					# The last character we wrote was a multi-column character.
-					# We need to skip a number of columns equal to the extra
-					# columns the character took up, compared to the standard
-					# one-column width.
-					error -= 1
-					continue
-				else:
-					error = wcswidth(bv) - 1
-				
-				# Instead of naively outputting the entire set of formatting
-				# escape codes for every single character, perform primitive
-				# run-length encoding/compression by only outputting each
-				# formatting escape code when it differs from the currently
-				# active formatting escape code.
-				line_buffer += sv.get_diff(last_seen_style) + bv.encode()
-				last_seen_style = sv
-			
-			# Finally, write `line_buffer` to the terminal.
-			# 
-			# We use `to.set_position` here instead of new line characters
-			# as new line characters seem to cause the terminal to scroll down
-			# one line at the end, even if no new line character is present in
-			# the final line. It is not immediately clear why this would
-			# be the case.
-			to.set_position(0, i)
-			to.write_bytes(line_buffer)
+		"""
+		Write the changes since the last call to :meth:`write` to the screen,
+		in one go, with the cursor hidden.
+		
+		If the terminal supports synchronized output (see
+		:class:`tanmatsu.output.OutputProfile`), it shows the changes all at
+		once, rather than as they arrive.
+		"""
+		frame = self.render()
+		
+		if not frame:
+			return
+		
+		frame = to.str_mode_cursor_visible(to.LOW) + frame + to.str_mode_cursor_visible(to.HIGH)
+		
+		if self.profile.synchronized_output:
+			frame = (
+				to.str_mode_synchronized_output(to.HIGH) +
+				frame +
+				to.str_mode_synchronized_output(to.LOW)
+			)
+		
+		to.write_bytes(frame)
+	
+	def render(self) -> bytes:
+		"""
+		Returns the bytes that bring the screen from the contents it had the last
+		time this function was called, to the current contents of the buffer.
+		The screen is assumed to be unchanged since then.
+		
+		Only rows that have changed are output, and only from their first
+		changed column to their last changed column. Rows that have moved
+		vertically (e.g., when a full width :class:`tanmatsu.widgets.TextLog`
+		gains a line) are moved by the terminal itself, using scroll regions.
+		
+		After :meth:`resize`, the whole screen is output.
+		"""
+		rows = [ (tuple(bl), tuple(sl)) for (bl, sl) in zip(self.buffer, self.style_buffer) ]
+		front = self.__front
+		
+		encoder = _Encoder(self.w, self.profile)
+		
+		# Setting a scroll region moves the cursor to the top left.
+		if self.__scroll(front, rows, encoder.out):
+			(encoder.x, encoder.y) = (0, 0)
+		
+		for (i, row) in enumerate(rows):
+			old = front[i]
+			
+			if old == row:
+				continue
+			
+			_render_row(encoder, i, row, old)
+			front[i] = row
+		
+		return b''.join(encoder.out)
+	
+	# Finds rows that have moved vertically since the last frame, moves them
+	#   on the screen with scroll regions, and updates `front` to match.
+	# 
+	# Returns whether any rows were moved.
+	# 
+	# Works like the hashmap scrolling optimisation in curses: every row that
+	#   has changed, and is unique in both the old and the new frame, is matched
+	#   to the row it used to be. Consecutive matched rows that moved by the same
+	#   amount form a hunk, which is then grown to take in the neighbouring rows
+	#   that moved by that amount too (e.g., blank lines, which aren't unique).
+	# 
+	# Scroll regions span the full width of the screen, so only rows moving as
+	#   a whole are detected. A pane of scrolling text that is beside another
+	#   widget won't be matched, unless that widget scrolled too.
+	def __scroll(self, front: list, rows: list, out: list):
+		old_rows = { }
+		old_counts = { }
+		new_counts = { }
+		
+		for (j, row) in enumerate(front):
+			if row is not None:
+				old_rows[row] = j
+				old_counts[row] = old_counts.get(row, 0) + 1
+		
+		for row in rows:
+			new_counts[row] = new_counts.get(row, 0) + 1
+		
+		shifts = [ None ] * self.h
+		
+		for (i, row) in enumerate(rows):
+			if (
+				front[i] != row and
+				old_counts.get(row) == 1 and new_counts[row] == 1 and
+				old_rows[row] != i
+			):
+				shifts[i] = old_rows[row] - i
+		
+		# Rows `top` to `bottom` of the scroll regions already used. Regions
+		#   mustn't overlap, as `front` only reflects the scrolls that were done.
+		used = []
+		i = 0
+		
+		while i < self.h:
+			k = shifts[i]
+			
+			if k is None:
+				i += 1
+				continue
+			
+			start = i
+			while i < self.h and shifts[i] == k:
+				i += 1
+			end = i - 1
+			
+			# Grow the hunk to take in neighbouring rows that moved by `k` too.
+			while start > 0 and 0 <= start - 1 + k < self.h and front[start - 1 + k] == rows[start - 1]:
+				start -= 1
+			while end < self.h - 1 and 0 <= end + 1 + k < self.h and front[end + 1 + k] == rows[end + 1]:
+				end += 1
+			
+			i = max(i, end + 1)
+			
+			# Scrolling leaves `|k|` blank rows that need output in full, so
+			#   only scroll if that's less than what moving the rows saves.
+			if end - start + 1 <= abs(k):
+				continue
+			
+			top = min(start, start + k)
+			bottom = max(end, end + k)
+			
+			if any(top <= b and t <= bottom for (t, b) in used):
+				continue
+			
+			used.append((top, bottom))
+			out.append(to.str_scroll_region(top, bottom))
+			
+			if k > 0:
+				out.append(to.str_scroll_up(k))
+				front[top:bottom + 1] = front[top + k:bottom + 1] + [ None ] * k
+			else:
+				out.append(to.str_scroll_down(-k))
+				front[top:bottom + 1] = [ None ] * -k + front[top:bottom + 1 + k]
+			
+			out.append(to.str_reset_scroll_region())
+		
+		return bool(used)
+
+
+# Rows are `(characters, styles)` tuples, with styles compared by identity.
+
+
+# The UTF-8 encoding and width of every character seen so far. Screens are
+#   mostly made up of the same few hundred characters (e.g., ASCII, and box
+#   drawing), so neither has to be worked out again for every cell.
+_glyphs: dict[str, tuple[bytes, int]] = { }
+
+
+def _glyph(character: str) -> tuple[bytes, int]:
+	try:
+		return _glyphs[character]
+	except KeyError:
+		pass
+	
+	if len(_glyphs) >= 4096:
+		_glyphs.clear()
+	
+	_glyphs[character] = (character.encode(), wcswidth(character))
+	return _glyphs[character]
+
+
+# Builds the bytes of one frame, keeping track of the style the terminal is
+#   set to, and where its cursor is, so that each can be changed with as few
+#   bytes as possible.
+class _Encoder:
+	def __init__(self, w: int, profile: to.OutputProfile):
+		self.w = w
+		self.profile = profile
+		self.out = []
+		
+		# The style the terminal is currently set to. Start from scratch, in
+		#   case anything else has changed it since the last frame.
+		self.style = None
+		
+		# The position of the cursor, with `None` for unknown.
+		# 
+		# Writing to the last column leaves the cursor waiting to wrap (or
+		#   not, depending on the terminal), so its column is unknown after
+		#   that. Its row is still known, as it doesn't actually wrap until
+		#   the next character is written.
+		self.x = None
+		self.y = None
+	
+	def write(self, x: int, encoded: bytes, style: Style, width: int, count: int = 1):
+		"""
+		Write the `encoded` character, which is `width` columns wide, `count`
+		times from column `x`. If `count` is more than 1, `width` must be 1.
+		"""
+		# Instead of naively outputting the entire set of formatting
+		# escape codes for every single character, perform primitive
+		# run-length encoding/compression by only outputting each
+		# formatting escape code when it differs from the currently
+		# active formatting escape code.
+		self.out.append(style.get_diff(self.style, self.profile.colour_depth))
+		self.style = style
+		
+		end = x + width * count
+		
+		# Zero width (and unprintable) characters may or may not move the
+		#   cursor, depending on the terminal.
+		end_x = end if 0 < width and end < self.w else None
+		
+		candidates = [ (encoded * count, end_x) ]
+		
+		if count > 1 and self.profile.repeat:
+			candidates.append((encoded + to.str_repeat(count - 1), end_x))
+		
+		# Erasing doesn't move the cursor. Past the end of the run, it's
+		#   moved forward, unless the run goes up to the end of the row, in
+		#   which case the rest of the row can be erased.
+		if encoded == b" " and self.profile.erase:
+			if end == self.w:
+				candidates.append((to.str_erase_line(), x))
+			else:
+				candidates.append((to.str_erase_characters(count) + to.str_cursor_forward(count), end_x))
+		
+		(encoded, self.x) = min(candidates, key=lambda i: len(i[0]))
+		self.out.append(encoded)
+	
+	def move(self, x: int, y: int, style: Style, skipped: list[tuple]):
+		"""
+		Move the cursor to `x`, `y`, before writing a character in `style`.
+		
+		`skipped` holds the `(x, encoded, style, width)` glyphs of row `y`
+		that are already on the screen, from the cursor (if it is on row `y`) up
+		to `x`. Writing them again is an alternative to moving the cursor.
+		"""
+		if self.y == y and self.x == x:
+			return
+		
+		# We use positioning here instead of new line characters as new line
+		# characters seem to cause the terminal to scroll down one line at the
+		# end, even if no new line character is present in the final line. It
+		# is not immediately clear why this would be the case.
+		candidates = [ to.str_position(x, y) ]
+		
+		if self.y is not None:
+			horizontal = [ to.str_column(x) ]
+			
+			if x == 0:
+				horizontal.append(b'\r')
+			else:
+				horizontal.append(b'\r' + to.str_cursor_forward(x))
+			
+			if self.x is not None and self.x < x:
+				horizontal.append(to.str_cursor_forward(x - self.x))
+			elif self.x is not None and self.x > x:
+				horizontal.append(to.str_cursor_back(self.x - x))
+			elif self.x is not None:
+				horizontal.append(b'')
+			
+			if self.y < y:
+				vertical = to.str_cursor_down(y - self.y)
+			elif self.y > y:
+				vertical = to.str_cursor_up(self.y - y)
+			else:
+				vertical = b''
+			
+			candidates += [ vertical + i for i in horizontal ]
+		
+		best = min(candidates, key=len)
+		
+		# Writing the skipped glyphs again also changes the style, which
+		#   changes what it costs to switch to `style` afterwards.
+		if (
+			self.y == y and self.x is not None and
+			0 < x - self.x <= len(best) and
+			skipped and skipped[0][0] == self.x
+		):
+			rewrite = []
+			rewrite_style = self.style
+			
+			for (_, encoded, glyph_style, _) in skipped:
+				rewrite.append(glyph_style.get_diff(rewrite_style, self.profile.colour_depth))
+				rewrite.append(encoded)
+				rewrite_style = glyph_style
+			
+			rewrite = b''.join(rewrite)
+			
+			if (
+				len(rewrite) + len(style.get_diff(rewrite_style, self.profile.colour_depth)) <
+				len(best) + len(style.get_diff(self.style, self.profile.colour_depth))
+			):
+				self.out.append(rewrite)
+				self.style = rewrite_style
+				self.x = x
+				return
+		
+		self.out.append(best)
+		(self.x, self.y) = (x, y)
+
+
+# Appends the bytes that output the characters of `row` that differ from
+#   `old` (which is `None` if all of them do) to `encoder`.
+def _render_row(encoder: _Encoder, y: int, row: tuple, old: tuple | None):
+	(characters, styles) = row
+	
+	# The multi-column characters on the screen, by column. Once one is
+	#   overwritten, the columns it covered have to be written again, even
+	#   if they haven't changed in the buffer, as they no longer show
+	#   anything.
+	old_wide = { }
+	
+	if old is not None:
+		(old_characters, old_styles) = old
+		
+		j = 0
+		while j < len(old_characters):
+			try:
+				width = _glyphs[old_characters[j]][1]
+			except KeyError:
+				width = _glyph(old_characters[j])[1]
+			
+			if width > 1:
+				old_wide[j] = width
+			
+			j += max(width, 1)
+	
+	# Columns before this one were covered by an overwritten multi-column
+	#   character.
+	overwritten_until = 0
+	
+	# `(x, encoded, style, width, changed)` for each character in the row
+	#   that starts a glyph, with the character encoded as UTF-8.
+	glyphs = []
+	
+	error = 0  # number of columns we need to skip due to multi-column character we just encountered
+	
+	# Loop over each column in both rows:
+	for (j, (bv, sv)) in enumerate(zip(characters, styles)):
+		if j in old_wide and (error > 0 or bv != old_characters[j] or sv is not old_styles[j]):
+			overwritten_until = max(overwritten_until, j + old_wide[j])
+			
+			# Overwritten by the multi-column character before this column.
+			if error > 0:
+				glyphs[-1] = glyphs[-1][:4] + (True,)
+		
+		if error > 0:
+			# The last character we wrote was a multi-column character.
+			# We need to skip a number of columns equal to the extra
+			# columns the character took up, compared to the standard
+			# one-column width.
+			error -= 1
+			continue
+		
+		try:
+			(encoded, width) = _glyphs[bv]
+		except KeyError:
+			(encoded, width) = _glyph(bv)
+		
+		error = width - 1
+		
+		# A multi-column character has to be written again if any of the
+		#   columns it covers have changed.
+		if old is None or j < overwritten_until:
+			changed = True
+		elif width <= 1:
+			changed = bv != old_characters[j] or sv is not old_styles[j]
+		else:
+			changed = not all(
+				characters[k] == old_characters[k] and styles[k] is old_styles[k]
+				for k in range(j, min(j + width, len(characters)))
+			)
+		
+		glyphs.append((j, encoded, sv, width, changed))
+	
+	# The glyphs since the last one that was written, which are already on
+	#   the screen.
+	skipped = []
+	
+	i = 0
+	while i < len(glyphs):
+		(x, encoded, style, width, changed) = glyphs[i]
+		
+		if not changed:
+			skipped.append(glyphs[i][:4])
+			i += 1
+			continue
+		
+		# Write runs of the same changed character (e.g., blank space, or the
+		#   sides of a box) in one go, so that they can be compressed.
+		end = i + 1
+		
+		if width == 1:
+			while end < len(glyphs) and glyphs[end] == (x + end - i, encoded, style, 1, True):
+				end += 1
+			
+			# Unchanged spaces at the end of the row can be erased together
+			#   with the changed ones.
+			if (
+				encoded == b" " and encoder.profile.erase and
+				all(g[1:4] == (b" ", style, 1) for g in glyphs[end:])
+			):
+				end = len(glyphs)
+		
+		encoder.move(x, y, style, skipped)
+		encoder.write(x, encoded, style, width, count=end - i)
+		
+		skipped = []
+		i = end
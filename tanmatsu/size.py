@@ -1,9 +1,55 @@
 import fractions
 from abc import ABC
+from math import lcm
+from typing import Sequence
 
 
 class Size(ABC):
-	pass
+	"""
+	Abstract base class. Parent class of all sizes.
+	
+	Sizes are compiled (see :attr:`compiled`) into a `(kind, a, b)` tuple of
+	integers when they are created or modified, so that resolving a size is
+	a matter of integer arithmetic.
+	"""
+	
+	FIXED    = 0
+	FRACTION = 1
+	AUTO     = 2
+	CONTENT  = 3
+	
+	# Incremented whenever a size is modified in place, so that anything
+	#   holding on to compiled sizes (see `FlexPlan`) knows to recompile them.
+	_revision = 0
+	
+	compiled: tuple[int, int, int]
+	"""
+	The size, compiled into a `(kind, a, b)` tuple. `kind` is one of
+	:attr:`FIXED`, :attr:`FRACTION`, :attr:`AUTO`, or :attr:`CONTENT`, and
+	`a / b` is the fixed size or the fraction (in lowest terms).
+	"""
+	
+	bounds: tuple[int, int | None] = (0, None)
+	"""
+	The `(minimum, maximum)` the size is clamped to, where a maximum of
+	`None` means unbounded. Only :class:`Clamp` sets this.
+	"""
+	
+	def _compile(self, kind: int, a: int, b: int):
+		self.compiled = (kind, a, b)
+		Size._revision += 1
+
+
+def clamp(value: int, bounds: tuple[int, int | None]) -> int:
+	"""Returns `value`, clamped to `bounds` (see :attr:`Size.bounds`)."""
+	(minimum, maximum) = bounds
+	
+	value = max(value, minimum)
+	
+	if maximum is not None:
+		value = min(value, maximum)
+	
+	return value
 
 
 class FixedInteger(Size):
@@ -16,6 +62,19 @@ class FixedInteger(Size):
 	
 	def __init__(self, size: int):
 		self.size = size
+	
+	@property
+	def size(self) -> int:
+		"""
+		:getter: Get the size, in rows/columns.
+		:setter: Set the size.
+		"""
+		return self.__size
+	
+	@size.setter
+	def size(self, size: int):
+		self.__size = size
+		self._compile(Size.FIXED, size, 1)
 
 
 class Fraction(Size):
@@ -32,6 +91,19 @@ class Fraction(Size):
 	
 	def __init__(self, numerator, denominator):
 		self.fraction = fractions.Fraction(numerator, denominator)
+	
+	@property
+	def fraction(self) -> fractions.Fraction:
+		"""
+		:getter: Get the fraction.
+		:setter: Set the fraction.
+		"""
+		return self.__fraction
+	
+	@fraction.setter
+	def fraction(self, fraction: fractions.Fraction):
+		self.__fraction = fractions.Fraction(fraction)
+		self._compile(Size.FRACTION, self.__fraction.numerator, self.__fraction.denominator)
 
 
 class Auto(Size):
@@ -40,40 +112,327 @@ class Auto(Size):
 	up equally amongst all :class:`Auto`\ s.
 	"""
 	def __init__(self):
-		pass
-
-
-# class Clamp():
-# 	"""
-# 	Resolve to the parent's requested size, as long as it is between a set
-# 	minimum and maximum. Otherwise, resolve to a percentage of the parent's
-# 	size, and clamp it between said minimum and maximum.
-	
-# 	:param minv: The minimum size that this function will resolve to.
-# 	:paramtype minv: int
-	
-# 	:param actual: The percentage of the parent's size that this function
-# 	               will resolve to, assuming the parent's requested size
-# 	               is outside the bounds of the minimum and maximum size.
-# 	:paramtype actual: int
-	
-# 	:param maxv: The maximum size that this function will resolve to.
-# 	:paramtype maxv: int
-# 	"""
-# 	def __init__(self, minv: int, percent: Fraction, maxv: int):
-# 		self.minv = minv
-# 		self.percent = percent
-# 		self.maxv = maxv
-	
-# 	def resolve(self, parent_size: int, requested_size) -> int:
-# 		if (
-# 			requested_size >= self.minv and\
-# 			requested_size <= self.maxv
-# 		):
-# 			return requested_size
-		
-# 		clamped = floor(self.percent * parent_size)
-# 		clamped = max(self.minv, clamped)
-# 		clamped = min(self.maxv, clamped)
-		
-# 		return clamped
+		self._compile(Size.AUTO, 0, 1)
+
+
+class Content(Size):
+	"""
+	Resolve to the size the widget would like to be, as returned by its
+	:meth:`tanmatsu.widgets.Widget.measure` method (e.g., the width of the
+	label of a :class:`tanmatsu.widgets.Button`).
+	"""
+	def __init__(self):
+		self._compile(Size.CONTENT, 0, 1)
+
+
+class Clamp(Size):
+	"""
+	Resolve to the `preferred` size, as long as it is between a set minimum
+	and maximum. Otherwise, resolve to said minimum or maximum.
+	
+	Along the flex axis of a :class:`tanmatsu.widgets.FlexBox`, space that a
+	clamped :class:`Fraction` or :class:`Auto` can't take (or has to be given)
+	is taken from (or given to) the other sizes of the same kind.
+	
+	:param minv: The minimum size that this function will resolve to.
+	:paramtype minv: int
+	
+	:param preferred: The size to resolve to, if it's within bounds.
+	:paramtype preferred: Size
+	
+	:param maxv: The maximum size that this function will resolve to, or
+	             `None` for no maximum.
+	:paramtype maxv: int | None
+	"""
+	
+	def __init__(self, minv: int, preferred: Size, maxv: int | None):
+		if isinstance(preferred, Clamp):
+			raise ValueError("Clamp(): `preferred` can't be another Clamp")
+		
+		if maxv is not None and maxv < minv:
+			raise ValueError(f"Clamp(): maximum {maxv} is less than minimum {minv}")
+		
+		self.preferred = preferred
+		self.bounds = (minv, maxv)
+		Size._revision += 1
+	
+	@property
+	def compiled(self) -> tuple[int, int, int]:
+		# Clamped sizes compile to the size they clamp, so that modifying
+		#   `preferred` in place is picked up.
+		return self.preferred.compiled
+
+
+class FlexPlan:
+	"""
+	A sequence of sizes (e.g., the widths of the children of a row),
+	compiled for resolving repeatedly against different amounts of space.
+	
+	Everything that doesn't depend on the amount of space (the total of the
+	fixed sizes, the weight of each fraction, and so on) is worked out once,
+	here, leaving only integer arithmetic for :meth:`flex` and
+	:meth:`nonflex`.
+	
+	:param sizes: The sizes to compile.
+	:paramtype sizes: Sequence[Size]
+	
+	:raises NotImplementedError: if one of the sizes can't be compiled.
+	"""
+	
+	def __init__(self, sizes: Sequence[Size]):
+		self.compiled = []
+		
+		for i in sizes:
+			if getattr(i, "compiled", None) is None:
+				raise NotImplementedError("Unimplemented size value")
+			
+			self.compiled.append(i.compiled)
+		
+		self.bounds = [ i.bounds for i in sizes ]
+		
+		self.fixed_total = sum(
+			clamp(a, bounds)
+			for ((kind, a, _), bounds) in zip(self.compiled, self.bounds)
+			if kind == Size.FIXED
+		)
+		self.auto_count = sum(1 for (kind, _, _) in self.compiled if kind == Size.AUTO)
+		self.has_content = any(kind == Size.CONTENT for (kind, _, _) in self.compiled)
+		
+		# Bring every fraction over a common denominator, so that each fraction
+		#   becomes an integer weight, out of a total weight.
+		# 
+		# If the fractions add up to less than 1/1, the total is taken to be
+		#   1/1 (i.e., the common denominator), so that the fractions are
+		#   fractions of the whole space, rather than of each other.
+		denominator = lcm(*(b for (kind, _, b) in self.compiled if kind == Size.FRACTION))
+		
+		self.weights = [
+			a * (denominator // b) if kind == Size.FRACTION else 0
+			for (kind, a, b) in self.compiled
+		]
+		self.total_weight = max(sum(self.weights), denominator)
+		
+		# Indices of the fractions and autos, if any of them are clamped.
+		#   Clamped groups are resolved by `_distribute()`, unclamped ones
+		#   with a single division each.
+		self.clamped_fractions = self.__clamped_indices(Size.FRACTION)
+		self.clamped_autos = self.__clamped_indices(Size.AUTO)
+	
+	def __clamped_indices(self, kind: int) -> list[int] | None:
+		indices = [ i for (i, (k, _, _)) in enumerate(self.compiled) if k == kind ]
+		
+		if all(self.bounds[i] == Size.bounds for i in indices):
+			return None
+		
+		return indices
+	
+	def flex(self, *spaces: int, content: Sequence[int] | None = None) -> list[list[int]]:
+		"""
+		Resolves the sizes as if they are flexed along this axis (i.e., laid
+		out as a cohesive unit, sharing the space available between them).
+		
+		First, fixed and content sizes are taken out of the space available.
+		Then, each fraction gets its fraction of what's left. Finally, any
+		space remaining is shared equally between the auto sizes.
+		
+		If any fractions (or autos) are clamped, the space they would have
+		taken between them is shared out again, so that each one keeps its
+		proportion of the space while staying within its bounds (see
+		:func:`_distribute`).
+		
+		:param spaces: One or more amounts of space to resolve the sizes for.
+		               All of them are resolved in a single pass.
+		
+		:param content: The measured size of each item, for resolving
+		                :class:`Content` sizes. Only needed if there are any.
+		
+		:return: For each of `spaces`, the resolved sizes, in order.
+		
+		:raises ValueError: if there are :class:`Content` sizes, but no
+		                    `content` was given.
+		"""
+		content_total = 0
+		
+		if self.has_content and content is None:
+			raise ValueError("FlexPlan.flex(): content sizes need measured sizes")
+		
+		if self.has_content:
+			content_total = sum(
+				clamp(content[i], self.bounds[i])
+				for (i, (kind, _, _)) in enumerate(self.compiled)
+				if kind == Size.CONTENT
+			)
+		
+		lefts = [ space - self.fixed_total - content_total for space in spaces ]
+		results = [ [] for _ in spaces ]
+		remaining = list(lefts)
+		
+		for (i, ((kind, a, _), weight)) in enumerate(zip(self.compiled, self.weights)):
+			match kind:
+				case Size.FIXED:
+					for result in results:
+						result.append(clamp(a, self.bounds[i]))
+				case Size.CONTENT:
+					for result in results:
+						result.append(clamp(content[i], self.bounds[i]))
+				case Size.FRACTION if self.clamped_fractions is None:
+					for (j, result) in enumerate(results):
+						# Nothing is left if the fixed sizes already take up
+						#   more than the space available.
+						size = max((weight * lefts[j]) // self.total_weight, 0)
+						result.append(size)
+						remaining[j] -= size
+				case _:
+					for result in results:
+						result.append(None)  # Filled in below
+		
+		if self.clamped_fractions is not None:
+			indices = self.clamped_fractions
+			weights = [ self.weights[i] for i in indices ]
+			bounds = [ self.bounds[i] for i in indices ]
+			
+			for (j, result) in enumerate(results):
+				target = max((sum(weights) * lefts[j]) // self.total_weight, 0)
+				
+				for (i, size) in zip(indices, _distribute(target, weights, bounds)):
+					result[i] = size
+					remaining[j] -= size
+		
+		if self.clamped_autos is not None:
+			indices = self.clamped_autos
+			bounds = [ self.bounds[i] for i in indices ]
+			
+			for (j, result) in enumerate(results):
+				# Unclamped, each auto gets an equal, whole, share.
+				target = max(remaining[j] // self.auto_count, 0) * self.auto_count
+				
+				for (i, size) in zip(indices, _distribute(target, [1] * len(indices), bounds)):
+					result[i] = size
+		elif self.auto_count > 0:
+			for (j, result) in enumerate(results):
+				auto_each = max(remaining[j] // self.auto_count, 0)
+				
+				for (i, (kind, _, _)) in enumerate(self.compiled):
+					if kind == Size.AUTO:
+						result[i] = auto_each
+		
+		return results
+	
+	def nonflex(self, *spaces: int, content: Sequence[int] | None = None) -> list[list[int]]:
+		"""
+		Resolves the sizes as if they are *not* flexed along this axis (i.e.,
+		laid out without the size of one affecting the size of any of
+		the others).
+		
+		:param spaces: One or more amounts of space to resolve the sizes for.
+		               All of them are resolved in a single pass.
+		
+		:param content: The measured size of each item, for resolving
+		                :class:`Content` sizes. Only needed if there are any.
+		
+		:return: For each of `spaces`, the resolved sizes, in order.
+		
+		:raises ValueError: if there are :class:`Content` sizes, but no
+		                    `content` was given.
+		"""
+		if self.has_content and content is None:
+			raise ValueError("FlexPlan.nonflex(): content sizes need measured sizes")
+		
+		results = [ [] for _ in spaces ]
+		
+		for (i, (kind, a, b)) in enumerate(self.compiled):
+			for (j, result) in enumerate(results):
+				match kind:
+					case Size.FIXED:
+						size = a
+					case Size.CONTENT:
+						size = content[i]
+					case Size.FRACTION:
+						size = (a * spaces[j]) // b
+					case _:
+						size = spaces[j]
+				
+				result.append(clamp(size, self.bounds[i]))
+		
+		return results
+
+
+def _distribute(
+	target: int,
+	weights: Sequence[int],
+	bounds: Sequence[tuple[int, int | None]]
+) -> list[int]:
+	"""
+	Shares out `target` between items in proportion to their `weights`, while
+	keeping each item within its `bounds`. Returns the size of each item, which
+	add up to `target` unless the bounds don't allow it.
+	
+	In other words, finds the scale `λ` at which the sizes
+	`clamp(weight * λ, bounds)` add up to `target`. The total is piecewise
+	linear in `λ`, changing slope only where an item reaches its minimum or
+	maximum (i.e., at `minimum / weight` and `maximum / weight`). So rather than
+	clamping, re-sharing, and clamping again until nothing changes, those
+	breakpoints are sorted, and swept once to find the segment containing
+	`target`: O(n log n) overall.
+	"""
+	minimums = [ minimum for (minimum, _) in bounds ]
+	
+	if target <= sum(minimums):
+		return minimums
+	
+	# Breakpoints, as `(λ, weight, minimum or maximum)`. An item starts growing
+	#   once `λ` reaches `minimum / weight`, and stops at `maximum / weight`.
+	events = []
+	
+	for (weight, (minimum, maximum)) in zip(weights, bounds):
+		if weight == 0:
+			continue
+		
+		events.append((fractions.Fraction(minimum, weight), weight, -minimum))
+		
+		if maximum is not None:
+			events.append((fractions.Fraction(maximum, weight), -weight, maximum))
+	
+	events.sort(key=lambda event: event[0])
+	
+	# The total at `λ` is `constant + slope * λ`. Every item starts out frozen
+	#   at its minimum.
+	constant = sum(minimums)
+	slope = 0
+	
+	for (at, weight_change, constant_change) in events:
+		if constant + slope * at >= target:
+			break
+		
+		slope += weight_change
+		constant += constant_change
+	
+	# Every item is frozen at its maximum, and it still isn't enough.
+	if slope == 0:
+		return [
+			minimum if maximum is None or weight == 0 else maximum
+			for (weight, (minimum, maximum)) in zip(weights, bounds)
+		]
+	
+	# λ = numerator / denominator, kept exact so that rounding is fair.
+	numerator = target - constant
+	denominator = slope
+	
+	sizes = []
+	growing = []
+	
+	for (i, (weight, bound)) in enumerate(zip(weights, bounds)):
+		(size, remainder) = divmod(weight * numerator, denominator)
+		sizes.append(clamp(size, bound))
+		
+		if weight > 0 and sizes[i] == size and (bound[1] is None or size < bound[1]):
+			growing.append((-remainder, i))
+	
+	# Rounding down leaves less than one cell per growing item over. Hand it
+	#   out to the items that were rounded down the most.
+	growing.sort()
+	
+	for (_, i) in growing[:target - sum(sizes)]:
+		sizes[i] += 1
+	
+	return sizes
@@ -70,21 +70,95 @@ class Style:
 	def escape_sequence(self):
 		return self.get_diff(None)
 	
-	def get_diff(self, other):
-		s = b''
+	def get_diff(
+		self,
+		other: Style | None,
+		depth: to.ColourDepth = to.ColourDepth.TRUECOLOUR,
+	) -> bytes:
+		"""
+		Returns the format code that changes the output style from `other`
+		(or from an unknown style, if `other` is `None`) to this style.
+		Attributes of this style that are `None` are left as they are.
+		
+		Colours are output as the nearest colour that can be displayed at
+		`depth`.
 		
+		All of the changes are merged into one SGR sequence. If this style sets
+		every attribute, the sequence may also start by resetting every
+		attribute, if that makes it shorter (e.g., to turn off bold).
+		
+		Format codes are cached for each pair of styles (and `depth`), by the
+		values of their attributes.
+		"""
 		# Quick optimisation: we can return nothing if the thing
 		# we're comparing against is ourself.
 		if self is other:
-			return s
+			return b''
+		
+		if other is None:
+			key = (depth, self.foreground, self.background, self.bold)
+		else:
+			key = (
+				depth,
+				self.foreground, self.background, self.bold,
+				other.foreground, other.background, other.bold,
+			)
+		
+		try:
+			return _transitions[key]
+		except KeyError:
+			pass
+		
+		# Colours are compared by the parameters they are output as, as
+		#   colours that are different may still be the same once they've
+		#   been changed to the nearest colour that can be displayed.
+		foreground = _colour(to.sgr_foreground_colour, self.foreground, depth)
+		background = _colour(to.sgr_background_colour, self.background, depth)
+		
+		if other is not None:
+			other_foreground = _colour(to.sgr_foreground_colour, other.foreground, depth)
+			other_background = _colour(to.sgr_background_colour, other.background, depth)
 		
-		if self.foreground is not None and (other is None or self.foreground != other.foreground):
-			s += to.str_foreground_colour_24bit(self.foreground)
+		delta = []
 		
-		if self.background is not None and (other is None or self.background != other.background):
-			s += to.str_background_colour_24bit(self.background)
+		if foreground is not None and (other is None or foreground != other_foreground):
+			delta.append(foreground)
+		
+		if background is not None and (other is None or background != other_background):
+			delta.append(background)
 		
 		if self.bold is not None and (other is None or self.bold != other.bold):
-			s += to.str_bold(self.bold)
+			delta.append(to.sgr_bold(self.bold))
+		
+		s = to.str_sgr(delta) if delta else b''
+		
+		# Resetting also resets any attributes of this style that are `None`,
+		#   which are meant to be left as they are, so only do it when there
+		#   aren't any.
+		if delta and None not in (foreground, background, self.bold):
+			reset = [ to.SGR_RESET, foreground, background ]
+			
+			if self.bold:
+				reset.append(to.sgr_bold(True))
+			
+			reset = to.str_sgr(reset)
+			
+			if len(reset) < len(s):
+				s = reset
+		
+		# Distinct styles only come from themes and widgets, so there are
+		#   usually few pairs, but don't let them accumulate.
+		if len(_transitions) >= 4096:
+			_transitions.clear()
 		
+		_transitions[key] = s
 		return s
+
+
+# Format codes returned by `Style.get_diff()`, keyed by the attributes of the
+#   styles being changed to and from.
+_transitions: dict[tuple, bytes] = { }
+
+
+def _colour(sgr, colour: tuple[int, int, int] | None, depth: to.ColourDepth) -> bytes | None:
+	return None if colour is None else sgr(colour, depth)
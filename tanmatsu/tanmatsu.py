@@ -1,18 +1,27 @@
 import fcntl
 import os
+import re
 import selectors
 import shutil
 import signal
 import sys
 import termios
+import time
 
 import tanmatsu.input as ti
 import tanmatsu.output as to
 from tanmatsu import debug, screenbuffer
 from tanmatsu.geometry import Dimensions, Point, Rectangle
+from tanmatsu.hittest import HitIndex
 from tanmatsu.widgets.base import Widget
 
 
+# Replies to the queries in `Tanmatsu.__query_synchronized_output()`: a mode
+#   report (DECRPM), and the primary device attributes (DA1).
+MODE_REPORT = re.compile(rb"\x1B\[\?(\d+);(\d+)\$y")
+DEVICE_ATTRIBUTES = re.compile(rb"\x1B\[\?[\d;]*c")
+
+
 def exhaust_file_descriptor(fd):
 	buff = b''
 	
@@ -28,6 +37,16 @@ class Tanmatsu:
 	:param title: The title the terminal window should be set to.
 	:paramtype title: str
 	
+	:param mouse_motion: Which mouse movements to report to widgets, if any.
+	                     Defaults to none.
+	:paramtype mouse_motion: tanmatsu.input.Mouse_motion
+	
+	:param output_profile: The colours and optional escape codes the terminal
+	                       supports. Defaults to the ones detected from the
+	                       environment (see
+	                       :meth:`tanmatsu.output.OutputProfile.detect`).
+	:paramtype output_profile: tanmatsu.output.OutputProfile | None
+	
 	This class fulfils two functions:
 	
 	- Configures the terminal emulator (setting proper modes and so on).
@@ -52,19 +71,58 @@ class Tanmatsu:
 	       t.loop()
 	"""
 	
-	def __init__(self, title: str | None = None):
+	def __init__(
+		self,
+		title: str | None = None,
+		mouse_motion: ti.Mouse_motion = ti.Mouse_motion.NONE,
+		output_profile: to.OutputProfile | None = None,
+	):
+		detect = output_profile is None
+		
+		if detect:
+			output_profile = to.OutputProfile.detect()
+		
 		# Get the terminal's w/h and set up a screenbuffer object
 		(w, h) = shutil.get_terminal_size()
-		self.screenbuffer = screenbuffer.Screenbuffer(w, h)
+		self.screenbuffer = screenbuffer.Screenbuffer(w, h, output_profile)
+		
+		self.mouse_motion = mouse_motion
+		
+		# Input read while waiting for the terminal to answer a query, which
+		#   is handled before reading any more input.
+		self.__pending_input = b''
+		
+		# Whether the terminal may still answer a query after we stopped
+		#   waiting for it. See `__filter_replies()`.
+		self.__awaiting_replies = False
 		
 		self.__setup_stdinout()  # Set the proper stdin/stdout modes
 		self.__setup_terminal()  # Set the proper terminal emulator modes
 		self.__setup_selector()  # Set up input handling
 		
+		if detect:
+			output_profile.synchronized_output = self.__query_synchronized_output()
+		
 		if title is not None:
 			to.set_terminal_title(title)
 		
 		self.root_widget = None
+		
+		# See `__focus_ring()` and `get_current_focus_chain()`
+		self.__focus_ring_key = None
+		self.__focus_ring_value = None
+		self.__focus_chain_key = None
+		self.__focus_chain = ()
+		
+		# Filled in with the widgets drawn each frame, to find the widgets
+		#   under the mouse.
+		self.hit_index = HitIndex()
+		self.screenbuffer.hit_index = self.hit_index
+		
+		# The widget that consumed the last mouse button press, which gets
+		#   every mouse event until the button is released (e.g., so that
+		#   dragging a scrollbar keeps working when the mouse leaves it).
+		self.__mouse_capture = None
 	
 	def __setup_stdinout(self):
 		# Normally stdin and stdout are set to the same file descriptor.
@@ -129,6 +187,13 @@ class Tanmatsu:
 		# Turn on mouse events.
 		self.terminal_modes += [to.set_mode_mouse_up_down_tracking]
 		
+		# Turn on mouse movement events, if asked for.
+		match self.mouse_motion:
+			case ti.Mouse_motion.DRAG:
+				self.terminal_modes += [to.set_mode_mouse_button_motion_tracking]
+			case ti.Mouse_motion.ANY:
+				self.terminal_modes += [to.set_mode_mouse_any_motion_tracking]
+		
 		# Use variable length ASCII digits to report mouse location in order
 		# to support terminals of any size.
 		self.terminal_modes += [to.set_mode_mouse_report_format_digits]
@@ -170,6 +235,61 @@ class Tanmatsu:
 		self.selector.register(sys.stdin,          selectors.EVENT_READ, self.process_stdin_input)
 		self.selector.register(self.resize_pipe_r, selectors.EVENT_READ, self.process_resize_input)
 	
+	# Asks the terminal whether it supports synchronized output.
+	# 
+	# Terminals that don't understand the question ignore it, so it's followed
+	#   by a question that nearly every terminal answers. Once that answer
+	#   arrives, there's no point waiting for the first one any longer. If no
+	#   answer arrives within `timeout` seconds, the terminal is assumed to
+	#   not support synchronized output.
+	def __query_synchronized_output(self, timeout: float = 0.1) -> bool:
+		to.write_bytes(
+			to.str_request_mode(to.MODE_SYNCHRONIZED_OUTPUT) +
+			to.str_request_device_attributes()
+		)
+		
+		self.__awaiting_replies = True
+		
+		selector = selectors.DefaultSelector()
+		selector.register(sys.stdin, selectors.EVENT_READ)
+		
+		deadline = time.monotonic() + timeout
+		received = b''
+		
+		while not DEVICE_ATTRIBUTES.search(received):
+			remaining = deadline - time.monotonic()
+			
+			if remaining <= 0 or not selector.select(remaining):
+				break
+			
+			received += exhaust_file_descriptor(sys.stdin.fileno())
+		
+		selector.close()
+		
+		modes = {
+			int(match.group(1)): int(match.group(2))
+			for match in MODE_REPORT.finditer(received)
+		}
+		
+		# Anything else that arrived in the meantime (e.g., a key press) is
+		#   real input.
+		self.__pending_input = self.__filter_replies(received)
+		
+		# 0 means the mode isn't recognised, and 4 means it's permanently off.
+		return modes.get(to.MODE_SYNCHRONIZED_OUTPUT, 0) in (1, 2, 3)
+	
+	# A slow terminal (e.g., over SSH) may answer our queries after we've
+	#   given up waiting. Until the last answer (DA1) has arrived, take the
+	#   answers out of the input, so they don't reach widgets as key presses.
+	def __filter_replies(self, raw_input: bytes) -> bytes:
+		if not self.__awaiting_replies:
+			return raw_input
+		
+		if DEVICE_ATTRIBUTES.search(raw_input):
+			self.__awaiting_replies = False
+		
+		return DEVICE_ATTRIBUTES.sub(b"", MODE_REPORT.sub(b"", raw_input))
+	
 	def __teardown_selector(self):
 		os.close(self.resize_pipe_r)
 		os.close(self.resize_pipe_w)
@@ -188,35 +308,76 @@ class Tanmatsu:
 		
 		return False
 	
-	# Build a list, starting out from the root widget, and descending
-	# until we find the focused widget (i.e., the end of the focus chain).
-	def get_current_focus_chain(self):
+	def get_current_focus_chain(self) -> tuple[Widget, ...]:
+		"""
+		Returns the widgets from the root widget down to the focused widget
+		(i.e., the focus chain). Cached until the `focused_child` of any
+		widget changes.
+		"""
+		key = (Widget._focus_chain_revision, self.root_widget)
+		
+		if key == self.__focus_chain_key:
+			return self.__focus_chain
+		
+		# Start out from the root widget, and descend until we find the
+		#   focused widget (i.e., the end of the focus chain).
 		focus_chain = [self.root_widget]
 		while focus_chain[-1].focused_child is not None:
 			focus_chain.append(focus_chain[-1].focused_child)
-		return focus_chain
+		
+		self.__focus_chain_key = key
+		self.__focus_chain = tuple(focus_chain)
+		
+		return self.__focus_chain
 	
-	def get_current_focused_widget(self):
-		widget = self.root_widget
-		while widget.focused_child is not None:
-			widget = widget.focused_child
-		return widget
+	def get_current_focused_widget(self) -> Widget:
+		"""Returns the focused widget (i.e., the end of the focus chain)."""
+		return self.get_current_focus_chain()[-1]
 	
 	# Blocks. Waits for input on STDIN, or for a terminal resize, and then
 	# calls the appropriate function.
 	def process_input(self):
+		if self.__pending_input:
+			self.process_stdin_input()
+			return
+		
 		for (key, _) in self.selector.select():
 			key.data()  # call the handler function we stored in the data field
 	
 	def handle_mouse_event(self, data):
 		(button, modifier, state, position) = data
 		
-		# Start at the bottom of the focus chain (i.e., the currently focused
-		# widget), and go up until we find a widget that consumes the event.
-		focus_chain = self.get_current_focus_chain()
+		if self.__mouse_capture is not None and state != ti.Mouse_state.PRESSED:
+			widget = self.__mouse_capture
+			
+			if state == ti.Mouse_state.RELEASED:
+				self.__mouse_capture = None
+			
+			widget.mouse_event(button, modifier, state, position)
+			return
 		
-		for i in reversed(focus_chain):
+		click = (
+			state == ti.Mouse_state.PRESSED and
+			button in (ti.Mouse_button.LMB, ti.Mouse_button.MMB, ti.Mouse_button.RMB)
+		)
+		
+		# The widgets under the mouse, from the root widget down to the
+		#   deepest one, as drawn last frame.
+		widgets = self.hit_index.items_at(position.x, position.y)
+		
+		# Clicking focuses the deepest focusable widget under the mouse.
+		if click:
+			for i in reversed(widgets):
+				if self.focus(i):
+					break
+		
+		# Start at the deepest widget under the mouse, and go up until we find
+		#   a widget that consumes the event.
+		for i in reversed(widgets):
 			if i.mouse_event(button, modifier, state, position):
+				if click:
+					self.__mouse_capture = i
+				
 				return
 	
 	def handle_keyboard_event(self, data):
@@ -235,9 +396,11 @@ class Tanmatsu:
 				return
 	
 	def process_stdin_input(self):
-		raw_input = exhaust_file_descriptor(sys.stdin.fileno())
+		raw_input = self.__pending_input + self.__filter_replies(exhaust_file_descriptor(sys.stdin.fileno()))
+		self.__pending_input = b''
+		events = ti.coalesce_mouse_motion(ti.parse_input(raw_input))
 		
-		for (event_type, event_data) in ti.parse_input(raw_input):
+		for (event_type, event_data) in events:
 			match event_type:
 				case ti.Event_type.MOUSE:
 					self.handle_mouse_event(event_data)
@@ -258,108 +421,87 @@ class Tanmatsu:
 		os.write(self.resize_pipe_w, b"_")
 	
 	def tab(self, reverse=False):
-		# It's easier to operate on a list like this, rather than
-		# operate directly on the widgets themselves, as list indexing syntax
-		# greatly simplifies things. At the end of this function, we'll update
-		# the real focus chain in the widgets themselves based on this list.
-		focus_chain = self.get_current_focus_chain()
+		"""
+		Moves the focus to the next widget in the focus order (or the previous
+		widget, if `reverse`), wrapping around at the end.
 		
-		# We need to define a bunch of helper functions to help navigate
-		# the focus chain:
+		The focus order visits every focusable widget depth first, parents
+		before their children (see :meth:`get_focus_order`).
+		"""
+		(order, _, positions) = self.__focus_ring()
 		
-		# Goes down and returns the leftmost child widget, if possible.
-		# 
-		# The parameter `f` must be assigned to a function with one parameter,
-		# that converts said parameter to a list.
-		# 
-		# `f` can optionally produce a reversed list, in which case this
-		# function will return the rightmost child widget instead.
-		def get_down_and_left_or_none(f, widget):
-			try:
-				return f(widget.focusable_children.values())[0]
-			except (AttributeError, IndexError):
-				return None
-		
-		# Takes the widget to the right of `current_child` from among the
-		# children of `parent`. `current_child` must be a child of `parent`.
-		# 
-		# The parameter `f` must be assigned to a function with one parameter,
-		# that converts said parameter to a list.
-		# 
-		# `f` can optionally produce a reversed list, in which case this
-		# function will return the widget to the left instead.
-		def get_right_or_none(f, parent, current_child):
-			try:
-				for (i, v) in enumerate(f(parent.focusable_children.values())):
-					if v is current_child:
-						return f(parent.focusable_children.values())[i + 1]
-				
-				raise ValueError("`current_child` must be a child of `parent`.")
-			except IndexError:
-				return None
+		try:
+			i = positions[id(self.get_current_focused_widget())]
+		except KeyError:
+			# The focused widget isn't focusable any more, so start over
+			#   from the root widget.
+			i = 0
 		
-		def backward(focus_chain):
-			f = lambda x: list(reversed(x))
-			
-			# Is there a widget to the left?
-			try:
-				left = get_right_or_none(f, focus_chain[-2], focus_chain[-1])
-				
-				# If the previous line didn't throw an exception, go left!
-				focus_chain[-1] = left
-			except IndexError:
-				left = None
-			
-			# If we successfully went left, or we're at the root widget,
-			# go one level down and to the rightmost widget.
-			# Repeat until we are at the deepest, rightmost widget.
-			# 
-			# This leaves us at the deepest and rightmost widget,
-			# that is one widget to the left of the previously focused widget.
-			if left or len(focus_chain) == 1:
-				while down := get_down_and_left_or_none(f, focus_chain[-1]):
-					focus_chain.append(down)
-			else:
-				# There's nowhere left to go but up.
-				focus_chain.pop()
-			
-			return focus_chain
+		self.focus(order[(i + (-1 if reverse else 1)) % len(order)])
+	
+	def focus(self, widget: Widget) -> bool:
+		"""
+		Moves the focus to `widget`.
 		
-		def forward(focus_chain):
-			f = lambda x: list(x)
-			
-			# Is there a widget below?
-			down = get_down_and_left_or_none(f, focus_chain[-1])
-			
-			# Go down, if a widget did exist below.
-			if down:
-				focus_chain.append(down)
-				return focus_chain  # We're done, that's all we needed to do!
+		:return: Whether `widget` could be focused, i.e., whether it is in the
+		  focus order (see :meth:`get_focus_order`).
+		:rtype: bool
+		"""
+		(_, parents, positions) = self.__focus_ring()
+		
+		if id(widget) not in positions:
+			return False
+		
+		# Point each widget between the root and the newly focused widget at
+		#   the next widget down.
+		widget.focused_child = None
+		
+		while (parent := parents[id(widget)]) is not None:
+			parent.focused_child = widget
+			widget = parent
+		
+		return True
+	
+	def get_focus_order(self) -> list[Widget]:
+		"""
+		Returns every focusable widget, in the order that :meth:`tab` visits
+		them. Cached until the focusable children of any widget change.
+		"""
+		(order, _, _) = self.__focus_ring()
+		return order
+	
+	# Flattens the tree of focusable widgets into a list (in depth first
+	#   order), along with the parent of each widget and the position of each
+	#   widget in the list, so that tabbing is a lookup rather than a walk of
+	#   the tree.
+	def __focus_ring(self) -> tuple[list[Widget], dict[int, Widget | None], dict[int, int]]:
+		key = (Widget._focus_revision, self.root_widget)
+		
+		if key == self.__focus_ring_key:
+			return self.__focus_ring_value
+		
+		order = []
+		parents = { id(self.root_widget): None }
+		
+		stack = [self.root_widget]
+		
+		while stack:
+			widget = stack.pop()
+			order.append(widget)
 			
-			# Failing that...
+			children = list(widget.focusable_children.values())
 			
-			# Try to go right. If that fails, go up. Repeat until we either
-			# successfully go right, or go up so far we hit the root widget.
-			while focus_chain[-1] is not self.root_widget:
-				right = get_right_or_none(f, focus_chain[-2], focus_chain[-1])
-				
-				if right:
-					focus_chain[-1] = right
-					break
-				
-				focus_chain = focus_chain[:-1]
+			for child in children:
+				parents[id(child)] = widget
 			
-			return focus_chain
+			stack.extend(reversed(children))
 		
-		if reverse:
-			focus_chain = backward(focus_chain)
-		else:
-			focus_chain = forward(focus_chain)
+		positions = { id(widget): i for (i, widget) in enumerate(order) }
 		
-		# Now we have the updated `focus_chain` list, traverse it and
-		# update the `focused_child` for each widget.
-		for (parent, focused_child) in zip(focus_chain, focus_chain[1:] + [None]):
-			parent.focused_child = focused_child
+		self.__focus_ring_key = key
+		self.__focus_ring_value = (order, parents, positions)
+		
+		return self.__focus_ring_value
 	
 	def draw(self):
 		# Find the end of the focus chain, and mark that widget as focused
@@ -385,6 +527,9 @@ class Tanmatsu:
 		
 		# Draw root widget to the screenbuffer
 		clip = Rectangle(0, 0, self.screenbuffer.w, self.screenbuffer.h)
+		
+		self.hit_index.clear()
+		self.hit_index.add(self.root_widget.size & clip, self.root_widget)
 		self.root_widget.draw(self.screenbuffer, clip=clip)
 		
 		# Output the screenbuffer to the screen (stdout)
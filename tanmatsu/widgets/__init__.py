@@ -5,9 +5,11 @@ from .box import Box
 from .button import Button
 from .container import Container
 # Container widgets
-from .flexbox import FlexBox, FlexDirection, JustifyContent
+from .flexbox import FlexBox, FlexDirection, FlexWrap, JustifyContent
+from .grid import Grid
 from .list import List
+from .modellist import ModelList
 from .scrollable import Scrollable
-from .tabbox import TabBox
+from .tabbox import LazyTab, TabBox
 from .textbox import TextBox
 from .textlog import TextLog
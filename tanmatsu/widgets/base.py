@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
 
 import tanmatsu.input as ti
@@ -21,21 +23,135 @@ class Widget(ABC):
 	:paramtype theme: tanmatsu.theme.Theme
 	"""
 	
+	# Incremented whenever the focusable children of any widget change, so
+	#   that `Tanmatsu` knows to rebuild its cached focus order.
+	_focus_revision = 0
+	
+	# Incremented whenever the `focused_child` of any widget changes, so that
+	#   `Tanmatsu` knows to rebuild its cached focus chain.
+	_focus_chain_revision = 0
+	
 	def __init__(
 		self,
 		w = size.Auto(),
 		h = size.Auto(),
 		theme: theme.Theme = theme.DefaultTheme(),
 	):
-		self.w = w
-		self.h = h
+		self.__parent = None
+		
+		self.__w = w
+		self.__h = h
 		self.theme = theme
 		
 		self.focused = False
-		self.focused_child = None
+		self.__focused_child = None
+		self.__focusable_children = { }
 		
 		self.__calculated_size = None
 		self.__available_space = None
+		
+		# Incremented by `invalidate_measure()` on this widget, and on every
+		#   widget it contains, as the size a container measures depends on the
+		#   sizes of its children. Anything computed from measurements (e.g.,
+		#   a `FlexBox` layout) can be cached until this changes.
+		self._measure_revision = 0
+		
+		# Likewise, incremented by `invalidate_draw()`.
+		self._draw_revision = 0
+		
+		self.__measure_cache = { }
+		self.__measure_cache_revision = 0
+	
+	@property
+	def w(self) -> size.Size:
+		"""
+		:getter: Returns the size used for calculating the width of this widget.
+		:setter: Sets the size used for calculating the width of this widget.
+		"""
+		return self.__w
+	
+	@w.setter
+	def w(self, w: size.Size):
+		self.__w = w
+		
+		if self.__parent is not None:
+			self.__parent._child_size_changed(self)
+	
+	@property
+	def h(self) -> size.Size:
+		"""
+		:getter: Returns the size used for calculating the height of this widget.
+		:setter: Sets the size used for calculating the height of this widget.
+		"""
+		return self.__h
+	
+	@h.setter
+	def h(self, h: size.Size):
+		self.__h = h
+		
+		if self.__parent is not None:
+			self.__parent._child_size_changed(self)
+	
+	@property
+	def focused_child(self) -> Widget | None:
+		"""
+		:getter: Returns the child that has focus, i.e., the next widget down
+		         the focus chain, or `None` if this widget is at the end of it.
+		:setter: Sets the child that has focus.
+		"""
+		return self.__focused_child
+	
+	@focused_child.setter
+	def focused_child(self, child: Widget | None):
+		if child is self.__focused_child:
+			return
+		
+		self.__focused_child = child
+		Widget._focus_chain_revision += 1
+	
+	@property
+	def focusable_children(self) -> dict[str, Widget]:
+		"""
+		:getter: Returns the children that can be focused, in the order that
+		         :meth:`tanmatsu.Tanmatsu.tab` visits them.
+		:setter: Sets the children that can be focused.
+		"""
+		return self.__focusable_children
+	
+	@focusable_children.setter
+	def focusable_children(self, children: dict[str, Widget]):
+		self.__focusable_children = children
+		self.invalidate_focus_order()
+	
+	def invalidate_focus_order(self):
+		"""
+		Discards the cached focus order. Must be called whenever the widgets in
+		:attr:`focusable_children` change without it being set (e.g., adding
+		a child to the dictionary in place).
+		"""
+		Widget._focus_revision += 1
+	
+	def _adopt(self, child: Widget):
+		"""
+		Records that this widget contains `child`, so that calling
+		:meth:`invalidate_measure` on `child` invalidates this widget too.
+		Containers must call this for every child they are given. Children
+		that aren't widgets (e.g., a :class:`LazyTab`) are ignored.
+		"""
+		if isinstance(child, Widget):
+			child.__parent = self
+	
+	def _child_size_changed(self, child: Widget):
+		"""
+		Called when the :attr:`w` or :attr:`h` of `child` (see :meth:`_adopt`)
+		is replaced. Does nothing by default.
+		"""
+		pass
+	
+	def _disown(self, child: Widget):
+		"""Undoes :meth:`_adopt`, once `child` has been removed."""
+		if isinstance(child, Widget) and child.__parent is self:
+			child.__parent = None
 	
 	@property
 	def size(self) -> Dimensions | None:
@@ -59,11 +175,79 @@ class Widget(ABC):
 		:param size: The size of this widget.
 		:paramtype size: Dimensions
 		"""
-		self.__calculated_size = Rectangle(position.x, position.y, size.w, size.h)
+		# Layout runs every frame, so reuse the rectangles from the last
+		#   layout rather than allocating new ones.
+		if self.__calculated_size is None:
+			self.__calculated_size = Rectangle(position.x, position.y, size.w, size.h)
+			
+			# The remaining space after subtracting decorations,
+			#   like scrollbars or borders.
+			self.__available_space = Rectangle(position.x, position.y, size.w, size.h)
+		else:
+			self.__calculated_size.set(position.x, position.y, size.w, size.h)
+			self.__available_space.set(position.x, position.y, size.w, size.h)
+	
+	def measure(self, available: Dimensions) -> Dimensions:
+		"""
+		Returns the size this widget would like to be (e.g., the size of its
+		label, or of its text), given `available` space. Used to resolve
+		:class:`tanmatsu.size.Content` sizes.
+		
+		The result may be larger than `available` if the widget's content
+		doesn't fit. Results are cached per `available` space, until
+		:meth:`invalidate_measure` is called.
+		
+		:param available: The space the widget could be given.
+		:paramtype available: Dimensions
+		"""
+		if self.__measure_cache_revision != self._measure_revision:
+			self.__measure_cache = { }
+			self.__measure_cache_revision = self._measure_revision
 		
-		# The remaining space after subtracting decorations,
-		#   like scrollbars or borders.
-		self.__available_space = Rectangle(position.x, position.y, size.w, size.h)
+		key = (available.w, available.h)
+		
+		try:
+			return self.__measure_cache[key]
+		except KeyError:
+			pass
+		
+		self.__measure_cache[key] = self._measure(available)
+		return self.__measure_cache[key]
+	
+	def invalidate_measure(self):
+		"""
+		Discards cached :meth:`measure` results of this widget, and of the
+		widgets containing it. Must be called whenever the widget changes in
+		a way that affects the size it would like to be.
+		"""
+		widget = self
+		
+		while widget is not None:
+			widget._measure_revision += 1
+			widget._draw_revision += 1
+			widget = widget.__parent
+	
+	def invalidate_draw(self):
+		"""
+		Records that the widget, and so the widgets containing it, would now
+		be drawn differently (e.g., it was scrolled), for containers that
+		reuse an earlier drawing (see :class:`TabBox`). Must be called whenever
+		the widget changes in a way that :meth:`invalidate_measure` doesn't
+		already cover.
+		"""
+		widget = self
+		
+		while widget is not None:
+			widget._draw_revision += 1
+			widget = widget.__parent
+	
+	def _measure(self, available: Dimensions) -> Dimensions:
+		"""
+		Computes the result of :meth:`measure`. Widgets that have a natural
+		size should override this. By default, widgets would like all the
+		space available.
+		"""
+		return Dimensions(available.w, available.h)
 	
 	@abstractmethod
 	def draw(self, s: Screenbuffer, clip: Rectangle | None = None):
@@ -83,11 +267,34 @@ class Widget(ABC):
 		   The widget must pass :attr:`self._Widget__available_space` to the
 		   :meth:`geometry.Rectangle.__and__` method of the clip it
 		   receives, and then pass the resulting clip to the child widget when
-		   calling :meth:`draw` on it, so that the clips correctly combine and
+		   calling :meth:`_draw_child`, so that the clips correctly combine and
 		   propogate down the chain.
 		"""
 		pass
 	
+	def _draw_child(self, s: Screenbuffer, child: Widget, clip: Rectangle | None):
+		"""
+		Draws child widget `child`, clipped to `clip`, unless none of the child
+		would be visible. That way, hidden subtrees (e.g., scrolled out of
+		view) cost nothing to draw.
+		
+		The visible part of the child is recorded in the screenbuffer's
+		:attr:`tanmatsu.Screenbuffer.hit_index`, if it has one.
+		"""
+		size = child.size
+		
+		if clip is not None:
+			if clip.is_empty:
+				return
+			
+			if size is not None and (size.is_empty or not size.intersects(clip)):
+				return
+		
+		if s.hit_index is not None and size is not None:
+			s.hit_index.add(size if clip is None else size & clip, child)
+		
+		child.draw(s, clip=clip)
+	
 	def mouse_event(
 		self,
 		button: ti.Mouse_button,
@@ -1,5 +1,5 @@
 from tanmatsu import draw, theme
-from tanmatsu.geometry import Rectangle
+from tanmatsu.geometry import Dimensions, Rectangle
 from tanmatsu.screenbuffer import Screenbuffer
 from tanmatsu.wctools import wccrop
 
@@ -44,6 +44,7 @@ class Box(Widget):
 	@border.setter
 	def border(self, border: bool):
 		self.__border = border
+		self.invalidate_measure()
 	
 	@property
 	def border_label(self) -> str | None:
@@ -63,12 +64,18 @@ class Box(Widget):
 		:paramtype label: str | None
 		"""
 		self.__border_label = label
+		self.invalidate_measure()
 	
 	def layout(self, *args, **kwargs):
 		super().layout(*args, **kwargs)
 		
 		if self.__border:
-			self.__border_rectangle = self._Widget__available_space.duplicate()
+			space = self._Widget__available_space
+			
+			if self.__border_rectangle is None:
+				self.__border_rectangle = space.duplicate()
+			else:
+				self.__border_rectangle.set(space.x, space.y, space.w, space.h)
 			
 			self._Widget__available_space.x += 1
 			self._Widget__available_space.y += 1
@@ -79,6 +86,24 @@ class Box(Widget):
 				available_width = self.__border_rectangle.w - 4
 				self.__cropped_label = wccrop(self.__border_label, available_width)
 	
+	def _measure(self, available: Dimensions) -> Dimensions:
+		if not self.__border:
+			return self._measure_content(available)
+		
+		content = self._measure_content(Dimensions(
+			max(available.w - 2, 0),
+			max(available.h - 2, 0)
+		))
+		
+		return Dimensions(content.w + 2, content.h + 2)
+	
+	def _measure_content(self, available: Dimensions) -> Dimensions:
+		"""
+		Like :meth:`Widget._measure`, but excluding the border. Widgets
+		inheriting from this class should override this method instead.
+		"""
+		return Dimensions(available.w, available.h)
+	
 	def draw(self, s: Screenbuffer, clip: Rectangle | None = None):
 		super().draw(s, clip=clip)
 		
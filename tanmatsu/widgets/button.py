@@ -4,7 +4,7 @@ from tri_declarative import with_meta
 from wcwidth import wcswidth
 
 import tanmatsu.input as ti
-from tanmatsu.geometry import Rectangle
+from tanmatsu.geometry import Dimensions, Rectangle
 from tanmatsu.screenbuffer import Screenbuffer
 from tanmatsu.wctools import wccrop
 
@@ -48,6 +48,7 @@ class Button(Box):
 	@label.setter
 	def label(self, value: str):
 		self.__label = value
+		self.invalidate_measure()
 	
 	@property
 	def callback(self) -> Callable[..., NoReturn] | None:
@@ -62,6 +63,9 @@ class Button(Box):
 	def callback(self, value: Callable[..., NoReturn] | None):
 		self.__callback = value
 	
+	def _measure_content(self, available: Dimensions) -> Dimensions:
+		return Dimensions(max(wcswidth(self.__label), 0), 1)
+	
 	def draw(self, s: Screenbuffer, clip: Rectangle | None = None):
 		super().draw(s, clip=clip)
 		
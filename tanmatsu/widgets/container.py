@@ -19,6 +19,14 @@ class Container(Widget):
 		
 		self.children = children
 		
+		for i in children.values():
+			self._adopt(i)
+		
+		# Incremented whenever a child is added or deleted, or the size of
+		#   a child is replaced, so that subclasses can cache things computed
+		#   from the children (see `FlexBox`).
+		self._children_revision = 0
+		
 		# Used when changing widget focus with the `tab` key in `tanmatsu.py`.
 		# 
 		# If a subset of child widgets ought to be skipped when cycling focus
@@ -29,6 +37,10 @@ class Container(Widget):
 		# functionality is required.
 		self.focusable_children = children
 	
+	def _child_size_changed(self, child: Widget):
+		self._children_revision += 1
+		self.invalidate_measure()
+	
 	def add_child(self, name: str, widget: Widget):
 		"""
 		Add a child object `widget` named `name`.
@@ -41,7 +53,14 @@ class Container(Widget):
 		:param widget: The widget object to add.
 		:paramtype widget: Widget
 		"""
+		if name in self.children:
+			self._disown(self.children[name])
+		
 		self.children[name] = widget
+		self._adopt(widget)
+		self._children_revision += 1
+		self.invalidate_focus_order()
+		self.invalidate_measure()
 	
 	def del_child_by_name(self, name: str):
 		"""
@@ -52,7 +71,11 @@ class Container(Widget):
 		
 		:raises KeyError: if the name does not exist in the children.
 		"""
+		self._disown(self.children[name])
 		del self.children[name]
+		self._children_revision += 1
+		self.invalidate_focus_order()
+		self.invalidate_measure()
 	
 	def del_child_by_widget(self, widget: Widget):
 		"""
@@ -65,6 +88,10 @@ class Container(Widget):
 		"""
 		for (child_name, child_widget) in self.children.items():
 			if child_widget == widget:
+				self._disown(child_widget)
 				del self.children[child_name]
+				self._children_revision += 1
+				self.invalidate_focus_order()
+				self.invalidate_measure()
 				return
 		raise KeyError(str(widget))
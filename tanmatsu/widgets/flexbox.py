@@ -1,14 +1,12 @@
+import bisect
 from enum import Enum, auto
-from fractions import Fraction
-from math import floor
-from typing import Any, Callable
 
 from tri_declarative import with_meta
 
+from tanmatsu import size
 from tanmatsu.geometry import Dimensions, Point, Rectangle
 from tanmatsu.screenbuffer import Screenbuffer
 
-from .base import Widget
 from .box import Box
 from .container import Container
 from .scrollable import Scrollable
@@ -51,6 +49,19 @@ class JustifyContent(Enum):
 	items, and any item and the nearest edge, are the same.
 	"""
 
+
+class FlexWrap(Enum):
+	NOWRAP = auto()
+	"""Keep all the items on a single line, shrinking them to fit."""
+	
+	WRAP   = auto()
+	"""
+	Break the items onto multiple lines, each item starting a new line if it
+	doesn't fit on the current one. Lines are stacked along the cross axis,
+	which scrolls if they don't all fit.
+	"""
+
+
 @with_meta
 class FlexBox(Container, Box, Scrollable):
 	"""
@@ -62,6 +73,19 @@ class FlexBox(Container, Box, Scrollable):
 	
 	:param justify_content: How the items should be distributed along the flex.
 	:paramtype justify_content: JustifyContent
+	
+	:param flex_wrap: Whether the items should wrap onto multiple lines.
+	:paramtype flex_wrap: FlexWrap
+	
+	:param row_gap: The gap between rows: between the items of a
+	                :attr:`FlexDirection.COLUMN` FlexBox, or between the
+	                lines of a wrapping :attr:`FlexDirection.ROW` FlexBox.
+	:paramtype row_gap: int
+	
+	:param column_gap: The gap between columns: between the items of a
+	                   :attr:`FlexDirection.ROW` FlexBox, or between the
+	                   lines of a wrapping :attr:`FlexDirection.COLUMN` FlexBox.
+	:paramtype column_gap: int
 	"""
 	
 	def __init__(
@@ -69,6 +93,9 @@ class FlexBox(Container, Box, Scrollable):
 		*args,
 		flex_direction: FlexDirection = FlexDirection.COLUMN,
 		justify_content: JustifyContent = JustifyContent.FLEX_START,
+		flex_wrap: FlexWrap = FlexWrap.NOWRAP,
+		row_gap: int = 0,
+		column_gap: int = 0,
 		**kwargs,
 	):
 		super().__init__(*args, **kwargs)
@@ -78,6 +105,30 @@ class FlexBox(Container, Box, Scrollable):
 		
 		self.__justify_content = None  # Silence typechecker
 		self.justify_content = justify_content
+		
+		self.__flex_wrap = None  # Silence typechecker
+		self.flex_wrap = flex_wrap
+		
+		self.__row_gap = None  # Silence typechecker
+		self.row_gap = row_gap
+		
+		self.__column_gap = None  # Silence typechecker
+		self.column_gap = column_gap
+		
+		# See `__size_cache()`
+		self.__size_cache_key = None
+		self.__sizes = { }
+		self.__children = []
+		self.__visible = range(0, 0)
+		self.__w_plan = None
+		self.__h_plan = None
+		self.__measure_revision = None
+		
+		# See `__break_lines()`
+		self.__line_breaks = []
+		self.__line_lengths = []
+		self.__break_sizes = None
+		self.__break_gap = None
 	
 	@property
 	def flex_direction(self) -> FlexDirection:
@@ -90,6 +141,7 @@ class FlexBox(Container, Box, Scrollable):
 	@flex_direction.setter
 	def flex_direction(self, flex_direction: FlexDirection):
 		self.__flex_direction = flex_direction
+		self.invalidate_measure()
 	
 	@property
 	def justify_content(self) -> JustifyContent:
@@ -102,372 +154,518 @@ class FlexBox(Container, Box, Scrollable):
 	@justify_content.setter
 	def justify_content(self, justify_content: JustifyContent):
 		self.__justify_content = justify_content
+		self.invalidate_draw()
+	
+	@property
+	def flex_wrap(self) -> FlexWrap:
+		"""
+		:getter: Returns the flex wrap setting.
+		:setter: Sets the flex wrap setting.
+		"""
+		return self.__flex_wrap
+	
+	@flex_wrap.setter
+	def flex_wrap(self, flex_wrap: FlexWrap):
+		self.__flex_wrap = flex_wrap
+		self.invalidate_measure()
+	
+	@property
+	def row_gap(self) -> int:
+		"""
+		:getter: Returns the gap between rows.
+		:setter: Sets the gap between rows.
+		"""
+		return self.__row_gap
+	
+	@row_gap.setter
+	def row_gap(self, row_gap: int):
+		self.__row_gap = row_gap
+		self.invalidate_measure()
+	
+	@property
+	def column_gap(self) -> int:
+		"""
+		:getter: Returns the gap between columns.
+		:setter: Sets the gap between columns.
+		"""
+		return self.__column_gap
+	
+	@column_gap.setter
+	def column_gap(self, column_gap: int):
+		self.__column_gap = column_gap
+		self.invalidate_measure()
 	
 	def layout(self, *args, **kwargs):
 		super().layout(*args, **kwargs)
 		
 		# No children? Nothing to do.
 		if len(self.children) == 0:
+			self.__visible = range(0, 0)
 			self.layout_scrollbar(Dimensions(0, 0))
 			self.scroll()
 			return
 		
-		def calc_widget_sizes(space: Rectangle) -> (
-			tuple[dict[Widget, int], dict[Widget, int], Dimensions]
-		):
-			if self.flex_direction == FlexDirection.ROW:
-				x_sizes = self.__calc_children_sizes_flex_axis(
-					space.w,
-					lambda widget: widget.w
-				)
-				y_sizes = self.__calc_children_sizes_nonflex_axis(
-					space.h,
-					lambda widget: widget.h
-				)
-				
-				content_size = Dimensions(
-					sum(x_sizes.values()),
-					max(y_sizes.values(), default=0)
-				)
+		# Calculate the size of all the children widgets
+		# ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+		
+		space = self._Widget__available_space
+		cache = self.__size_cache()
+		
+		try:
+			entry = cache[(space.w, space.h)]
+		except KeyError:
+			if self.flex_wrap == FlexWrap.WRAP:
+				entry = self.__calc_wrapped_layout(space)
 			else:
-				x_sizes = self.__calc_children_sizes_nonflex_axis(
-					space.w,
-					lambda widget: widget.w
-				)
-				y_sizes = self.__calc_children_sizes_flex_axis(
-					space.h,
-					lambda widget: widget.h
-				)
-				
-				content_size = Dimensions(
-					max(x_sizes.values(), default=0),
-					sum(y_sizes.values())
-				)
+				entry = self.__calc_layout(space)
+			
+			# Old entries are only useful if the FlexBox is resized back to
+			#   a previous size, so don't let them accumulate.
+			if len(cache) >= 16:
+				cache.clear()
 			
-			return (x_sizes, y_sizes, content_size)
+			cache[(space.w, space.h)] = entry
 		
-		# Calculate the size of all the children widgets
-		# ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+		(x_sizes, y_sizes, x_offsets, y_offsets, content_size, culling) = entry
+		
+		# Scroll bar
+		# ‾‾‾‾‾‾‾‾‾‾
 		
-		# We have to calculate the size of all the children widgets
-		#   as if there were no scrollbars.
-		# Then, if the total size of all the widgets exceeds the
-		#   total space available, we will need to subtract extra
-		#   space to accomodate the presence of scrollbar(s), and recalculate
-		#   the size of all the widgets, taking into account the decreased
-		#   amount of space available.
+		# Layout the scrollbar before the children, so that the children are
+		#   positioned using the clamped scroll position.
+		self.layout_scrollbar(content_size)
+		self.scroll()
+		
+		# Layout the visible children widgets
+		# ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
 		
-		(x_sizes, y_sizes, content_size) = calc_widget_sizes(self._Widget__available_space)
+		# Only the children that intersect the viewport are laid out (and later
+		#   drawn). The rest keep whatever layout they had, until they are
+		#   scrolled into view.
+		self.__visible = self.__visible_range(*culling)
+		
+		origin = Point(
+			self._Widget__available_space.x - self._Scrollable__scroll_position.x,
+			self._Widget__available_space.y - self._Scrollable__scroll_position.y
+		)
+		
+		for i in self.__visible:
+			self.__children[i].layout(
+				Point(origin.x + x_offsets[i], origin.y + y_offsets[i]),
+				Dimensions(x_sizes[i], y_sizes[i])
+			)
+	
+	# Returns the cache of children layouts, keyed by available space, after
+	#   emptying it if anything they depend on has changed since.
+	# 
+	# Also (re)compiles the `size.FlexPlan`s for the widths and heights of the
+	#   children whenever the cache is emptied.
+	def __size_cache(self) -> dict[tuple[int, int], tuple]:
+		# Replacing the size of a child bumps `self._children_revision`, and
+		#   sizes modified in place bump `Size._revision`, so checking the cache
+		#   doesn't have to look at every child. The number of children catches
+		#   children added to `self.children` directly.
+		key = (
+			self._children_revision,
+			len(self.children),
+			size.Size._revision,
+			self.flex_direction,
+			self.justify_content,
+			self.flex_wrap,
+			self.row_gap,
+			self.column_gap,
+		)
+		
+		if key != self.__size_cache_key:
+			self.__size_cache_key = key
+			self.__sizes = { }
+			self.__children = list(self.children.values())
+			self.__w_plan = size.FlexPlan([ i.w for i in self.__children ])
+			self.__h_plan = size.FlexPlan([ i.h for i in self.__children ])
+		
+		# `Content` sizes also depend on what the children measure.
+		if (
+			(self.__w_plan.has_content or self.__h_plan.has_content) and
+			self.__measure_revision != self._measure_revision
+		):
+			self.__measure_revision = self._measure_revision
+			self.__sizes = { }
+		
+		return self.__sizes
+	
+	# Returns the measured widths and heights of the children, if any of them
+	#   have a `Content` size. Otherwise returns `None`s, so that children are
+	#   only measured when necessary.
+	def __measure_children(self, w: int, h: int) -> tuple[list[int] | None, list[int] | None]:
+		if not (self.__w_plan.has_content or self.__h_plan.has_content):
+			return (None, None)
+		
+		available = Dimensions(w, h)
+		measured = [ i.measure(available) for i in self.__children ]
+		
+		return ([ i.w for i in measured ], [ i.h for i in measured ])
+	
+	# The gap between items along the flex axis (main gap), and between lines
+	#   of items (cross gap).
+	def __gaps(self) -> tuple[int, int]:
+		if self.flex_direction == FlexDirection.ROW:
+			return (self.column_gap, self.row_gap)
+		else:
+			return (self.row_gap, self.column_gap)
+	
+	# Layouts are worked out along the main (flex) axis and the cross axis,
+	#   so that the same code handles both directions. These convert a pair
+	#   of values for the main and cross axes to a pair for the x and y axes,
+	#   and back again.
+	def __to_xy(self, main, cross) -> tuple:
+		if self.flex_direction == FlexDirection.ROW:
+			return (main, cross)
+		else:
+			return (cross, main)
+	
+	def __from_xy(self, x, y) -> tuple:
+		return self.__to_xy(x, y)  # Swapping is its own inverse
+	
+	# Single line layout
+	# ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+	
+	# Returns the sizes and offsets of the children, the content size, and the
+	#   arguments for `__visible_range()`.
+	# 
+	# We have to calculate the size of all the children widgets
+	#   as if there were no scrollbars.
+	# Then, if the total size of all the widgets exceeds the
+	#   total space available, we need to subtract extra
+	#   space to accomodate the presence of scrollbar(s), and use the sizes
+	#   calculated for the decreased amount of space available instead.
+	# 
+	# A scrollbar takes up exactly one row or column, so both outcomes
+	#   are resolved in the same pass over the children.
+	def __calc_layout(self, space: Rectangle) -> tuple:
+		(main_gap, _) = self.__gaps()
+		gaps = main_gap * (len(self.__children) - 1)
+		
+		(w_content, h_content) = self.__measure_children(space.w, space.h)
+		
+		if self.flex_direction == FlexDirection.ROW:
+			(x_full, x_less) = self.__w_plan.flex(space.w - gaps, space.w - 1 - gaps, content=w_content)
+			(y_full, y_less) = self.__h_plan.nonflex(space.h, space.h - 1, content=h_content)
+		else:
+			(x_full, x_less) = self.__w_plan.nonflex(space.w, space.w - 1, content=w_content)
+			(y_full, y_less) = self.__h_plan.flex(space.h - gaps, space.h - 1 - gaps, content=h_content)
+		
+		(x_sizes, y_sizes) = (x_full, y_full)
+		content_size = self.__content_size(x_sizes, y_sizes, gaps)
 		
 		# Get the actual area we have available to layout widgets in,
 		#   minus any space required by any scrollbars.
 		usable_space = self.get_scrollable_area(content_size)
 		
-		# Recalculate widget sizes (if necessary)
-		# ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
-		
 		hori_too_big = self.flex_direction == FlexDirection.ROW    and content_size.w > usable_space.w
 		vert_too_big = self.flex_direction == FlexDirection.COLUMN and content_size.h > usable_space.h
 		
-		if (hori_too_big or vert_too_big):
-			(x_sizes, y_sizes, content_size) = calc_widget_sizes(self._Widget__available_space)
+		if hori_too_big or vert_too_big:
+			x_sizes = x_full if usable_space.w == space.w else x_less
+			y_sizes = y_full if usable_space.h == space.h else y_less
+			
+			content_size = self.__content_size(x_sizes, y_sizes, gaps)
+			usable_space = self.get_scrollable_area(content_size)
 		
-		# Layout all the children widgets
-		# ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+		# Offsets
+		# ‾‾‾‾‾‾‾
 		
-		match self.justify_content:
-			case JustifyContent.FLEX_START:
-				self.__layout_flex_start(x_sizes, y_sizes)
-			case JustifyContent.FLEX_END:
-				self.__layout_flex_end(x_sizes, y_sizes)
-			case JustifyContent.CENTER:
-				self.__layout_flex_center(x_sizes, y_sizes)
-			case JustifyContent.SPACE_BETWEEN:
-				self.__layout_flex_space_between(x_sizes, y_sizes)
-			case JustifyContent.SPACE_AROUND:
-				self.__layout_flex_space_around(x_sizes, y_sizes)
-			case JustifyContent.SPACE_EVENLY:
-				self.__layout_flex_space_evenly(x_sizes, y_sizes)
-			case _:
-				raise NotImplementedError("Unimplemented justify_content value")
+		(main_sizes, _) = self.__from_xy(x_sizes, y_sizes)
+		(main_space, _) = self.__from_xy(usable_space.w, usable_space.h)
 		
-		self.layout_scrollbar(content_size)
-		self.scroll()
-	
-	def __layout_flex_start(self,
-		x_sizes: dict[Widget, int],
-		y_sizes: dict[Widget, int],
-		start_pos_offset: int = 0,
-		gap: int = 0
-	):
-		curr_pos = self._Widget__available_space.top_left()
+		(curr_pos, gap) = self.__justify(sum(main_sizes) + gaps, main_space, len(main_sizes))
+		gap += main_gap
+		
+		# As the children are laid out one after the other (and no size is
+		#   negative), the start and end offsets are in ascending order, and
+		#   the children that are in view can be found with a binary search.
+		starts = []
+		ends = []
 		
+		for i in main_sizes:
+			starts.append(curr_pos)
+			ends.append(curr_pos + i)
+			curr_pos += i + gap
+		
+		(x_offsets, y_offsets) = self.__to_xy(starts, [0] * len(starts))
+		
+		return (x_sizes, y_sizes, x_offsets, y_offsets, content_size, (starts, ends, None))
+	
+	def __content_size(self, x_sizes: list[int], y_sizes: list[int], gaps: int) -> Dimensions:
 		if self.flex_direction == FlexDirection.ROW:
-			curr_pos.x += start_pos_offset
+			return Dimensions(sum(x_sizes) + gaps, max(y_sizes, default=0))
 		else:
-			curr_pos.y += start_pos_offset
-		
-		for i in self.children.values():
-			widget_pos = Point(
-				curr_pos.x - self._Scrollable__scroll_position.x,
-				curr_pos.y - self._Scrollable__scroll_position.y
-			)
-			widget_size = Dimensions(x_sizes[i], y_sizes[i])
-			
-			# Layout the widget
-			i.layout(widget_pos, widget_size)
-			
-			# Update the position for the next widget
-			if self.flex_direction == FlexDirection.ROW:
-				curr_pos.x += widget_size.w + gap
-			else:
-				curr_pos.y += widget_size.h + gap
+			return Dimensions(max(x_sizes, default=0), sum(y_sizes) + gaps)
 	
-	def __layout_flex_end(self,
-		x_sizes: dict[Widget, int],
-		y_sizes: dict[Widget, int]
-	):
-		# Keep track of the current position for drawing
-		curr_pos = self._Widget__available_space.top_right()
+	# Wrapped layout
+	# ‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+	
+	# Like `__calc_layout()`, but breaking the children onto multiple lines.
+	# 
+	# Each child is sized along the main axis on its own (as if the main axis
+	#   weren't flexed), so that an `Auto` child takes up a whole line. Along
+	#   the cross axis, each line is as big as its biggest `FixedInteger` or
+	#   `Fraction` child, and `Auto` children stretch to the size of their
+	#   line. Lines made up only of `Auto` children share whatever space is
+	#   left along the cross axis.
+	def __calc_wrapped_layout(self, space: Rectangle) -> tuple:
+		(main_space, cross_space) = self.__from_xy(space.w, space.h)
+		
+		layout = self.__calc_wrapped_layout_for(main_space, cross_space)
+		usable_space = self.get_scrollable_area(layout[4])
+		
+		# A scrollbar along the cross axis takes space away from the main axis,
+		#   so the lines have to be broken again.
+		if (usable_space.w, usable_space.h) != (space.w, space.h):
+			(main_space, cross_space) = self.__from_xy(usable_space.w, usable_space.h)
+			layout = self.__calc_wrapped_layout_for(main_space, cross_space)
+		
+		return layout
+	
+	def __calc_wrapped_layout_for(self, main_space: int, cross_space: int) -> tuple:
+		(main_gap, cross_gap) = self.__gaps()
+		(main_plan, cross_plan) = self.__from_xy(self.__w_plan, self.__h_plan)
+		
+		(main_content, cross_content) = self.__from_xy(
+			*self.__measure_children(*self.__to_xy(main_space, cross_space))
+		)
+		
+		(main_sizes,) = main_plan.nonflex(main_space, content=main_content)
+		(cross_sizes,) = cross_plan.nonflex(cross_space, content=cross_content)
+		
+		breaks = self.__break_lines(main_sizes, main_space, main_gap)
+		bounds = breaks + [len(main_sizes)]
+		
+		# Cross axis size of each line
+		line_sizes = []
+		
+		for (first, last) in zip(bounds, bounds[1:]):
+			line_sizes.append(max(
+				(
+					cross_sizes[i] for i in range(first, last)
+					if cross_plan.compiled[i][0] != size.Size.AUTO
+				),
+				default=None
+			))
+		
+		auto_lines = line_sizes.count(None)
+		
+		if auto_lines > 0:
+			space_left = (
+				cross_space
+				- sum(i for i in line_sizes if i is not None)
+				- cross_gap * (len(line_sizes) - 1)
+			)
+			auto_each = max(space_left // auto_lines, 1)
+			line_sizes = [ auto_each if i is None else i for i in line_sizes ]
+		
+		# Offsets
+		# ‾‾‾‾‾‾‾
 		
-		for i in reversed(self.children.values()):
-			widget_size = Dimensions(x_sizes[i], y_sizes[i])
+		main_offsets = []
+		cross_offsets = []
+		line_starts = []
+		line_ends = []
+		
+		curr_cross = 0
+		
+		for (line, (first, last)) in enumerate(zip(bounds, bounds[1:])):
+			line_sizes_main = main_sizes[first:last]
+			gaps = main_gap * (last - first - 1)
 			
-			if self.flex_direction == FlexDirection.ROW:
-				curr_pos.x -= widget_size.w
-			else:
-				curr_pos.y -= widget_size.h
+			(curr_main, gap) = self.__justify(sum(line_sizes_main) + gaps, main_space, last - first)
+			gap += main_gap
 			
-			widget_pos = Point(
-				curr_pos.x - self._Scrollable__scroll_position.x,
-				curr_pos.y - self._Scrollable__scroll_position.y
-			)
+			for i in range(first, last):
+				main_offsets.append(curr_main)
+				cross_offsets.append(curr_cross)
+				curr_main += main_sizes[i] + gap
+				
+				if cross_plan.compiled[i][0] == size.Size.AUTO:
+					cross_sizes[i] = size.clamp(line_sizes[line], cross_plan.bounds[i])
 			
-			# Layout the widget
-			i.layout(widget_pos, widget_size)
-	
-	def __layout_flex_center(self,
-		x_sizes: dict[Widget, int],
-		y_sizes: dict[Widget, int]
-	):
-		# Work out how much space our widgets take up
-		if self.flex_direction == FlexDirection.ROW:
-			total_widget_size = sum(x_sizes.values())
-			available_space = self._Widget__available_space.w
-		else:
-			total_widget_size = sum(y_sizes.values())
-			available_space = self._Widget__available_space.h
+			line_starts.append(curr_cross)
+			line_ends.append(curr_cross + line_sizes[line])
+			curr_cross += line_sizes[line] + cross_gap
 		
-		# If the widgets are larger than the available space,
-		#   just layout as if we were FLEX_START.
-		if total_widget_size >= available_space:
-			self.__layout_flex_start(x_sizes, y_sizes)
-			return
+		content_size = Dimensions(*self.__to_xy(
+			max(self.__line_lengths, default=0),
+			max(curr_cross - cross_gap, 0)
+		))
 		
-		# Work out our starting position offset
-		start_pos_offset = (available_space - total_widget_size) // 2
+		(x_sizes, y_sizes) = self.__to_xy(main_sizes, cross_sizes)
+		(x_offsets, y_offsets) = self.__to_xy(main_offsets, cross_offsets)
 		
-		self.__layout_flex_start(x_sizes, y_sizes, start_pos_offset=start_pos_offset)
+		return (x_sizes, y_sizes, x_offsets, y_offsets, content_size, (line_starts, line_ends, bounds))
 	
-	def __layout_flex_space_between(self,
-		x_sizes: dict[Widget, int],
-		y_sizes: dict[Widget, int]
-	):
-		# Work out how much space our widgets take up
-		if self.flex_direction == FlexDirection.ROW:
-			total_widget_size = sum(x_sizes.values())
-			available_space = self._Widget__available_space.w
-		else:
-			total_widget_size = sum(y_sizes.values())
-			available_space = self._Widget__available_space.h
+	# Returns the index of the first child of each line, when the children
+	#   with main axis sizes `sizes` are broken into lines of at most `space`
+	#   long. Each line takes as many children as fit; a child bigger than
+	#   a whole line gets a line to itself.
+	# 
+	# The breaks from the previous call are kept. Breaking lines again (e.g.,
+	#   after a resize) starts from the first line that can change: the first
+	#   line that contains a child whose size changed, that no longer fits,
+	#   or that the child after it would now fit on.
+	def __break_lines(self, sizes: list[int], space: int, gap: int) -> list[int]:
+		breaks = []
+		lengths = []
+		resume = 0
+		
+		if (
+			self.__break_sizes is not None and
+			len(self.__break_sizes) == len(sizes) and
+			self.__break_gap == gap
+		):
+			# Index of the first child whose size changed
+			first_changed = next(
+				(i for (i, (a, b)) in enumerate(zip(self.__break_sizes, sizes)) if a != b),
+				len(sizes)
+			)
+			
+			old_bounds = self.__line_breaks + [len(sizes)]
+			
+			for (line, (first, last)) in enumerate(zip(old_bounds, old_bounds[1:])):
+				length = self.__line_lengths[line]
+				
+				if last > first_changed:
+					break
+				if length > space and last - first > 1:
+					break
+				if last < len(sizes) and length + gap + sizes[last] <= space:
+					break
+				
+				breaks.append(first)
+				lengths.append(length)
+				resume = last
 		
-		# If the widgets are larger than the available space,
-		#   just layout as if we were FLEX_START.
-		if total_widget_size >= available_space:
-			self.__layout_flex_start(x_sizes, y_sizes)
-			return
+		# Resume from the end of the last line kept
+		i = resume
 		
-		# Work out the gap we need between each widget
-		gap = (available_space - total_widget_size) // (len(self.children) - 1)
+		while i < len(sizes):
+			breaks.append(i)
+			length = sizes[i]
+			i += 1
+			
+			while i < len(sizes) and length + gap + sizes[i] <= space:
+				length += gap + sizes[i]
+				i += 1
+			
+			lengths.append(length)
+		
+		self.__line_breaks = breaks
+		self.__line_lengths = lengths
+		self.__break_sizes = sizes
+		self.__break_gap = gap
 		
-		self.__layout_flex_start(x_sizes, y_sizes, gap=gap)
+		return breaks
 	
-	def __layout_flex_space_around(self,
-		x_sizes: dict[Widget, int],
-		y_sizes: dict[Widget, int]
-	):
-		# Work out how much space our widgets take up
-		if self.flex_direction == FlexDirection.ROW:
-			total_widget_size = sum(x_sizes.values())
-			available_space = self._Widget__available_space.w
-		else:
-			total_widget_size = sum(y_sizes.values())
-			available_space = self._Widget__available_space.h
+	# Returns the offset of the first child, and the gap between each child,
+	#   for the current `justify_content` setting.
+	def __justify(self,
+		total_widget_size: int,
+		available_space: int,
+		count: int
+	) -> tuple[int, int]:
+		free_space = available_space - total_widget_size
 		
 		# If the widgets are larger than the available space,
 		#   just layout as if we were FLEX_START.
-		if total_widget_size >= available_space:
-			self.__layout_flex_start(x_sizes, y_sizes)
-			return
-		
-		# Work out the gap we need to place between each 
-		gap = (available_space - total_widget_size) // len(self.children)
+		if free_space <= 0:
+			return (0, 0)
 		
-		# Work out our starting position offset
-		start_pos_offset = gap // 2
-		
-		self.__layout_flex_start(x_sizes, y_sizes, start_pos_offset=start_pos_offset, gap=gap)
+		match self.justify_content:
+			case JustifyContent.FLEX_START:
+				return (0, 0)
+			case JustifyContent.FLEX_END:
+				return (free_space, 0)
+			case JustifyContent.CENTER:
+				return (free_space // 2, 0)
+			case JustifyContent.SPACE_BETWEEN:
+				# A single item has nothing to be between
+				if count == 1:
+					return (0, 0)
+				
+				return (0, free_space // (count - 1))
+			case JustifyContent.SPACE_AROUND:
+				gap = free_space // count
+				return (gap // 2, gap)
+			case JustifyContent.SPACE_EVENLY:
+				gap = free_space // (count + 1)
+				return (gap, gap)
+			case _:
+				raise NotImplementedError("Unimplemented justify_content value")
 	
-	def __layout_flex_space_evenly(self,
-		x_sizes: dict[Widget, int],
-		y_sizes: dict[Widget, int]
-	):
-		# Work out how much space our widgets take up
-		if self.flex_direction == FlexDirection.ROW:
-			total_widget_size = sum(x_sizes.values())
-			available_space = self._Widget__available_space.w
+	# Returns the range of children in view, given the start and end offsets
+	#   of each group of children along the axis that scrolls.
+	# 
+	# Without wrapping, each child is a group of its own, and the offsets are
+	#   along the main axis (`bounds` is `None`). With wrapping, each line is a
+	#   group, the offsets are along the cross axis, and `bounds` holds the
+	#   index of the first child of each line, followed by the child count.
+	def __visible_range(self, starts: list[int], ends: list[int], bounds: list[int] | None) -> range:
+		if bounds is None:
+			(view_start, _) = self.__from_xy(
+				self._Scrollable__scroll_position.x,
+				self._Scrollable__scroll_position.y
+			)
+			(view_size, _) = self.__from_xy(
+				self._Widget__available_space.w,
+				self._Widget__available_space.h
+			)
 		else:
-			total_widget_size = sum(y_sizes.values())
-			available_space = self._Widget__available_space.h
-		
-		# If the widgets are larger than the available space,
-		#   just layout as if we were FLEX_START.
-		if total_widget_size >= available_space:
-			self.__layout_flex_start(x_sizes, y_sizes)
-			return
+			(_, view_start) = self.__from_xy(
+				self._Scrollable__scroll_position.x,
+				self._Scrollable__scroll_position.y
+			)
+			(_, view_size) = self.__from_xy(
+				self._Widget__available_space.w,
+				self._Widget__available_space.h
+			)
 		
-		# Work out the gap we need to place between each 
-		gap = (available_space - total_widget_size) // (len(self.children) + 1)
+		# The first group ending after the start of the view, up to the first
+		#   group starting after the end of the view.
+		first = bisect.bisect_right(ends, view_start)
+		last = max(bisect.bisect_left(starts, view_start + view_size), first)
 		
-		self.__layout_flex_start(x_sizes, y_sizes, start_pos_offset=gap, gap=gap)
+		if bounds is None:
+			return range(first, last)
+		else:
+			return range(bounds[first], bounds[last])
 	
-	# Takes the amount of space available in a given axis, and a function that,
-	#   given a widget, returns the size object for that same axis.
-	# 
-	# For example:
-	# 
-	# self.__calc_children_sizes_flex_axis(
-	#     usable_space=usable_space.w,
-	#     getter=lambda widget: widget.w
-	# )
-	# 
-	# Returns a dictionary mapping children to their sizes for the axis
-	#   specified, with these objects flexed along this axis (i.e., laid out
-	#   as a cohesive unit; sharing the space available between them).
-	def __calc_children_sizes_flex_axis(self,
-		usable_space: int,
-		getter: Callable[[Widget], Any]
-	) -> dict[Widget, int]:
-		# Keep track of all the size resolutions we have done
-		calculated_sizes = { }
-		
-		# Keep track of how many widgets we need to layout
-		remaining_widgets = 0
-		
-		# Keep track of how much space we've used so far
-		space_left = usable_space
-		
-		# Sort every widget according to how its size should be determined
-		fixed_integer = []
-		fraction = []
-		auto = []
+	def _measure_content(self, available: Dimensions) -> Dimensions:
+		# The children laid out one after the other, at the size they would
+		#   like to be, with any fixed sizes taken as they are.
+		(main_gap, _) = self.__gaps()
+		mains = []
+		crosses = []
 		
 		for i in self.children.values():
-			match type(getter(i)).__name__:
-				case "FixedInteger":
-					fixed_integer.append(i)
-				case "Fraction":
-					fraction.append(i)
-				case "Auto":
-					auto.append(i)
-				case _:
-					raise NotImplementedError("Unimplemented size value")
-			
-			remaining_widgets += 1
-		
-		# FixedInteger
-		# ‾‾‾‾‾‾‾‾‾‾‾‾
-		
-		# First, deal with all the FixedInteger sizes, as these are the
-		#   most intransigent. Not resolving these first means that we won't
-		#   know how much space there is left to distribute to sizes which
-		#   resolve to a fraction of the remaining space.
-		for i in fixed_integer:
-			size = getter(i).size
-			calculated_sizes[i] = size
-			space_left -= size
-			remaining_widgets -= 1
-		
-		# Fraction
-		# ‾‾‾‾‾‾‾‾
-		
-		# Second, deal with the Fraction sizes, as these specify
-		#   a fraction of the remaining space.
-		total_fraction = Fraction(0, 1)
-		
-		# Find out what all the fractions add up to, so that if we end up
-		#   with (for example) three widgets, each asking for 1/2 of the space,
-		#   we can ask what fraction of total_fraction each widget is
-		#   asking, which is 1/3.
-		for i in fraction:
-			total_fraction += getter(i).fraction
-		
-		# If the total fraction is less than 1/1, then set the total fraction
-		#   to 1/1, so that we can always take a fraction of total_fraction.
-		if total_fraction < Fraction(1, 1):
-			total_fraction = Fraction(1, 1)
-		
-		space_left_for_fractions = space_left
-		
-		for i in fraction:
-			real_fraction = getter(i).fraction / total_fraction
-			size = floor(real_fraction * space_left_for_fractions)
-			calculated_sizes[i] = size
-			space_left -= size
-			remaining_widgets -= 1
-		
-		# Auto
-		# ‾‾‾‾
-		
-		# Finally, deal with the Auto sizes, as we distribute the remaining
-		#   space equally among all Auto widgets.
-		
-		if remaining_widgets > 0:
-			# Get the amount of space we can give each Auto widget
-			auto_each = max(space_left // remaining_widgets, 0)
+			measured = i.measure(available)
 			
-			for i in auto:
-				calculated_sizes[i] = auto_each
-				space_left -= auto_each
-				remaining_widgets -= 1
+			w = i.w.size if isinstance(i.w, size.FixedInteger) else measured.w
+			h = i.h.size if isinstance(i.h, size.FixedInteger) else measured.h
 			
-		return calculated_sizes
-	
-	# Returns a dictionary mapping children to their sizes for the axis
-	#   specified, with these objects *not* flexed along this axis (i.e.,
-	#   laid out, without the size of one widget along this axis affecting
-	#   the size of any of the other widgets).
-	def __calc_children_sizes_nonflex_axis(self,
-		usable_space: int,
-		getter: Callable[[Widget], Any]
-	) -> dict[Widget, int]:
-		calculated_sizes = { }
-		
-		for i in self.children.values():
-			match type(getter(i)).__name__:
-				case "FixedInteger":
-					calculated_sizes[i] = getter(i).size
-				case "Fraction":
-					calculated_sizes[i] = floor(getter(i).fraction * usable_space)
-				case "Auto":
-					calculated_sizes[i] = usable_space
-				case _:
-					raise NotImplementedError("Unimplemented size value")
-		
-		return calculated_sizes
+			(main, cross) = self.__from_xy(w, h)
+			mains.append(main)
+			crosses.append(cross)
+		
+		return Dimensions(*self.__to_xy(
+			sum(mains) + main_gap * max(len(mains) - 1, 0),
+			max(crosses, default=0)
+		))
 	
 	def draw(self, s: Screenbuffer, clip: Rectangle | None = None):
 		super().draw(s, clip=clip)
 		
-		for (k, v) in self.children.items():
-			v.draw(s, clip=clip & self._Widget__available_space)
+		child_clip = clip & self._Widget__available_space
+		
+		if child_clip.is_empty:
+			return
+		
+		for i in self.__visible:
+			self._draw_child(s, self.__children[i], child_clip)
@@ -0,0 +1,267 @@
+from tri_declarative import with_meta
+
+from tanmatsu import size
+from tanmatsu.geometry import Dimensions, Rectangle
+from tanmatsu.screenbuffer import Screenbuffer
+
+from .base import Widget
+from .box import Box
+from .container import Container
+
+
+@with_meta
+class Grid(Container, Box):
+	"""
+	A widget that lays out other widgets in a grid of rows and columns. Has
+	similar behaviour to `grid` from CSS.
+	
+	The sizes of the rows and columns are resolved the same way as the sizes of
+	the children of a :class:`FlexBox`: first the :class:`tanmatsu.size.FixedInteger`
+	and :class:`tanmatsu.size.Content` tracks, then the
+	:class:`tanmatsu.size.Fraction` tracks, and finally the
+	:class:`tanmatsu.size.Auto` tracks share out whatever space is left.
+	
+	A `Content` track is as large as the largest child in it, as measured by
+	:meth:`Widget.measure`. Children spanning several tracks don't count
+	towards the size of a `Content` track.
+	
+	Children are placed one per cell, in order, filling each row from left to
+	right before moving on to the next row. Children that don't fit in the
+	grid aren't drawn.
+	
+	:param columns: The widths of the columns.
+	:paramtype columns: list[tanmatsu.size.Size]
+	
+	:param rows: The heights of the rows.
+	:paramtype rows: list[tanmatsu.size.Size]
+	
+	:param areas: Places the children named in the keys at a fixed area of the
+	              grid, instead of the next free cell. Values are
+	              `(row, column, row_span, column_span)` tuples. The remaining
+	              children are placed in the cells left over.
+	:paramtype areas: dict[str, tuple[int, int, int, int]] | None
+	"""
+	
+	def __init__(
+		self,
+		*args,
+		columns: list[size.Size],
+		rows: list[size.Size],
+		areas: dict[str, tuple[int, int, int, int]] | None = None,
+		**kwargs,
+	):
+		super().__init__(*args, **kwargs)
+		
+		self.__columns = columns
+		self.invalidate_draw()
+		self.__rows = rows
+		self.invalidate_draw()
+		self.__areas = areas if areas is not None else { }
+		
+		# See `__placements()` and `__track_offsets()`
+		self.__placement_key = None
+		self.__placement = []
+		self.__placement_revision = 0
+		self.__tracks_key = None
+		self.__tracks_measure_revision = None
+		self.__tracks = { }
+		self.__column_plan = None
+		self.__row_plan = None
+		
+		self.__cells = []
+	
+	@property
+	def columns(self) -> list[size.Size]:
+		"""
+		:getter: Returns the widths of the columns.
+		:setter: Sets the widths of the columns.
+		"""
+		return self.__columns
+	
+	@columns.setter
+	def columns(self, columns: list[size.Size]):
+		self.__columns = columns
+	
+	@property
+	def rows(self) -> list[size.Size]:
+		"""
+		:getter: Returns the heights of the rows.
+		:setter: Sets the heights of the rows.
+		"""
+		return self.__rows
+	
+	@rows.setter
+	def rows(self, rows: list[size.Size]):
+		self.__rows = rows
+	
+	@property
+	def areas(self) -> dict[str, tuple[int, int, int, int]]:
+		"""
+		:getter: Returns the areas of the children placed at a fixed area.
+		:setter: Sets the areas of the children placed at a fixed area.
+		"""
+		return self.__areas
+	
+	@areas.setter
+	def areas(self, areas: dict[str, tuple[int, int, int, int]]):
+		self.__areas = areas
+		self.invalidate_draw()
+	
+	def layout(self, *args, **kwargs):
+		super().layout(*args, **kwargs)
+		
+		space = self._Widget__available_space
+		(column_offsets, row_offsets) = self.__track_offsets(space.w, space.h)
+		
+		self.__cells = []
+		
+		for (widget, row, column, row_span, column_span) in self.__placements():
+			cell = Rectangle(
+				space.x + column_offsets[column],
+				space.y + row_offsets[row],
+				column_offsets[column + column_span] - column_offsets[column],
+				row_offsets[row + row_span] - row_offsets[row],
+			)
+			
+			widget.layout(cell.top_left(), cell.dimensions())
+			self.__cells.append((widget, cell))
+	
+	# Returns the offset of the start of every column and row, relative to the
+	#   available space, plus the offset of the end of the last one. The size
+	#   of a span of tracks is then the difference of two offsets.
+	# 
+	# The track sizes only depend on the track definitions and the available
+	#   space (and, for `Content` tracks, on what the children in them
+	#   measure), so they are cached per available space, until those change.
+	def __track_offsets(self, w: int, h: int) -> tuple[list[int], list[int]]:
+		placements = self.__placements()
+		key = (size.Size._revision, tuple(self.__columns), tuple(self.__rows), self.__placement_revision)
+		
+		if key != self.__tracks_key:
+			self.__tracks_key = key
+			self.__tracks = { }
+			self.__column_plan = size.FlexPlan(self.__columns)
+			self.__row_plan = size.FlexPlan(self.__rows)
+		
+		if (
+			(self.__column_plan.has_content or self.__row_plan.has_content) and
+			self.__tracks_measure_revision != self._measure_revision
+		):
+			self.__tracks_measure_revision = self._measure_revision
+			self.__tracks = { }
+		
+		try:
+			return self.__tracks[(w, h)]
+		except KeyError:
+			pass
+		
+		def offsets(sizes: list[int]) -> list[int]:
+			result = [0]
+			
+			for i in sizes:
+				result.append(result[-1] + i)
+			
+			return result
+		
+		# Columns first, so that children in `Content` rows are measured with
+		#   the width of their cell.
+		column_content = None
+		
+		if self.__column_plan.has_content:
+			column_content = [0] * len(self.__columns)
+			available = Dimensions(w, h)
+			
+			for (widget, _, column, _, column_span) in placements:
+				if column_span == 1:
+					column_content[column] = max(column_content[column], widget.measure(available).w)
+		
+		(column_sizes,) = self.__column_plan.flex(w, content=column_content)
+		column_offsets = offsets(column_sizes)
+		
+		row_content = None
+		
+		if self.__row_plan.has_content:
+			row_content = [0] * len(self.__rows)
+			
+			for (widget, row, column, row_span, column_span) in placements:
+				if row_span == 1:
+					available = Dimensions(column_offsets[column + column_span] - column_offsets[column], h)
+					row_content[row] = max(row_content[row], widget.measure(available).h)
+		
+		(row_sizes,) = self.__row_plan.flex(h, content=row_content)
+		
+		# Old entries are only useful if the Grid is resized back to
+		#   a previous size, so don't let them accumulate.
+		if len(self.__tracks) >= 16:
+			self.__tracks.clear()
+		
+		self.__tracks[(w, h)] = (column_offsets, offsets(row_sizes))
+		return self.__tracks[(w, h)]
+	
+	# Returns a `(widget, row, column, row_span, column_span)` tuple for every
+	#   child that fits in the grid.
+	# 
+	# Children with an area are placed first. The rest are then placed in the
+	#   free cells, walking the grid a row at a time, so placing every child
+	#   takes one pass over the cells.
+	def __placements(self) -> list[tuple[Widget, int, int, int, int]]:
+		key = (
+			self._children_revision,
+			tuple(self.children.items()),
+			tuple(self.__areas.items()),
+			len(self.__rows),
+			len(self.__columns),
+		)
+		
+		if key == self.__placement_key:
+			return self.__placement
+		
+		row_count = len(self.__rows)
+		column_count = len(self.__columns)
+		
+		occupied = bytearray(row_count * column_count)
+		placement = []
+		
+		for (name, (row, column, row_span, column_span)) in self.__areas.items():
+			if name not in self.children:
+				continue
+			
+			if (
+				row < 0 or column < 0 or row_span < 1 or column_span < 1 or
+				row + row_span > row_count or column + column_span > column_count
+			):
+				raise ValueError(f"Grid area of `{name}` is outside the grid")
+			
+			for i in range(row, row + row_span):
+				for j in range(column, column + column_span):
+					occupied[i * column_count + j] = 1
+			
+			placement.append((self.children[name], row, column, row_span, column_span))
+		
+		cell = 0
+		
+		for (name, widget) in self.children.items():
+			if name in self.__areas:
+				continue
+			
+			while cell < len(occupied) and occupied[cell]:
+				cell += 1
+			
+			# Out of cells
+			if cell == len(occupied):
+				break
+			
+			placement.append((widget, cell // column_count, cell % column_count, 1, 1))
+			cell += 1
+		
+		self.__placement_key = key
+		self.__placement = placement
+		self.__placement_revision += 1
+		
+		return placement
+	
+	def draw(self, s: Screenbuffer, clip: Rectangle | None = None):
+		super().draw(s, clip=clip)
+		
+		for (widget, cell) in self.__cells:
+			self._draw_child(s, widget, (clip & cell).intersect_into(self._Widget__available_space))
@@ -1,3 +1,6 @@
+import bisect
+import time
+
 from tri_declarative import with_meta
 
 import tanmatsu.input as ti
@@ -15,22 +18,45 @@ class List(Box, Scrollable):
 	Widget that holds a number of widgets of a uniform height, with
 	a cursor to navigate between them.
 	
+	Besides the arrow keys, the cursor can be moved a page at a time
+	(PAGE_UP/PAGE_DOWN), to either end of the list (HOME/END), or to the first
+	item whose label starts with the typed characters (typeahead). See
+	:meth:`item_label`.
+	
 	:param children: The widgets the List should contain.
 	:paramtype children: list[Widget]
 	"""
 	
+	TYPEAHEAD_TIMEOUT = 1.0
+	"""Seconds after which the typeahead buffer is cleared."""
+	
 	def __init__(self,  *args, children: list[Widget], item_height: int, **kwargs):
 		super().__init__(*args, **kwargs)
 		
 		self._children = children
 		self.focusable_children = {  }
 		
+		for i in children:
+			self._adopt(i)
+		
 		self.item_height = item_height
 		
 		self.__cursor = None  # Silence typechecker
 		self.cursor = 0
 		
 		self.__gutter = None
+		self.__visible = range(0, 0)
+		
+		# Typeahead
+		# 
+		# The prefix index is a sorted list of `(casefolded label, index)`
+		#   tuples, so that the items starting with a given prefix can be found
+		#   with a binary search. It's built on first use, and thrown away
+		#   whenever the items change (see `_invalidate_labels()`).
+		self.__prefix_index = None
+		self.__prefix_index_count = 0
+		self.__typeahead = ""
+		self.__typeahead_time = 0.0
 	
 	@property
 	def cursor(self) -> int:
@@ -43,11 +69,18 @@ class List(Box, Scrollable):
 	
 	@cursor.setter
 	def cursor(self, value: int):
+		value = min(value, self._item_count() - 1)
 		value = max(value, 0)
-		value = min(value, len(self.children))
 		self.__cursor = value
+		self.invalidate_draw()
 		
-		self.focused_child = self.children[self.cursor]
+		# An empty list has nothing to focus.
+		if self._item_count() == 0:
+			self.focused_child = None
+			self.focusable_children = { }
+			return
+		
+		self.focused_child = self._item_widget(self.cursor)
 		self.focusable_children = { "_": self.focused_child }
 		
 		if self._Widget__available_space is not None:
@@ -73,16 +106,64 @@ class List(Box, Scrollable):
 	
 	@children.setter
 	def children(self, value: list[Widget]):
+		for i in self._children:
+			self._disown(i)
+		
 		self._children = value
-		self.cursor = min(self.cursor, len(value))
+		
+		for i in value:
+			self._adopt(i)
+		
+		self._invalidate_labels()
+		self.cursor = self.cursor  # Clamp the cursor to the new children
 	
 	@property
-	def active_child(self) -> Widget:
+	def active_child(self) -> Widget | None:
 		"""
 		:getter: Get the currently active child widget (i.e., the widget that
-		         the cursor is currently pointing to).
+		         the cursor is currently pointing to), or :code:`None` if the
+		         list is empty.
 		"""
-		return self.children[self.cursor]
+		if self._item_count() == 0:
+			return None
+		
+		return self._item_widget(self.cursor)
+	
+	# The following methods are the only way the rest of this class accesses
+	#   the list items, so that subclasses can provide the items some other
+	#   way than through `self.children` (see `ModelList`).
+	
+	def _item_count(self) -> int:
+		"""Returns the number of items in the list."""
+		return len(self.children)
+	
+	def _item_widget(self, index: int) -> Widget:
+		"""Returns the widget for the item at `index`."""
+		return self.children[index]
+	
+	def _prepare_items(self, visible: range):
+		"""
+		Called during :meth:`layout`, before the items in `visible` are
+		laid out. Does nothing by default.
+		"""
+		pass
+	
+	def item_label(self, index: int) -> str | None:
+		"""
+		Returns the label used to find the item at `index` by typeahead, or
+		:code:`None` if the item can't be found by typeahead.
+		
+		By default, this is the `label` attribute of the item's widget (e.g.,
+		the label of a :class:`Button`), if it has one.
+		"""
+		return getattr(self._item_widget(index), "label", None)
+	
+	def _invalidate_labels(self):
+		"""
+		Discards the typeahead prefix index. Must be called whenever items are
+		added, removed, or relabelled; it is rebuilt on the next typeahead.
+		"""
+		self.__prefix_index = None
 	
 	def up(self):
 		"""
@@ -94,7 +175,141 @@ class List(Box, Scrollable):
 		"""
 		Move the cursor down.
 		"""
-		self.cursor = min(self.cursor + 1, len(self.children) - 1)
+		self.cursor = min(self.cursor + 1, self._item_count() - 1)
+	
+	def page_up(self):
+		"""
+		Move the cursor up by one page, i.e., by as many items as fit
+		in the viewport.
+		"""
+		self.cursor = max(self.cursor - self.__page_size(), 0)
+	
+	def page_down(self):
+		"""
+		Move the cursor down by one page, i.e., by as many items as fit
+		in the viewport.
+		"""
+		self.cursor = min(self.cursor + self.__page_size(), self._item_count() - 1)
+	
+	def home(self):
+		"""
+		Move the cursor to the first item.
+		"""
+		self.cursor = 0
+	
+	def end(self):
+		"""
+		Move the cursor to the last item.
+		"""
+		self.cursor = self._item_count() - 1
+	
+	def __page_size(self) -> int:
+		# Before the first layout there's no viewport, so fall back to moving
+		#   one item at a time.
+		if self._Widget__available_space is None or self.item_height <= 0:
+			return 1
+		
+		return max(self._Widget__available_space.h // self.item_height, 1)
+	
+	def jump_to_prefix(self, prefix: str) -> bool:
+		"""
+		Move the cursor to the item whose label starts with `prefix`
+		(case-insensitively), choosing the first such label alphabetically.
+		
+		If the item under the cursor already matches, the cursor stays where
+		it is.
+		
+		:return: Whether a matching item was found.
+		"""
+		index = self.__find_prefix(prefix.casefold())
+		
+		if index is None:
+			return False
+		
+		self.cursor = index
+		return True
+	
+	def typeahead(self, character: str) -> bool:
+		"""
+		Add `character` to the typeahead buffer, and move the cursor to the
+		first item matching the buffer (see :meth:`jump_to_prefix`).
+		
+		The buffer is cleared if no character has been typed for
+		:attr:`TYPEAHEAD_TIMEOUT` seconds. Typing the same character repeatedly
+		cycles through the items starting with that character.
+		
+		:return: Whether a matching item was found.
+		"""
+		now = time.monotonic()
+		
+		if now - self.__typeahead_time > self.TYPEAHEAD_TIMEOUT:
+			self.__typeahead = ""
+		
+		self.__typeahead_time = now
+		self.__typeahead += character.casefold()
+		
+		# Repeating a single character cycles through the matches.
+		if self.__typeahead == character.casefold() * len(self.__typeahead) and len(self.__typeahead) > 1:
+			index = self.__find_prefix(self.__typeahead[0], after=self.cursor)
+		else:
+			index = self.__find_prefix(self.__typeahead)
+		
+		if index is None:
+			return False
+		
+		self.cursor = index
+		return True
+	
+	def __build_prefix_index(self) -> list[tuple[str, int]]:
+		index = []
+		
+		for i in range(self._item_count()):
+			label = self.item_label(i)
+			
+			if label is not None:
+				index.append((label.casefold(), i))
+		
+		index.sort()
+		return index
+	
+	# Returns the index of the item whose label is the alphabetically first
+	#   label starting with `prefix`. Prefers the item under the cursor, if it
+	#   matches. If `after` is given, returns the match following the item at
+	#   index `after` instead, wrapping around to the first match.
+	def __find_prefix(self, prefix: str, after: int | None = None) -> int | None:
+		# Items added to or removed from `self.children` in place (rather than
+		#   through the setter) are caught by checking the item count.
+		if self.__prefix_index is None or self.__prefix_index_count != self._item_count():
+			self.__prefix_index = self.__build_prefix_index()
+			self.__prefix_index_count = self._item_count()
+		
+		entries = self.__prefix_index
+		
+		# `(prefix, -1)` sorts before every entry whose label starts with
+		#   `prefix`, so this is the first candidate.
+		first = bisect.bisect_left(entries, (prefix, -1))
+		
+		if first == len(entries) or not entries[first][0].startswith(prefix):
+			return None
+		
+		if self._item_count() > 0:
+			current = self.item_label(self.cursor)
+			current = (current.casefold(), self.cursor) if current is not None else None
+		else:
+			current = None
+		
+		if after is not None and current is not None:
+			following = bisect.bisect_right(entries, current)
+			
+			if following < len(entries) and entries[following][0].startswith(prefix):
+				return entries[following][1]
+			
+			return entries[first][1]
+		
+		if current is not None and current[0].startswith(prefix):
+			return self.cursor
+		
+		return entries[first][1]
 	
 	def layout(self, *args, **kwargs):
 		super().layout(*args, **kwargs)
@@ -121,35 +336,57 @@ class List(Box, Scrollable):
 		# ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
 		content_size = Dimensions(
 			self._Widget__available_space.w - 1,
-			len(self.children) * self.item_height
+			self._item_count() * self.item_height
 		)
 		
-		usable_space = self.get_scrollable_area(content_size)
+		# Scroll bar
+		# ‾‾‾‾‾‾‾‾‾‾
+		
+		# Layout the scrollbar before the children, so that the children are
+		#   positioned using the clamped scroll position.
+		self.layout_scrollbar(content_size)
+		self.scroll()
 		
 		# Children
 		# ‾‾‾‾‾‾‾‾
-		for (i, v) in enumerate(self.children):
+		
+		# Only the children that intersect the viewport are laid out (and later
+		#   drawn). As every child is `item_height` tall, the range of visible
+		#   children follows directly from the scroll position, so the cost of
+		#   a frame doesn't depend on the number of children.
+		self.__visible = self.__visible_range()
+		self._prepare_items(self.__visible)
+		
+		for i in self.__visible:
 			position = Point(
-				usable_space.x - self._Scrollable__scroll_position.x,
-				usable_space.y - self._Scrollable__scroll_position.y + (i * self.item_height)
+				self._Widget__available_space.x - self._Scrollable__scroll_position.x,
+				self._Widget__available_space.y - self._Scrollable__scroll_position.y + (i * self.item_height)
 			)
 			
 			size = Dimensions(
-				usable_space.w,
+				self._Widget__available_space.w,
 				self.item_height,
 			)
 			
-			v.layout(position, size)
+			self._item_widget(i).layout(position, size)
+	
+	def __visible_range(self) -> range:
+		if self.item_height <= 0:
+			return range(0, 0)
 		
-		# Scroll bar
-		# ‾‾‾‾‾‾‾‾‾‾
-		self.layout_scrollbar(content_size)
-		self.scroll()
+		scroll_y = self._Scrollable__scroll_position.y
+		
+		first = scroll_y // self.item_height
+		last  = (scroll_y + self._Widget__available_space.h - 1) // self.item_height
+		
+		return range(max(first, 0), min(last + 1, self._item_count()))
 	
 	def draw(self, s: Screenbuffer, clip: Rectangle | None = None):
 		super().draw(s, clip=clip)
 		
-		for (i, v) in enumerate(self.children):
+		for i in self.__visible:
+			v = self._item_widget(i)
+			
 			item_clip = Rectangle(
 				self._Widget__available_space.x - self._Scrollable__scroll_position.x,
 				self._Widget__available_space.y - self._Scrollable__scroll_position.y + (i * self.item_height),
@@ -157,7 +394,7 @@ class List(Box, Scrollable):
 				self.item_height,
 			)
 			
-			v.draw(s, clip=clip & item_clip & self._Widget__available_space)
+			self._draw_child(s, v, (clip & item_clip).intersect_into(self._Widget__available_space))
 			
 			if i == self.cursor:
 				for j in range(0, self.item_height):
@@ -181,6 +418,16 @@ class List(Box, Scrollable):
 				self.up()
 			case ti.Keyboard_key.DOWN_ARROW:
 				self.down()
+			case ti.Keyboard_key.PAGE_UP:
+				self.page_up()
+			case ti.Keyboard_key.PAGE_DOWN:
+				self.page_down()
+			case ti.Keyboard_key.HOME:
+				self.home()
+			case ti.Keyboard_key.END:
+				self.end()
+			case str() if modifier == ti.Keyboard_modifier.NONE and key.isprintable():
+				return self.typeahead(key)
 			case _:
 				return False
 		
@@ -0,0 +1,227 @@
+from typing import Any, Callable, Sequence
+
+from tri_declarative import with_meta
+
+from .base import Widget
+from .list import List
+
+
+@with_meta
+class ModelList(List):
+	"""
+	A :class:`List` whose items come from a data model, rather than from
+	a list of widgets.
+	
+	Only the items inside the viewport (and the item under the cursor) have
+	a widget. Widgets for items that scroll out of view are recycled for the
+	items that scroll into view, so memory use depends on the size of the
+	viewport, not the size of the model.
+	
+	:param model: The data items. Any sequence supporting :func:`len` and
+	              indexing will do. If the model has a `subscribe` method
+	              (e.g., :class:`tanmatsu.listmodel.ListModel`), the ModelList
+	              subscribes to it and updates incrementally when it changes.
+	              Otherwise, :meth:`model_reset` must be called after changing
+	              the model.
+	:paramtype model: Sequence[Any]
+	
+	:param factory: Creates a new, unbound, item widget.
+	:paramtype factory: Callable[[], Widget]
+	
+	:param bind: Binds a data item to an item widget, e.g., by setting the label
+	             of a :class:`Button`. Called with the widget and the data item.
+	:paramtype bind: Callable[[Widget, Any], None]
+	
+	:param label: Returns the typeahead label of a data item (see
+	              :meth:`List.item_label`). Defaults to :func:`str`. Labels are
+	              taken from the model directly, so typeahead doesn't need
+	              a widget for every item.
+	:paramtype label: Callable[[Any], str | None]
+	"""
+	
+	def __init__(
+		self,
+		*args,
+		model: Sequence[Any],
+		factory: Callable[[], Widget],
+		bind: Callable[[Widget, Any], None],
+		label: Callable[[Any], str | None] = str,
+		**kwargs
+	):
+		# These have to exist before `List.__init__`, as it sets the cursor,
+		#   which binds the item under the cursor.
+		self.__model = model
+		self.__factory = factory
+		self.__bind = bind
+		self.__label = label
+		
+		self.__bound = { }  # index in the model -> widget bound to that item
+		self.__free = []    # widgets not currently bound to any item
+		
+		# Set when the bound widgets may no longer hold the data of the item
+		#   they are bound to. See `items_inserted()`.
+		self.__stale = False
+		
+		# The number of items, as of the last model notification. Models may
+		#   send notifications after the fact (see `items_inserted()`), so this
+		#   can differ from the length of the model while they do.
+		self.__count = len(model)
+		
+		super().__init__(*args, children=[], **kwargs)
+		
+		if hasattr(model, "subscribe"):
+			model.subscribe(self)
+	
+	@property
+	def model(self) -> Sequence[Any]:
+		"""
+		:getter: Get the model, i.e., the data items.
+		:setter: Set the model.
+		"""
+		return self.__model
+	
+	@model.setter
+	def model(self, model: Sequence[Any]):
+		if hasattr(self.__model, "unsubscribe"):
+			self.__model.unsubscribe(self)
+		
+		self.__model = model
+		
+		if hasattr(model, "subscribe"):
+			model.subscribe(self)
+		
+		self.model_reset()
+	
+	@property
+	def children(self) -> list[Widget]:
+		"""
+		:getter: Get the widgets currently bound to an item, in the same order
+		         as their items.
+		"""
+		return [ self.__bound[i] for i in sorted(self.__bound) ]
+	
+	# Item widgets
+	# ‾‾‾‾‾‾‾‾‾‾‾‾
+	
+	def _item_count(self) -> int:
+		return len(self.__model)
+	
+	def _item_widget(self, index: int) -> Widget:
+		try:
+			return self.__bound[index]
+		except KeyError:
+			pass
+		
+		if self.__free:
+			widget = self.__free.pop()
+		else:
+			widget = self.__factory()
+			self._adopt(widget)
+		
+		self.__bind(widget, self.__model[index])
+		self.__bound[index] = widget
+		
+		return widget
+	
+	def item_label(self, index: int) -> str | None:
+		return self.__label(self.__model[index])
+	
+	def _prepare_items(self, visible: range):
+		# Recycle the widgets of any items that have scrolled out of view.
+		#   The item under the cursor keeps its widget, as it's focusable.
+		for index in [ i for i in self.__bound if i not in visible and i != self.cursor ]:
+			self.__free.append(self.__bound.pop(index))
+		
+		if self.__stale:
+			for (index, widget) in self.__bound.items():
+				self.__bind(widget, self.__model[index])
+			
+			self.__stale = False
+	
+	# Model notifications
+	# ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+	
+	def items_inserted(self, index: int, count: int):
+		"""Update the list after `count` items were inserted at `index`."""
+		self.__bound = {
+			(i + count if i >= index else i): widget
+			for (i, widget) in self.__bound.items()
+		}
+		
+		# Models may send notifications after the fact (e.g.,
+		#   `SortedListModel.batch()`), in which case any widget we bind while
+		#   handling this notification may be bound to the wrong item. Rebind
+		#   everything before the next layout, once the notifications are done.
+		self.__stale = True
+		self._invalidate_labels()
+		
+		was_empty = self.__count == 0
+		self.__count += count
+		
+		# Keep the cursor on the same item.
+		if self.cursor >= index and not was_empty:
+			self.cursor = self.cursor + count
+		else:
+			self.cursor = self.cursor
+	
+	def items_removed(self, index: int, count: int):
+		"""Update the list after `count` items were removed from `index`."""
+		bound = { }
+		
+		for (i, widget) in self.__bound.items():
+			if i < index:
+				bound[i] = widget
+			elif i >= index + count:
+				bound[i - count] = widget
+			else:
+				self.__free.append(widget)
+		
+		self.__bound = bound
+		self.__stale = True
+		self._invalidate_labels()
+		
+		self.__count -= count
+		
+		# Keep the cursor on the same item, or, if that item was removed,
+		#   on the item that took its place.
+		if self.cursor >= index + count:
+			self.cursor = self.cursor - count
+		else:
+			self.cursor = min(self.cursor, index)
+	
+	def items_changed(self, index: int, count: int):
+		"""Update the list after the `count` items from `index` were replaced."""
+		self._invalidate_labels()
+		
+		# Rebound before the next layout, like after an insertion, as the
+		#   model may already have changed further (see `items_inserted()`).
+		if any(index <= i < index + count for i in self.__bound):
+			self.__stale = True
+			self.invalidate_draw()
+	
+	def item_moved(self, old_index: int, new_index: int):
+		"""Update the list after the item at `old_index` moved to `new_index`."""
+		def moved(i: int) -> int:
+			if i == old_index:
+				return new_index
+			if i > old_index:
+				i -= 1
+			if i >= new_index:
+				i += 1
+			return i
+		
+		self.__bound = { moved(i): widget for (i, widget) in self.__bound.items() }
+		self.__stale = True
+		self._invalidate_labels()
+		
+		# Keep the cursor on the same item, which may have moved.
+		self.cursor = moved(self.cursor)
+	
+	def model_reset(self):
+		"""Update the list after the contents of the model changed completely."""
+		self.__free.extend(self.__bound.values())
+		self.__bound = { }
+		self.__count = len(self.__model)
+		self._invalidate_labels()
+		
+		self.cursor = self.cursor
@@ -58,6 +58,10 @@ class Scrollable(Widget):
 		self.__horizontal_scrollbar_rectangle = None
 		self.__horizontal_scroll_percent = None
 		self.__horizontal_scrollbar_handle_length = None
+		
+		# While a scrollbar handle is being dragged, the direction of the
+		#   scrollbar and where along the handle it was grabbed.
+		self.__drag = None
 	
 	def layout(self, *args, **kwargs):
 		super().layout(*args, **kwargs)
@@ -87,7 +91,7 @@ class Scrollable(Widget):
 	def get_scrollable_area(self, content_size: Dimensions) -> Rectangle:
 		(scrollable_area, _, _) = self.__get_scrollable_area_and_directions(content_size)
 		return scrollable_area
-
+	
 	def layout_scrollbar(self, content_size: Dimensions):
 		"""
 		Layout the scrollbar. Must be called before :meth:`scroll`,
@@ -95,22 +99,29 @@ class Scrollable(Widget):
 		"""
 		self.__content_size = content_size
 		
-		self.__vertical_scrollbar_rectangle   = self._Widget__available_space.duplicate()
-		self.__horizontal_scrollbar_rectangle = self._Widget__available_space.duplicate()
+		space = self._Widget__available_space
+		
+		# Reuse the scrollbar rectangles from the last layout, if any.
+		if self.__vertical_scrollbar_rectangle is None:
+			self.__vertical_scrollbar_rectangle   = space.duplicate()
+			self.__horizontal_scrollbar_rectangle = space.duplicate()
+		else:
+			self.__vertical_scrollbar_rectangle.set(space.x, space.y, space.w, space.h)
+			self.__horizontal_scrollbar_rectangle.set(space.x, space.y, space.w, space.h)
 		
 		(scrollable_area,
 		 h_scroll_required,
 		 v_scroll_required) = self.__get_scrollable_area_and_directions(self.__content_size)
-		self._Widget__available_space = scrollable_area
+		space.set(scrollable_area.x, scrollable_area.y, scrollable_area.w, scrollable_area.h)
 		
 		match (h_scroll_required, v_scroll_required, self.__scroll_direction):
 			case (True, False, Scrollable.HORIZONTAL) | (True, False, Scrollable.BOTH):
-				self.__vertical_scrollbar_rectangle   = Rectangle(0,0,0,0)
+				self.__vertical_scrollbar_rectangle.set(0, 0, 0, 0)
 			case (False, True, Scrollable.VERTICAL  ) | (False, True, Scrollable.BOTH):
-				self.__horizontal_scrollbar_rectangle = Rectangle(0,0,0,0)
+				self.__horizontal_scrollbar_rectangle.set(0, 0, 0, 0)
 			case (False, False, _):
-				self.__horizontal_scrollbar_rectangle = Rectangle(0,0,0,0)
-				self.__vertical_scrollbar_rectangle   = Rectangle(0,0,0,0)
+				self.__horizontal_scrollbar_rectangle.set(0, 0, 0, 0)
+				self.__vertical_scrollbar_rectangle.set(0, 0, 0, 0)
 	
 	def draw(self, s: Screenbuffer, clip: Rectangle | None = None):
 		super().draw(s, clip=clip)
@@ -174,6 +185,9 @@ class Scrollable(Widget):
 		
 		if self.__scroll_direction & Scrollable.VERTICAL:
 			self.__scroll(delta_y, Scrollable.VERTICAL)
+		
+		if delta_x != 0 or delta_y != 0:
+			self.invalidate_draw()
 	
 	def __scroll(self, scroll_delta: int, direction: int):
 		if direction == Scrollable.VERTICAL:
@@ -227,12 +241,17 @@ class Scrollable(Widget):
 			self.__horizontal_scrollbar_handle_length = scrollbar_handle_length
 			self.__horizontal_scroll_percent = scroll_percent
 		
-		self._viewport = Rectangle(
+		viewport = (
 			self._Widget__available_space.x + self.__scroll_position.x,
 			self._Widget__available_space.y + self.__scroll_position.y,
 			self._Widget__available_space.w,
 			self._Widget__available_space.h
 		)
+		
+		if self._viewport is None:
+			self._viewport = Rectangle(*viewport)
+		else:
+			self._viewport.set(*viewport)
 	
 	def mouse_event(
 		self,
@@ -247,6 +266,12 @@ class Scrollable(Widget):
 		if self.scrollable is False:
 			return False
 		
+		if button == ti.Mouse_button.LMB and self.__drag_scrollbar(state, position):
+			return True
+		
+		if state == ti.Mouse_state.MOVED:
+			return False
+		
 		match button, modifier:
 			# Mouse wheel
 			case ti.Mouse_button.SCROLL_UP,    ti.Mouse_modifier.NONE:
@@ -267,3 +292,121 @@ class Scrollable(Widget):
 				return False
 		
 		return True
+	
+	# Scrollbar dragging
+	# ‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾‾
+	
+	# Returns `(track_start, track_length, handle_offset, handle_length)` for
+	#   the scrollbar in `direction`, and the coordinate of `position` along
+	#   it, or `None` if `position` isn't on that scrollbar (or there isn't
+	#   one). The track is the part of the scrollbar between the arrows.
+	def __scrollbar_at(self, direction: int, position: Point) -> tuple[tuple[int, int, int, int], int] | None:
+		if direction == Scrollable.VERTICAL:
+			r = self.__vertical_scrollbar_rectangle
+			handle_length = self.__vertical_scrollbar_handle_length
+			percent = self.__vertical_scroll_percent
+			
+			if r is None or handle_length is None or r.is_empty or position.x != r.x2:
+				return None
+			
+			(start, length, along) = (r.y, r.h, position.y)
+		else:
+			r = self.__horizontal_scrollbar_rectangle
+			handle_length = self.__horizontal_scrollbar_handle_length
+			percent = self.__horizontal_scroll_percent
+			
+			if r is None or handle_length is None or r.is_empty or position.y != r.y2:
+				return None
+			
+			(start, length, along) = (r.x, r.w, position.x)
+		
+		if not start <= along < start + length:
+			return None
+		
+		# The same as `draw.scrollbar()`
+		handle_offset = int((length - 2 - handle_length) * percent)
+		
+		return ((start + 1, length - 2, handle_offset, handle_length), along)
+	
+	def __drag_scrollbar(self, state: ti.Mouse_state, position: Point) -> bool:
+		if self.__drag is not None:
+			(direction, grab) = self.__drag
+			
+			if state == ti.Mouse_state.RELEASED:
+				self.__drag = None
+			else:
+				# Only the coordinate along the scrollbar counts, so the mouse
+				#   can wander off the scrollbar while dragging.
+				along = position.y if direction == Scrollable.VERTICAL else position.x
+				self.__drag_handle_to(direction, along - self.__track_start(direction) - grab)
+			
+			return True
+		
+		if state != ti.Mouse_state.PRESSED:
+			return False
+		
+		for direction in (Scrollable.VERTICAL, Scrollable.HORIZONTAL):
+			if not self.__scroll_direction & direction:
+				continue
+			
+			if (hit := self.__scrollbar_at(direction, position)) is None:
+				continue
+			
+			((track_start, track_length, handle_offset, handle_length), along) = hit
+			offset = along - track_start
+			
+			# The arrows at either end
+			if offset < 0 or offset >= track_length:
+				delta = -1 if offset < 0 else +1
+				
+				if direction == Scrollable.VERTICAL:
+					self.scroll(delta_y=delta)
+				else:
+					self.scroll(delta_x=delta)
+				
+				return True
+			
+			# Grabbing the track outside the handle moves the middle of the
+			#   handle to the mouse.
+			if handle_offset <= offset < handle_offset + handle_length:
+				grab = offset - handle_offset
+			else:
+				grab = handle_length // 2
+				self.__drag_handle_to(direction, offset - grab)
+			
+			self.__drag = (direction, grab)
+			return True
+		
+		return False
+	
+	def __track_start(self, direction: int) -> int:
+		if direction == Scrollable.VERTICAL:
+			return self.__vertical_scrollbar_rectangle.y + 1
+		
+		return self.__horizontal_scrollbar_rectangle.x + 1
+	
+	# Scroll so that the handle of the scrollbar in `direction` starts
+	#   `handle_offset` cells along the track.
+	def __drag_handle_to(self, direction: int, handle_offset: int):
+		if direction == Scrollable.VERTICAL:
+			content_length  = self.__content_size.h
+			available_space = self._Widget__available_space.h
+			scroll_position = self.__scroll_position.y
+			free_length = self.__vertical_scrollbar_rectangle.h - 2 - self.__vertical_scrollbar_handle_length
+		else:
+			content_length  = self.__content_size.w
+			available_space = self._Widget__available_space.w
+			scroll_position = self.__scroll_position.x
+			free_length = self.__horizontal_scrollbar_rectangle.w - 2 - self.__horizontal_scrollbar_handle_length
+		
+		if free_length <= 0:
+			return
+		
+		percent = min(max(handle_offset / free_length, 0), 1)
+		max_scroll_position = max(0, content_length - available_space)
+		delta = round(percent * max_scroll_position) - scroll_position
+		
+		if direction == Scrollable.VERTICAL:
+			self.scroll(delta_y=delta)
+		else:
+			self.scroll(delta_x=delta)
@@ -1,3 +1,5 @@
+from typing import Callable
+
 from tri_declarative import with_meta
 
 import tanmatsu.input as ti
@@ -11,9 +13,65 @@ from .base import Widget
 from .container import Container
 
 
+class LazyTab:
+	"""
+	A tab of a :class:`TabBox` whose widget is only constructed when the tab is
+	first activated. Use in place of a widget in the children of a TabBox.
+	
+	:param factory: Constructs the widget of the tab.
+	:paramtype factory: Callable[[], Widget]
+	
+	:param retain: Whether to keep the widget once the tab is switched away
+	               from. If `False`, the widget is dropped when switching away,
+	               and constructed again the next time the tab is activated,
+	               so that rarely used tabs don't hold on to memory.
+	:paramtype retain: bool
+	"""
+	
+	def __init__(self, factory: Callable[[], Widget], retain: bool = True):
+		self.factory = factory
+		self.retain = retain
+		self.__widget = None
+	
+	@property
+	def widget(self) -> Widget:
+		"""
+		:getter: Get the widget of the tab, constructing it if necessary.
+		"""
+		if self.__widget is None:
+			self.__widget = self.factory()
+		
+		return self.__widget
+	
+	@property
+	def constructed(self) -> bool:
+		"""
+		:getter: Get whether the widget of the tab currently exists.
+		"""
+		return self.__widget is not None
+	
+	def release(self):
+		"""Drop the widget of the tab, unless the tab retains its widget."""
+		if not self.retain:
+			self.__widget = None
+
+
 @with_meta
 class TabBox(Container):
-	"""Widget that contains other widgets, arranged as tabs."""
+	"""
+	Widget that contains other widgets, arranged as tabs.
+	
+	Only the active tab is laid out and drawn. Tabs may be given as
+	:class:`LazyTab` objects instead of widgets, in which case the widget of
+	the tab isn't constructed until the tab is first activated.
+	
+	Switching back to a tab reuses its last layout and drawing, unless
+	something has changed since (see :meth:`Widget.invalidate_draw`).
+	
+	:param children: Dictionary containing the tabs. Keys are the tab labels,
+	                 and values are either `Widget` or `LazyTab` objects.
+	:paramtype children: dict[str, Widget | LazyTab]
+	"""
 	
 	def __init__(self, *args, **kwargs):
 		super().__init__(*args, **kwargs)
@@ -26,10 +84,92 @@ class TabBox(Container):
 		self.__border_rectangle = None
 		self.__tab_bar_rectangle = None
 		
+		# What each tab was last laid out and drawn with, so that switching
+		#   back to a tab can skip laying it out and drawing it again.
+		# 
+		# label -> (tab widget, x, y, w, h, draw revision)
+		self.__layout_keys = { }
+		# label -> (key, characters, styles, hit index entries)
+		self.__drawings = { }
+		
+		# Whether the active tab was switched to since the last draw. Only
+		#   then are its last layout and drawing reused, and only if its draw
+		#   revision hasn't changed since (see `Widget.invalidate_draw()`).
+		#   Otherwise the tab is laid out and drawn as usual, so that changes
+		#   that don't invalidate anything (e.g., to its `theme`) show up by the
+		#   next frame at the latest.
+		self.__switched = False
+		
 		# Set the first child as the focused tab by default
-		(label, widget) = list(self.children.items())[0]
-		self.__active_tab = widget
+		self.__active_label = None
+		
+		if self.children:
+			self.__activate(next(iter(self.children)))
+	
+	@property
+	def active_tab(self) -> Widget | None:
+		"""
+		:getter: Get the widget of the currently active tab, or `None` if there
+		         are no tabs.
+		"""
+		if self.__active_label is None:
+			return None
+		
+		return self.__tab_widget(self.__active_label)
+	
+	def __tab_widget(self, label: str) -> Widget:
+		tab = self.children[label]
+		
+		if isinstance(tab, LazyTab):
+			self._adopt(tab.widget)
+			return tab.widget
+		
+		return tab
+	
+	# The active tab is tracked by label rather than by widget, as the widget
+	#   of a `LazyTab` may not exist yet (or may have been released).
+	def __activate(self, label: str):
+		previous = self.children.get(self.__active_label)
+		
+		if isinstance(previous, LazyTab) and label != self.__active_label:
+			previous.release()
+			
+			if not previous.constructed:
+				self.__forget(self.__active_label)
+		
+		self.__switched = label != self.__active_label
+		self.__active_label = label
+		
+		if self.__switched:
+			self.invalidate_draw()
+		widget = self.__tab_widget(label)
 		self.focusable_children = { label: widget }
+		
+		if self.focused_child is not None:
+			self.focused_child = widget
+	
+	def __disown_tab(self, tab: Widget | LazyTab):
+		if isinstance(tab, LazyTab):
+			if tab.constructed:
+				self._disown(tab.widget)
+		else:
+			self._disown(tab)
+	
+	def __forget(self, label: str):
+		self.__layout_keys.pop(label, None)
+		self.__drawings.pop(label, None)
+	
+	# For when the last tab is deleted.
+	def __deactivate(self):
+		previous = self.children.get(self.__active_label)
+		
+		if isinstance(previous, LazyTab):
+			previous.release()
+		
+		self.__active_label = None
+		self.invalidate_draw()
+		self.focusable_children = { }
+		self.focused_child = None
 	
 	def add_child(self, name: str, widget: Widget):
 		"""
@@ -40,10 +180,22 @@ class TabBox(Container):
 		:param name: The name of the tab to add.
 		:paramtype name: str
 		
-		:param widget: The widget object to add.
-		:paramtype widget: Widget
+		:param widget: The widget object to add, or a `LazyTab` to construct
+		               the widget when the tab is first activated.
+		:paramtype widget: Widget | LazyTab
 		"""
+		if name in self.children:
+			self.__disown_tab(self.children[name])
+		
 		self.children[name] = widget
+		self._adopt(widget)
+		self._children_revision += 1
+		self.invalidate_focus_order()
+		self.invalidate_measure()
+		
+		# Replacing the widget of the active tab, or adding the only tab
+		if name == self.__active_label or self.__active_label is None:
+			self.__activate(name)
 	
 	def del_child_by_name(self, name: str):
 		"""
@@ -54,11 +206,22 @@ class TabBox(Container):
 		
 		:raises KeyError: if a tab named `name` does not exist.
 		"""
+		if name not in self.children:
+			raise KeyError(name)
+		
 		# Change the active tab if we're about to delete the currently active tab.
-		if self.children[name] == self.__active_tab:
-			self.right()
+		if name == self.__active_label:
+			if len(self.children) == 1:
+				self.__deactivate()
+			else:
+				self.right()
 		
+		self.__disown_tab(self.children[name])
 		del self.children[name]
+		self.__forget(name)
+		self._children_revision += 1
+		self.invalidate_focus_order()
+		self.invalidate_measure()
 	
 	def del_child_by_widget(self, widget: Widget):
 		"""
@@ -69,35 +232,32 @@ class TabBox(Container):
 		
 		:raises KeyError: if the object `widget` is not contained within any tabs.
 		"""
-		# Change the active tab if we're about to delete the currently active tab.
-		if widget == self.__active_tab:
-			self.right()
-		
 		for (child_name, child_widget) in self.children.items():
+			# Lazy tabs are only checked if their widget exists, as otherwise
+			#   it can't possibly be `widget`.
+			if isinstance(child_widget, LazyTab) and child_widget.constructed:
+				child_widget = child_widget.widget
+			
 			if child_widget == widget:
-				del self.children[child_name]
+				self.del_child_by_name(child_name)
 				return
 		
 		raise KeyError(str(widget))
 	
 	def left(self):
 		"""Switch the currently active tab to the left."""
-		self.__switch_tab(list(reversed(self.children.items())))
+		self.__switch_tab(list(reversed(self.children)))
 	
 	def right(self):
 		"""Switch the currently active tab to the right."""
-		self.__switch_tab(list(self.children.items()))
+		self.__switch_tab(list(self.children))
 	
-	def __switch_tab(self, tabs):
-		for i, (_, widget) in enumerate(tabs):
-			if widget is self.__active_tab:
-				(next_label, next_widget) = tabs[0 if i + 1 == len(tabs) else i + 1]
-				self.__active_tab = next_widget
-				self.focusable_children = { next_label: next_widget }
-				break
+	def __switch_tab(self, labels):
+		if not labels:
+			return
 		
-		if self.focused_child is not None:
-			self.focused_child = self.__active_tab
+		i = labels.index(self.__active_label)
+		self.__activate(labels[0 if i + 1 == len(labels) else i + 1])
 	
 	def layout(self, *args, **kwargs):
 		super().layout(*args, **kwargs)
@@ -106,7 +266,7 @@ class TabBox(Container):
 		tab_count = len(self.children)
 		available_space = self._Widget__available_space.w - 2
 		
-		if tab_count * self.tab_min_width < available_space:
+		if 0 < tab_count * self.tab_min_width < available_space:
 			self.__tab_width = available_space // tab_count
 		else:
 			self.__tab_width = self.tab_min_width
@@ -127,10 +287,17 @@ class TabBox(Container):
 		self._Widget__available_space.h -= 2
 		
 		# Layout the active tab:
-		self.__active_tab.layout(
-			self._Widget__available_space.top_left(),
-			self._Widget__available_space.dimensions()
-		)
+		if self.active_tab is None:
+			return
+		
+		space = self._Widget__available_space
+		key = (self.active_tab, space.x, space.y, space.w, space.h, self.active_tab._draw_revision)
+		
+		if self.__switched and self.__layout_keys.get(self.__active_label) == key:
+			return
+		
+		self.__layout_keys[self.__active_label] = key
+		self.active_tab.layout(space.top_left(), space.dimensions())
 	
 	def draw(self, s: Screenbuffer, clip: Rectangle | None = None):
 		super().draw(s, clip=clip)
@@ -142,11 +309,15 @@ class TabBox(Container):
 			style = None
 		
 		draw.rectangle(s, self.__border_rectangle, clip=clip, style=style)
-		self.__active_tab.draw(s, clip=clip & self._Widget__available_space)
+		
+		if self.active_tab is not None:
+			self.__draw_active_tab(s, clip & self._Widget__available_space)
+		
+		self.__switched = False
 		
 		# Draw the tab bar:
-		for (i, (label, tab)) in enumerate(self.children.items()):
-			if tab is self.__active_tab:
+		for (i, label) in enumerate(self.children):
+			if label == self.__active_label:
 				style = theme.DefaultTheme.active
 			else:
 				style = theme.DefaultTheme.inactive
@@ -160,6 +331,53 @@ class TabBox(Container):
 			
 			self.draw_tab(s, tab_rectangle, label, clip, style)
 	
+	# Draws the active tab, or, if it was just switched back to and would be
+	#   drawn the same as last time, copies its last drawing.
+	def __draw_active_tab(self, s: Screenbuffer, clip: Rectangle):
+		# The focus chain through the tab decides which of its widgets are
+		#   drawn focused.
+		focus = []
+		widget = self.active_tab
+		
+		while widget is not None:
+			focus.append((widget, widget.focused))
+			widget = widget.focused_child
+		
+		key = (
+			self.__layout_keys[self.__active_label],
+			s, s.w, s.h, s.hit_index,
+			clip.x, clip.y, clip.w, clip.h,
+			tuple(focus),
+		)
+		
+		# The part of the screenbuffer the tab can draw to.
+		(x1, x2) = (max(clip.x, 0), min(clip.x + clip.w, s.w))
+		rows = range(max(clip.y, 0), min(clip.y + clip.h, s.h))
+		
+		drawing = self.__drawings.get(self.__active_label)
+		
+		if self.__switched and drawing is not None and drawing[0] == key:
+			(_, characters, styles, entries) = drawing
+			
+			for (y, row_characters, row_styles) in zip(rows, characters, styles):
+				s.buffer[y][x1:x2] = row_characters
+				s.style_buffer[y][x1:x2] = row_styles
+			
+			for (rectangle, item) in entries:
+				s.hit_index.add(rectangle, item)
+			
+			return
+		
+		start = len(s.hit_index) if s.hit_index is not None else 0
+		self._draw_child(s, self.active_tab, clip)
+		
+		self.__drawings[self.__active_label] = (
+			key,
+			[ s.buffer[y][x1:x2] for y in rows ],
+			[ s.style_buffer[y][x1:x2] for y in rows ],
+			s.hit_index.entries(start) if s.hit_index is not None else [],
+		)
+	
 	def draw_tab(
 		self,
 		s: Screenbuffer,
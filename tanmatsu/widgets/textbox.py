@@ -7,7 +7,7 @@ from tanmatsu import theme
 from tanmatsu.geometry import Dimensions, Rectangle
 from tanmatsu.screenbuffer import Screenbuffer
 from tanmatsu.wctools import (wcchunks, wccolumn_to_offset, wcfind,
-                              wcoffset_to_column, wcslice)
+                              wcoffset_to_column, wcslice, wcswidth2)
 
 from .box import Box
 from .scrollable import Scrollable
@@ -128,6 +128,7 @@ class TextBox(Box, Scrollable):
 		
 		diff = value - self._cursor
 		self._cursor = value
+		self.invalidate_draw()
 		
 		# Scroll the widget until the cursor is in view:
 		if self._Widget__available_space is not None:
@@ -169,6 +170,7 @@ class TextBox(Box, Scrollable):
 	def text(self, value: str):
 		self._text = value
 		self.cursor = min(self.cursor, len(self.text))
+		self.invalidate_measure()
 	
 	def wrap(self, wrap_width):
 		# Optimisation: only re-wrap the text when it's actually necessary:
@@ -345,6 +347,15 @@ class TextBox(Box, Scrollable):
 		if self.cursor < len(self.text):
 			self.text = self.text[:self.cursor] + self.text[self.cursor + 1:]
 	
+	def _measure_content(self, available: Dimensions) -> Dimensions:
+		# As wide as the longest line (plus a column for the cursor to sit
+		#   after the end of the line, and one for the gutter), unless that's
+		#   wider than the space available, in which case the text is wrapped.
+		longest = max((wcswidth2(i) for i in self.text.split("\n")), default=0)
+		w = max(min(longest + 2, available.w), 2)
+		
+		return Dimensions(w, len(list(wrap(self.text, w - 1))))
+	
 	def layout(self, *args, **kwargs):
 		super().layout(*args, **kwargs)
 		
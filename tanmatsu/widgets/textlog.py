@@ -1,11 +1,231 @@
+import re
+from typing import Callable
+
 from tri_declarative import with_meta
 
-from tanmatsu.geometry import Rectangle
+from tanmatsu.colour import SYSTEM_COLOURS, XTERM_256
+from tanmatsu.geometry import Dimensions, Rectangle
 from tanmatsu.screenbuffer import Screenbuffer
-from tanmatsu.wctools import wcchunks
+from tanmatsu.style import Style
+from tanmatsu.wctools import wcchunks, wcswidth2
 
 from .box import Box
 
+# Matches the escape sequences (and stray control characters) that can turn up
+# in the output of other programs. Group 1 holds the parameters of a CSI
+# sequence, and group 2 holds its final byte.
+ESCAPE_SEQUENCE = re.compile(
+	r"\x1B\[([0-?]*)[ -/]*([@-~])"     # CSI sequences (including SGR)
+	r"|\x1B\][^\x07\x1B]*(?:\x07|\x1B\\)?"  # OSC sequences (e.g., window title)
+	r"|\x1B[@-Z\\-_]?"                 # Other two byte escape sequences
+	r"|[\x00-\x08\x0B-\x1A\x1C-\x1F\x7F]"  # Remaining C0 control characters
+)
+
+# SGR state: a (foreground, background, bold) tuple, where `None` means
+# "use the default".
+sgr_state_t = tuple[tuple[int, int, int] | None, tuple[int, int, int] | None, bool | None]
+
+DEFAULT_SGR_STATE: sgr_state_t = (None, None, None)
+
+
+def apply_sgr(state: sgr_state_t, parameters: str) -> sgr_state_t:
+	"""
+	Returns the SGR state that results from applying the SGR sequence with the
+	given `parameters` (e.g., "1;38;5;196") to `state`.
+	
+	Attributes that :class:`tanmatsu.Style` cannot represent (italics,
+	underline, and so on) are ignored.
+	"""
+	(foreground, background, bold) = state
+	
+	# Each parameter is a list of sub-parameters, which are separated by
+	#   colons (e.g., "38:2::255:0:0"). Empty sub-parameters default to 0.
+	#   Parameters that aren't numbers can't mean anything we understand, so
+	#   they are skipped.
+	codes = []
+	for parameter in parameters.split(";"):
+		subparameters = parameter.split(":")
+		
+		if all(i == "" or i.isdecimal() for i in subparameters):
+			codes.append([ int(i) if i else 0 for i in subparameters ])
+	
+	i = 0
+	while i < len(codes):
+		code = codes[i][0]
+		
+		match code:
+			case 0:
+				(foreground, background, bold) = DEFAULT_SGR_STATE
+			case 1:
+				bold = True
+			case 22:
+				bold = None
+			case c if 30 <= c <= 37:
+				foreground = SYSTEM_COLOURS[c - 30]
+			case c if 90 <= c <= 97:
+				foreground = SYSTEM_COLOURS[c - 90 + 8]
+			case 39:
+				foreground = None
+			case c if 40 <= c <= 47:
+				background = SYSTEM_COLOURS[c - 40]
+			case c if 100 <= c <= 107:
+				background = SYSTEM_COLOURS[c - 100 + 8]
+			case 49:
+				background = None
+			case 38 | 48:
+				if len(codes[i]) > 1:
+					colour = _extended_colour(codes[i][1:])
+				else:
+					# Extended colours as separate parameters: either
+					#   "38;5;n" (256 colour palette), or "38;2;r;g;b" (24 bit
+					#   colour).
+					mode = codes[i + 1][0] if i + 1 < len(codes) else None
+					length = { 5: 1, 2: 3 }.get(mode)
+					
+					# Malformed; nothing sensible left to interpret.
+					if length is None or i + 1 + length >= len(codes):
+						break
+					
+					colour = _extended_colour([mode] + [ j[0] for j in codes[i + 2:i + 2 + length] ])
+					i += 1 + length
+				
+				if colour is None:
+					pass
+				elif code == 38:
+					foreground = colour
+				else:
+					background = colour
+		
+		i += 1
+	
+	return (foreground, background, bold)
+
+
+# Returns the colour given by the sub-parameters after 38/48 (i.e., "5:n",
+#   "2:r:g:b", or "2:<colour space>:r:g:b"), or `None` if they're malformed.
+def _extended_colour(subparameters: list[int]) -> tuple[int, int, int] | None:
+	match subparameters:
+		case [5, n]:
+			return XTERM_256[min(n, 255)]
+		case [2, r, g, b] | [2, _, r, g, b, *_]:
+			return (min(r, 255), min(g, 255), min(b, 255))
+		case _:
+			return None
+
+
+def parse_sgr(
+	line: str,
+	state: sgr_state_t = DEFAULT_SGR_STATE
+) -> tuple[str, list[tuple[str, sgr_state_t]], sgr_state_t]:
+	"""
+	Splits `line` into runs of text sharing the same SGR state, starting from
+	SGR state `state`.
+	
+	All escape sequences are removed from the text, as writing them to the
+	screenbuffer would corrupt the screen. Only SGR sequences are interpreted.
+	
+	:return: A tuple containing the line with all escape sequences removed,
+	  a list of `(text, sgr_state)` spans, and the SGR state in effect at the
+	  end of the line (so that it can be carried over into the next line).
+	"""
+	spans = []
+	plain = []
+	last_end = 0
+	
+	for match in ESCAPE_SEQUENCE.finditer(line):
+		if match.start() > last_end:
+			text = line[last_end:match.start()]
+			spans.append((text, state))
+			plain.append(text)
+		
+		last_end = match.end()
+		
+		# Sequences with a private marker (e.g., xterm's "CSI > 4 ; 1 m") look
+		#   like SGR sequences, but aren't.
+		if match.group(2) == "m" and match.group(1)[:1] not in ("<", "=", ">", "?"):
+			state = apply_sgr(state, match.group(1))
+	
+	if last_end < len(line):
+		text = line[last_end:]
+		spans.append((text, state))
+		plain.append(text)
+	
+	return ("".join(plain), spans, state)
+
+
+# The lines of a TextLog. Remembers the first line changed since the TextLog
+#   last parsed them, so that changes made through the `lines` getter can be
+#   picked up without comparing every line. Appending doesn't count as
+#   a change, as lines past the parsed ones are parsed anyway. Either way,
+#   `on_change` is called, so that the TextLog can invalidate its measurement.
+class _Lines(list):
+	def __init__(self, lines: list[str], on_change: Callable[[], None]):
+		super().__init__(lines)
+		self.changed_from = None
+		self.__on_change = on_change
+	
+	def __changed(self, index: int):
+		if self.changed_from is None or index < self.changed_from:
+			self.changed_from = index
+		
+		self.__on_change()
+	
+	def __iadd__(self, lines):
+		result = super().__iadd__(lines)
+		self.__on_change()
+		return result
+	
+	def append(self, line):
+		super().append(line)
+		self.__on_change()
+	
+	def extend(self, lines):
+		super().extend(lines)
+		self.__on_change()
+	
+	def __first(self, index: int | slice) -> int:
+		if isinstance(index, slice):
+			indices = range(*index.indices(len(self)))
+			return min(indices[0], indices[-1]) if indices else indices.start
+		
+		return index + len(self) if index < 0 else index
+	
+	def __setitem__(self, index, value):
+		self.__changed(self.__first(index))
+		super().__setitem__(index, value)
+	
+	def __delitem__(self, index):
+		self.__changed(self.__first(index))
+		super().__delitem__(index)
+	
+	def __imul__(self, n):
+		self.__changed(len(self) if n >= 1 else 0)
+		return super().__imul__(n)
+	
+	def insert(self, index, value):
+		self.__changed(max(self.__first(index), 0))
+		super().insert(index, value)
+	
+	def pop(self, index=-1):
+		self.__changed(self.__first(index))
+		return super().pop(index)
+	
+	def remove(self, value):
+		self.__changed(self.index(value))
+		super().remove(value)
+	
+	def clear(self):
+		self.__changed(0)
+		super().clear()
+	
+	def sort(self, *args, **kwargs):
+		self.__changed(0)
+		super().sort(*args, **kwargs)
+	
+	def reverse(self):
+		self.__changed(0)
+		super().reverse()
+
 
 @with_meta
 class TextLog(Box):
@@ -13,6 +233,10 @@ class TextLog(Box):
 	A widget that displays multiple lines of text, with new lines being added
 	to the bottom and old ones scrolling upwards. Like a traditional terminal.
 	
+	Lines may contain ANSI SGR escape sequences (e.g., the colours in the output
+	of a subprocess), which are drawn as styled text. Any other escape sequences
+	are removed.
+	
 	:param lines: The lines the TextLog should contain.
 	:paramtype lines: list[str]
 	"""
@@ -20,27 +244,107 @@ class TextLog(Box):
 	def __init__(self, *args, lines: list[str] = [], **kwargs):
 		super().__init__(*args, **kwargs)
 		
-		self.__lines = lines
+		self.__lines = _Lines(lines, self.invalidate_measure)
+		
+		# Each line is parsed once, when it is added, into the line without any
+		#   escape sequences and a tuple of `(text, style_id)` spans.
+		# 
+		# Style ids index into `self.__styles`. Id 0 is reserved for text
+		#   without any SGR attributes, which is drawn without a style.
+		self.__parsed_lines = []
+		self.__styles = [None]
+		self.__style_ids = { DEFAULT_SGR_STATE: 0 }
+		
+		# The SGR state at the end of each parsed line, which the next line
+		#   starts with.
+		self.__sgr_states = []
+		
+		self.__parse_new_lines()
 	
 	def append_line(self, line):
 		"""Append a line to the TextLog."""
-		self.__lines.append(line)
+		self.__lines.append(line)  # Invalidates the measurement
+		self.__parse_new_lines()
 	
 	@property
 	def lines(self) -> list[str]:
 		"""
-		:getter: Gets the text lines contained within the TextLog.
-		:setter: Sets the text lines.
+		:getter: Gets the text lines contained within the TextLog. Changes to
+		         the list (e.g., deleting old lines) are picked up the next
+		         time the TextLog is drawn.
+		:setter: Sets the text lines. The TextLog keeps a copy of `lines`.
 		"""
 		return self.__lines
 	
 	@lines.setter
 	def lines(self, lines: list[str]):
-		self.__lines = lines
+		self.__lines = _Lines(lines, self.invalidate_measure)
+		
+		del self.__parsed_lines[:]
+		del self.__sgr_states[:]
+		self.__parse_new_lines()
+		self.invalidate_measure()
+	
+	def __style_id(self, state: sgr_state_t) -> int:
+		try:
+			return self.__style_ids[state]
+		except KeyError:
+			pass
+		
+		(foreground, background, bold) = state
+		attributes = { }
+		
+		if foreground is not None:
+			attributes["foreground"] = foreground
+		if background is not None:
+			attributes["background"] = background
+		if bold is not None:
+			attributes["bold"] = bold
+		
+		# Fill in the unset attributes from the theme, so that every cell we
+		#   draw has a fully specified style.
+		self.__styles.append(Style.inherit(self.theme.default, **attributes))
+		self.__style_ids[state] = len(self.__styles) - 1
+		
+		return self.__style_ids[state]
+	
+	# Parse any lines that haven't been parsed yet. Usually that's just the
+	#   line given to `append_line`, but the list returned by the `lines`
+	#   getter may have been changed directly too (e.g., old lines deleted to
+	#   limit the scrollback), in which case every line from the first one
+	#   that changed is parsed again.
+	def __parse_new_lines(self):
+		if self.__lines.changed_from is not None:
+			del self.__parsed_lines[self.__lines.changed_from:]
+			del self.__sgr_states[self.__lines.changed_from:]
+			self.__lines.changed_from = None
+		
+		sgr_state = self.__sgr_states[-1] if self.__sgr_states else DEFAULT_SGR_STATE
+		
+		for i in range(len(self.__parsed_lines), len(self.__lines)):
+			(plain, spans, sgr_state) = parse_sgr(self.__lines[i], sgr_state)
+			
+			spans = tuple((text, self.__style_id(state)) for (text, state) in spans)
+			self.__parsed_lines.append((plain, spans))
+			self.__sgr_states.append(sgr_state)
+	
+	def _measure_content(self, available: Dimensions) -> Dimensions:
+		self.__parse_new_lines()
+		
+		# As wide as the longest line, unless that's wider than the space
+		#   available, in which case lines are wrapped the same way as in
+		#   `draw()`.
+		longest = max((wcswidth2(plain) for (plain, _) in self.__parsed_lines), default=0)
+		w = max(min(longest, available.w), 1)
+		h = sum(len(list(wcchunks(plain, w))) for (plain, _) in self.__parsed_lines)
+		
+		return Dimensions(w, h)
 	
 	def draw(self, s: Screenbuffer, clip: Rectangle | None = None):
 		super().draw(s, clip=clip)
 		
+		self.__parse_new_lines()
+		
 		# Since we chunk each line in `self.lines` into (potentially) multiple
 		# lines so that it will fit on the screen, we can't just go by the
 		# number of lines in `self.lines` when determining whether we've drawn
@@ -52,22 +356,63 @@ class TextLog(Box):
 		# 
 		# We thus reverse the list of lines, and then reverse the list of chunks
 		# for each line.
-		for line in reversed(self.__lines):
-			line_chunks = list(wcchunks(line, self._Widget__available_space.w))
+		for (plain, spans) in reversed(self.__parsed_lines):
+			line_chunks = list(wcchunks(plain, self._Widget__available_space.w))
 			number_of_chunks = len(line_chunks)
 			
-			for i, chunk in enumerate(reversed(line_chunks)):
+			# Work out which character offset in `plain` each chunk starts at,
+			#   so that we can find the spans that overlap each chunk.
+			chunk_starts = []
+			offset = 0
+			for chunk in line_chunks:
+				chunk_starts.append(offset)
+				offset += len(chunk)
+			
+			for i in range(number_of_chunks):
 				# Is this line out of bounds?
 				if drawn_lines + i >= self._Widget__available_space.h:
 					return
 				
-				wc_offset = 0
-				for character in chunk:
-					wc_offset += s.set(
-						self._Widget__available_space.x + wc_offset,
-						self._Widget__available_space.y2 - i - drawn_lines,
-						character,
-						clip=clip,
-					)
+				chunk_index = number_of_chunks - 1 - i
+				
+				self.__draw_chunk(
+					s,
+					self._Widget__available_space.y2 - i - drawn_lines,
+					spans,
+					chunk_starts[chunk_index],
+					chunk_starts[chunk_index] + len(line_chunks[chunk_index]),
+					clip,
+				)
 			
 			drawn_lines += number_of_chunks
+	
+	# Draw the characters from offset `start` to offset `end` of a line,
+	#   one span at a time.
+	def __draw_chunk(
+		self,
+		s: Screenbuffer,
+		y: int,
+		spans: tuple[tuple[str, int], ...],
+		start: int,
+		end: int,
+		clip: Rectangle | None,
+	):
+		wc_offset = 0
+		span_start = 0
+		
+		for (text, style_id) in spans:
+			span_end = span_start + len(text)
+			
+			if span_end > start and span_start < end:
+				wc_offset += s.set_string(
+					self._Widget__available_space.x + wc_offset,
+					y,
+					text[max(start - span_start, 0):end - span_start],
+					clip=clip,
+					style=self.__styles[style_id],
+				)
+			
+			if span_end >= end:
+				return
+			
+			span_start = span_end
@@ -0,0 +1,34 @@
+import unittest
+
+from tanmatsu.colour import SYSTEM_COLOURS, XTERM_256, nearest_system, nearest_xterm_256
+from tanmatsu.output import ColourDepth, OutputProfile
+
+
+def distance(a, b):
+	return sum((i - j) ** 2 for (i, j) in zip(a, b))
+
+
+class TestNearest(unittest.TestCase):
+	def test_xterm_256_palette(self):
+		for n in range(16, 256):
+			self.assertEqual(nearest_xterm_256(XTERM_256[n]), n)
+	
+	def test_xterm_256_nearest(self):
+		for c in [ (69, 21, 41), (1, 2, 3), (128, 128, 130), (250, 10, 128) ]:
+			best = min(distance(XTERM_256[i], c) for i in range(16, 256))
+			self.assertEqual(distance(XTERM_256[nearest_xterm_256(c)], c), best)
+	
+	def test_system(self):
+		for n in range(16):
+			self.assertEqual(nearest_system(SYSTEM_COLOURS[n]), n)
+		
+		self.assertEqual(nearest_system((200, 10, 10)), 1)
+
+
+class TestDetect(unittest.TestCase):
+	def test_colour_depth(self):
+		profile = OutputProfile.detect({ "TERM": "xterm-256color", "COLORTERM": "truecolor" })
+		self.assertEqual(profile.colour_depth, ColourDepth.TRUECOLOUR)
+		
+		profile = OutputProfile.detect({ "TERM": "xterm-256color" })
+		self.assertEqual(profile.colour_depth, ColourDepth.XTERM_256)
@@ -0,0 +1,207 @@
+import unittest
+
+import tanmatsu.input as ti
+from tanmatsu import size
+from tanmatsu.geometry import Dimensions, Point, Rectangle
+from tanmatsu.screenbuffer import Screenbuffer
+from tanmatsu.widgets import (Button, FlexBox, FlexDirection, FlexWrap,
+                              JustifyContent, TextBox)
+
+
+class CountingTextBox(TextBox):
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.layouts = 0
+	
+	def layout(self, *args, **kwargs):
+		super().layout(*args, **kwargs)
+		self.layouts += 1
+
+
+class TestFlexBox(unittest.TestCase):
+	def layout(self, flexbox: FlexBox):
+		flexbox.layout(Point(0, 0), Dimensions(40, 20))
+		flexbox.draw(Screenbuffer(40, 20), clip=Rectangle(0, 0, 40, 20))
+	
+	def test_only_visible_children_are_laid_out(self):
+		children = { f"{i}": CountingTextBox(text=str(i), h=size.FixedInteger(3)) for i in range(0, 1000) }
+		flexbox = FlexBox(children=children)
+		self.layout(flexbox)
+		
+		for i in children.values():
+			i.layouts = 0
+		
+		flexbox.scroll(delta_y=300)
+		self.layout(flexbox)
+		
+		laid_out = [ k for (k, v) in children.items() if v.layouts > 0 ]
+		
+		# 18 rows inside the border, starting at row 300, fits items 100 to 105
+		self.assertEqual(laid_out, [ str(i) for i in range(100, 106) ])
+		self.assertEqual(children["100"].size.y, 1)
+	
+	def test_justify_flex_end(self):
+		children = {
+			f"{i}": TextBox(text="", w=size.FixedInteger(5), h=size.FixedInteger(3))
+			for i in range(0, 3)
+		}
+		
+		flexbox = FlexBox(
+			children=children,
+			flex_direction=FlexDirection.COLUMN,
+			justify_content=JustifyContent.FLEX_END,
+		)
+		self.layout(flexbox)
+		
+		# The last child ends on the last row inside the border
+		self.assertEqual(children["2"].size.y2, 18)
+		self.assertEqual(children["2"].size.x, 1)
+	
+	def test_wrap(self):
+		children = {
+			f"{i}": TextBox(text="", w=size.FixedInteger(10), h=size.FixedInteger(3))
+			for i in range(0, 7)
+		}
+		
+		flexbox = FlexBox(
+			children=children,
+			flex_direction=FlexDirection.ROW,
+			flex_wrap=FlexWrap.WRAP,
+			row_gap=1,
+			column_gap=2,
+		)
+		self.layout(flexbox)
+		
+		# 38 columns inside the border fit three items, with two gaps
+		self.assertEqual(
+			[ (i.size.x, i.size.y) for i in children.values() ],
+			[ (1, 1), (13, 1), (25, 1), (1, 5), (13, 5), (25, 5), (1, 9) ]
+		)
+		
+		# Narrower: two items per line
+		flexbox.layout(Point(0, 0), Dimensions(30, 20))
+		
+		self.assertEqual(
+			[ (i.size.x, i.size.y) for i in children.values() ],
+			[ (1, 1), (13, 1), (1, 5), (13, 5), (1, 9), (13, 9), (1, 13) ]
+		)
+	
+	def test_content_size(self):
+		button = Button(label="OK", callback=None, w=size.Content(), h=size.Content())
+		textbox = TextBox(text="")
+		
+		flexbox = FlexBox(
+			children={ "button": button, "textbox": textbox },
+			flex_direction=FlexDirection.ROW,
+		)
+		self.layout(flexbox)
+		
+		# The label, plus the border
+		self.assertEqual((button.size.w, button.size.h), (4, 3))
+		self.assertEqual(textbox.size.w, 34)
+		
+		# Changing the label invalidates the measurement
+		button.label = "Cancel"
+		self.layout(flexbox)
+		
+		self.assertEqual(button.size.w, 8)
+		self.assertEqual(textbox.size.w, 30)
+	
+	def test_content_size_nested(self):
+		button = Button(label="OK", callback=None, w=size.Content())
+		inner = FlexBox(children={ "button": button }, w=size.Content())
+		outer = FlexBox(children={ "inner": inner }, flex_direction=FlexDirection.ROW)
+		other = Button(label="Other", callback=None)
+		
+		self.layout(outer)
+		other.measure(Dimensions(40, 20))
+		other_revision = other._measure_revision
+		
+		# The change reaches the FlexBoxes around the button, and nothing else
+		button.label = "Cancel"
+		self.layout(outer)
+		
+		self.assertEqual(button.size.w, 8)
+		self.assertEqual(other._measure_revision, other_revision)
+	
+	def test_replace_size(self):
+		fixed = size.FixedInteger(10)
+		children = { f"{i}": TextBox(text=str(i)) for i in range(0, 2) }
+		flexbox = FlexBox(children=children, flex_direction=FlexDirection.ROW)
+		self.layout(flexbox)
+		
+		self.assertEqual(children["0"].size.w, 19)
+		
+		children["0"].w = fixed
+		self.layout(flexbox)
+		
+		self.assertEqual((children["0"].size.w, children["1"].size.w), (10, 28))
+	
+	def test_clamp(self):
+		children = {
+			"a": TextBox(text="", w=size.Clamp(10, size.Fraction(1, 4), None)),
+			"b": TextBox(text="", w=size.Clamp(0, size.Fraction(1, 2), 8), h=size.Clamp(0, size.Auto(), 5)),
+			"c": TextBox(text=""),
+		}
+		
+		flexbox = FlexBox(children=children, flex_direction=FlexDirection.ROW)
+		self.layout(flexbox)
+		
+		# The fractions take 3/4 of the 38 columns inside the border between
+		#   them. `b` can't take its half of that, so `a` takes the rest.
+		self.assertEqual(children["a"].size.w, 20)
+		self.assertEqual(children["b"].size.w, 8)
+		self.assertEqual(children["c"].size.w, 10)
+		self.assertEqual(children["b"].size.h, 5)
+		
+		# Only just enough space for `a`'s minimum, leaving nothing for `b`
+		flexbox.layout(Point(0, 0), Dimensions(16, 20))
+		self.assertEqual(children["a"].size.w, 10)
+		self.assertEqual(children["c"].size.w, 4)
+	
+	def test_hidden_children_are_not_drawn(self):
+		class CountingDrawTextBox(TextBox):
+			draws = 0
+			
+			def draw(self, *args, **kwargs):
+				super().draw(*args, **kwargs)
+				self.draws += 1
+		
+		children = { f"{i}": CountingDrawTextBox(text=str(i)) for i in range(0, 2) }
+		
+		flexbox = FlexBox(children=children, flex_direction=FlexDirection.COLUMN)
+		flexbox.layout(Point(0, 0), Dimensions(40, 20))
+		
+		# Only the top half of the flexbox is visible, which is all the
+		#   first child
+		flexbox.draw(Screenbuffer(40, 20), clip=Rectangle(0, 0, 40, 10))
+		self.assertEqual(children["0"].draws, 1)
+		self.assertEqual(children["1"].draws, 0)
+		
+		flexbox.draw(Screenbuffer(40, 20), clip=Rectangle(50, 50, 10, 10))
+		self.assertEqual(children["0"].draws, 1)
+	
+	def test_drag_scrollbar(self):
+		children = { f"{i}": TextBox(text=str(i), h=size.FixedInteger(3)) for i in range(0, 100) }
+		flexbox = FlexBox(children=children)
+		self.layout(flexbox)
+		
+		def mouse(state: ti.Mouse_state, y: int) -> bool:
+			return flexbox.mouse_event(ti.Mouse_button.LMB, ti.Mouse_modifier.NONE, state, Point(38, y))
+		
+		# The scrollbar is in column 38, with the track between the arrows
+		#   on rows 2 to 17, and a handle 1 row long at the top of it.
+		self.assertTrue(mouse(ti.Mouse_state.PRESSED, 2))
+		
+		# Drag the handle to the bottom, and then 7/15 of the way down
+		self.assertTrue(mouse(ti.Mouse_state.MOVED, 17))
+		self.assertTrue(mouse(ti.Mouse_state.MOVED, 9))
+		self.assertTrue(mouse(ti.Mouse_state.RELEASED, 9))
+		
+		# 7/15 of the 282 rows that can be scrolled is 132 rows, which
+		#   is 44 children
+		self.layout(flexbox)
+		self.assertEqual(children["44"].size.y, 1)
+		
+		# No longer dragging
+		self.assertFalse(mouse(ti.Mouse_state.MOVED, 17))
@@ -1,7 +1,9 @@
 import unittest
 
 import tanmatsu
+import tanmatsu.input as ti
 from tanmatsu import widgets
+from tanmatsu.geometry import Dimensions, Point, Rectangle
 
 
 class ChildWidget(widgets.TextBox):
@@ -45,3 +47,62 @@ class TestFocusSwitching(unittest.TestCase):
 		
 		for i in range(0, 8):
 			self.t.tab(reverse=True)
+	
+	def test_focus_order_is_cached_until_children_change(self):
+		parent = widgets.FlexBox(children={ f"child{i}": ChildWidget() for i in range(1, 6) })
+		root_widget = widgets.FlexBox(children={ "parent": parent })
+		self.t.set_root_widget(root_widget)
+		
+		order = self.t.get_focus_order()
+		
+		# The root, the parent, and 5 children
+		self.assertEqual(len(order), 7)
+		self.assertIs(self.t.get_focus_order(), order)
+		
+		child6 = ChildWidget()
+		parent.add_child("child6", child6)
+		
+		self.assertEqual(len(self.t.get_focus_order()), 8)
+		
+		for i in range(0, 7):
+			self.t.tab()
+		
+		self.assertEqual(self.t.get_current_focused_widget(), child6)
+	
+	def test_focus_chain_is_cached_until_focus_changes(self):
+		chain = self.t.get_current_focus_chain()
+		
+		self.assertEqual(chain, (self.root_widget,))
+		self.assertIs(self.t.get_current_focus_chain(), chain)
+		
+		self.t.tab()
+		self.t.tab()
+		
+		self.assertEqual(
+			self.t.get_current_focus_chain(),
+			(self.root_widget, self.root_widget.parent1, self.root_widget.parent1.child1)
+		)
+	
+	def test_click_to_focus(self):
+		children = { f"child{i}": widgets.TextBox(text=str(i)) for i in range(0, 5) }
+		root_widget = widgets.FlexBox(children={
+			"parent1": widgets.FlexBox(children={ "child": widgets.TextBox(text="") }),
+			"parent2": widgets.FlexBox(children=children),
+		})
+		self.t.set_root_widget(root_widget)
+		
+		# Lay out and draw the same way as `Tanmatsu.draw()`, without
+		#   writing to the terminal.
+		root_widget.layout(Point(0, 0), Dimensions(80, 40))
+		self.t.hit_index.clear()
+		self.t.hit_index.add(root_widget.size, root_widget)
+		root_widget.draw(self.t.screenbuffer, clip=Rectangle(0, 0, 80, 40))
+		
+		child = children["child3"]
+		position = Point(child.size.x + 1, child.size.y + 1)
+		
+		self.t.handle_mouse_event((
+			ti.Mouse_button.LMB, ti.Mouse_modifier.NONE, ti.Mouse_state.PRESSED, position
+		))
+		
+		self.assertEqual(self.t.get_current_focused_widget(), child)
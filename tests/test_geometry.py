@@ -0,0 +1,36 @@
+import unittest
+
+from tanmatsu.geometry import Rectangle
+
+
+class TestRectangle(unittest.TestCase):
+	def test_and(self):
+		a = Rectangle(0, 0, 10, 10)
+		
+		self.assertEqual(a & Rectangle(5, 5, 10, 10), Rectangle(5, 5, 5, 5))
+		self.assertIs(a & Rectangle(10, 0, 5, 5), Rectangle.EMPTY)
+		self.assertTrue((a & Rectangle(20, 20, 5, 5)).is_empty)
+		
+		# The empty rectangle is shared, so must stay empty
+		with self.assertRaises(AttributeError):
+			Rectangle.EMPTY.w = 5
+	
+	def test_intersect_into(self):
+		a = Rectangle(0, 0, 10, 10)
+		
+		self.assertIs(a.intersect_into(Rectangle(2, 3, 20, 4)), a)
+		self.assertEqual(a, Rectangle(2, 3, 8, 4))
+		
+		a.intersect_into(Rectangle(50, 50, 1, 1))
+		self.assertTrue(a.is_empty)
+		self.assertFalse(a.contains_xy(50, 50))
+		
+		self.assertIs(Rectangle.EMPTY.intersect_into(a), Rectangle.EMPTY)
+	
+	def test_contains_xy(self):
+		a = Rectangle(1, 1, 2, 2)
+		
+		self.assertTrue(a.contains_xy(1, 1))
+		self.assertTrue(a.contains_xy(2, 2))
+		self.assertFalse(a.contains_xy(3, 2))
+		self.assertFalse(a.contains_xy(0, 1))
@@ -0,0 +1,73 @@
+import unittest
+
+from tanmatsu import size
+from tanmatsu.geometry import Dimensions, Point, Rectangle
+from tanmatsu.screenbuffer import Screenbuffer
+from tanmatsu.widgets import Button, Grid, TextBox
+
+
+class TestGrid(unittest.TestCase):
+	def layout(self, grid: Grid):
+		grid.layout(Point(0, 0), Dimensions(42, 22))
+		grid.draw(Screenbuffer(42, 22), clip=Rectangle(0, 0, 42, 22))
+	
+	def test_tracks(self):
+		children = { f"{i}": TextBox(text=str(i)) for i in range(0, 6) }
+		
+		grid = Grid(
+			children=children,
+			columns=[ size.FixedInteger(10), size.Fraction(1, 2), size.Auto() ],
+			rows=[ size.Auto(), size.Auto() ],
+		)
+		self.layout(grid)
+		
+		# 40x20 inside the border
+		self.assertEqual(
+			[ (i.size.x, i.size.y, i.size.w, i.size.h) for i in children.values() ],
+			[
+				( 1,  1, 10, 10), (11,  1, 15, 10), (26,  1, 15, 10),
+				( 1, 11, 10, 10), (11, 11, 15, 10), (26, 11, 15, 10),
+			]
+		)
+	
+	def test_areas(self):
+		children = { f"{i}": TextBox(text=str(i)) for i in range(0, 4) }
+		
+		grid = Grid(
+			children=children,
+			columns=[ size.Auto(), size.Auto() ],
+			rows=[ size.Auto(), size.Auto(), size.Auto() ],
+			areas={ "2": (0, 0, 2, 1) },
+		)
+		self.layout(grid)
+		
+		self.assertEqual((children["2"].size.y, children["2"].size.h), (1, 12))
+		
+		# The other children fill the free cells in order
+		self.assertEqual((children["0"].size.x, children["0"].size.y), (21,  1))
+		self.assertEqual((children["1"].size.x, children["1"].size.y), (21,  7))
+		self.assertEqual((children["3"].size.x, children["3"].size.y), ( 1, 13))
+	
+	def test_content_tracks(self):
+		children = {
+			"a": Button(label="Cancel", callback=None),
+			"b": TextBox(text="b"),
+			"c": Button(label="OK", callback=None),
+			"d": TextBox(text="d"),
+		}
+		
+		grid = Grid(
+			children=children,
+			columns=[ size.Content(), size.Auto() ],
+			rows=[ size.Content(), size.Auto() ],
+		)
+		self.layout(grid)
+		
+		# The widest label, plus the border
+		self.assertEqual((children["a"].size.w, children["a"].size.h), (8, 3))
+		self.assertEqual((children["d"].size.w, children["d"].size.h), (32, 17))
+		
+		children["a"].label = "Continue"
+		self.layout(grid)
+		
+		self.assertEqual(children["c"].size.w, 10)
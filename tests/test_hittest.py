@@ -0,0 +1,27 @@
+import unittest
+
+from tanmatsu.geometry import Rectangle
+from tanmatsu.hittest import HitIndex
+
+
+class TestHitIndex(unittest.TestCase):
+	def test_items_at(self):
+		index = HitIndex()
+		index.add(Rectangle(0, 0, 80, 24), "root")
+		
+		for i in range(0, 100):
+			index.add(Rectangle((i % 10) * 8, (i // 10) * 2, 8, 2), i)
+		
+		# Not drawn, so never hit
+		index.add(Rectangle(4, 4, 0, 10), "empty")
+		
+		self.assertEqual(index.items_at(0, 0), ["root", 0])
+		self.assertEqual(index.items_at(17, 3), ["root", 12])
+		self.assertEqual(index.item_at(79, 19), 99)
+		self.assertEqual(index.items_at(40, 22), ["root"])
+		self.assertEqual(index.items_at(80, 0), [])
+		self.assertIsNone(index.item_at(-1, -1))
+		
+		# Later rectangles are on top
+		index.add(Rectangle(16, 2, 1, 1), "top")
+		self.assertEqual(index.item_at(16, 2), "top")
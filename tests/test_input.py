@@ -0,0 +1,36 @@
+import unittest
+
+import tanmatsu.input as ti
+
+
+class TestMouseInput(unittest.TestCase):
+	def test_motion(self):
+		events = ti.parse_input(b"\x1B[<0;5;3M\x1B[<32;6;3M\x1B[<35;7;4M\x1B[<0;6;3m")
+		
+		self.assertEqual(
+			[ (button, state) for (_, (button, _, state, _)) in events ],
+			[
+				(ti.Mouse_button.LMB,  ti.Mouse_state.PRESSED),
+				(ti.Mouse_button.LMB,  ti.Mouse_state.MOVED),
+				(ti.Mouse_button.NONE, ti.Mouse_state.MOVED),
+				(ti.Mouse_button.LMB,  ti.Mouse_state.RELEASED),
+			]
+		)
+		
+		# Positions count from 0
+		(_, (_, modifier, _, position)) = events[1]
+		self.assertEqual((position.x, position.y), (5, 2))
+		self.assertEqual(modifier, ti.Mouse_modifier.NONE)
+	
+	def test_coalesce_mouse_motion(self):
+		events = ti.coalesce_mouse_motion(ti.parse_input(
+			b"\x1B[<0;1;1M" +
+			b"".join(b"\x1B[<32;%d;1M" % i for i in range(2, 50)) +
+			b"a" +
+			b"\x1B[<32;60;1M\x1B[<32;61;1M\x1B[<0;61;1m"
+		))
+		
+		self.assertEqual(len(events), 5)
+		self.assertEqual(events[1][1][3].x, 48)
+		self.assertEqual(events[2], (ti.Event_type.KEYBOARD, ("a", ti.Keyboard_modifier.NONE)))
+		self.assertEqual(events[3][1][3].x, 60)
@@ -0,0 +1,60 @@
+import unittest
+
+from tanmatsu.geometry import Dimensions, Point, Rectangle
+from tanmatsu.screenbuffer import Screenbuffer
+from tanmatsu.widgets import List, TextBox
+
+
+class CountingTextBox(TextBox):
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.layouts = 0
+		self.draws = 0
+	
+	def layout(self, *args, **kwargs):
+		super().layout(*args, **kwargs)
+		self.layouts += 1
+	
+	def draw(self, *args, **kwargs):
+		super().draw(*args, **kwargs)
+		self.draws += 1
+
+
+class TestList(unittest.TestCase):
+	def setUp(self):
+		self.children = [ CountingTextBox(text=str(i)) for i in range(0, 1000) ]
+		self.list = List(children=self.children, item_height=2)
+		self.screenbuffer = Screenbuffer(20, 12)
+	
+	def draw(self):
+		for i in self.children:
+			i.layouts = 0
+			i.draws = 0
+		
+		self.screenbuffer.clear()
+		self.list.layout(Point(0, 0), Dimensions(20, 12))
+		self.list.draw(self.screenbuffer, clip=Rectangle(0, 0, 20, 12))
+	
+	def laid_out(self) -> list[int]:
+		return [ i for (i, child) in enumerate(self.children) if child.layouts > 0 ]
+	
+	def drawn(self) -> list[int]:
+		return [ i for (i, child) in enumerate(self.children) if child.draws > 0 ]
+	
+	def test_only_visible_children_are_laid_out_and_drawn(self):
+		self.draw()
+		
+		# Inside the border, a 12 row list has room for 5 items of height 2
+		self.assertEqual(self.laid_out(), [0, 1, 2, 3, 4])
+		self.assertEqual(self.drawn(), [0, 1, 2, 3, 4])
+		
+		self.list.cursor = 500
+		self.draw()
+		
+		# Scrolled just far enough to show the cursor item at the bottom
+		self.assertEqual(self.laid_out(), [496, 497, 498, 499, 500])
+		self.assertEqual(self.drawn(), [496, 497, 498, 499, 500])
+		self.assertEqual(self.children[500].size.y, 9)
+		
+		gutter = [ row[1] for row in self.screenbuffer.buffer[1:11] ]
+		self.assertEqual(gutter, [" "] * 8 + [">"] * 2)
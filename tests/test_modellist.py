@@ -0,0 +1,248 @@
+import unittest
+
+from tanmatsu.geometry import Dimensions, Point, Rectangle
+from tanmatsu.listmodel import ListModel, SortedListModel
+from tanmatsu.screenbuffer import Screenbuffer
+from tanmatsu.widgets import Button, ModelList
+
+
+class TestModelList(unittest.TestCase):
+	def setUp(self):
+		self.created = 0
+		
+		def factory():
+			self.created += 1
+			return Button(callback=None)
+		
+		def bind(widget, item):
+			widget.label = str(item)
+		
+		self.model = ListModel(range(0, 10000))
+		self.list = ModelList(model=self.model, factory=factory, bind=bind, item_height=3)
+		self.screenbuffer = Screenbuffer(40, 20)
+	
+	def draw(self):
+		self.list.layout(Point(0, 0), Dimensions(40, 20))
+		self.list.draw(self.screenbuffer, clip=Rectangle(0, 0, 40, 20))
+	
+	def test_widgets_are_recycled(self):
+		for i in range(0, 500):
+			self.list.down()
+			self.draw()
+		
+		self.assertEqual(self.list.active_child.label, "500")
+		self.assertLess(self.created, 10)
+	
+	def test_insert_keeps_cursor_on_item(self):
+		self.list.cursor = 5
+		self.model.insert(0, "new")
+		
+		self.assertEqual(self.list.cursor, 6)
+		self.assertEqual(self.list.active_child.label, "5")
+	
+	def test_remove_cursor_item(self):
+		self.list.cursor = 5
+		self.model.remove_range(4, 3)
+		
+		self.assertEqual(self.list.cursor, 4)
+		self.assertEqual(self.list.active_child.label, "7")
+	
+	def test_change(self):
+		self.draw()
+		self.model[0] = "changed"
+		self.draw()
+		
+		self.assertEqual(self.list.children[0].label, "changed")
+	
+	def test_paging(self):
+		self.draw()
+		self.list.page_down()
+		
+		# A 20 row viewport fits 6 items of height 3
+		self.assertEqual(self.list.cursor, 6)
+		
+		self.list.end()
+		self.draw()
+		
+		self.assertEqual(self.list.active_child.label, "9999")
+		self.assertLess(self.created, 10)
+		
+		self.list.home()
+		self.assertEqual(self.list.cursor, 0)
+	
+	def test_typeahead(self):
+		self.assertTrue(self.list.jump_to_prefix("512"))
+		self.assertEqual(self.list.cursor, 512)
+		
+		# "5120" sorts after "512"; the cursor already matches, so it stays
+		self.assertTrue(self.list.jump_to_prefix("51"))
+		self.assertEqual(self.list.cursor, 512)
+		
+		self.assertFalse(self.list.jump_to_prefix("x"))
+		
+		self.model.insert(0, "xylophone")
+		self.assertTrue(self.list.jump_to_prefix("X"))
+		self.assertEqual(self.list.cursor, 0)
+	
+	def test_empty(self):
+		self.model.clear()
+		self.draw()
+		
+		self.assertIsNone(self.list.active_child)
+		self.assertIsNone(self.list.focused_child)
+
+
+class Row:
+	def __init__(self, name, value):
+		self.name = name
+		self.value = value
+
+
+class Recorder:
+	def __init__(self):
+		self.notifications = []
+	
+	def items_inserted(self, index, count):
+		self.notifications.append(("inserted", index, count))
+	
+	def items_removed(self, index, count):
+		self.notifications.append(("removed", index, count))
+	
+	def items_changed(self, index, count):
+		self.notifications.append(("changed", index, count))
+	
+	def item_moved(self, old_index, new_index):
+		self.notifications.append(("moved", old_index, new_index))
+	
+	def model_reset(self):
+		self.notifications.append(("reset", ))
+
+
+class TestSortedListModel(unittest.TestCase):
+	def setUp(self):
+		self.rows = [ Row(name, value) for (name, value) in zip("abcdef", [5, 3, 9, 1, 7, 0]) ]
+		self.model = SortedListModel(
+			self.rows,
+			key=lambda row: row.value,
+			predicate=lambda row: row.value > 0
+		)
+		self.recorder = Recorder()
+		self.model.subscribe(self.recorder)
+	
+	def names(self):
+		return "".join(row.name for row in self.model)
+	
+	def test_sorted_and_filtered(self):
+		self.assertEqual(self.names(), "dbaec")
+	
+	def test_add(self):
+		self.model.add(Row("g", 4))
+		
+		self.assertEqual(self.names(), "dbgaec")
+		self.assertEqual(self.recorder.notifications, [("inserted", 2, 1)])
+	
+	def test_remove(self):
+		self.model.remove(self.rows[0])
+		
+		self.assertEqual(self.names(), "dbec")
+		self.assertEqual(self.recorder.notifications, [("removed", 2, 1)])
+	
+	def test_update_in_place(self):
+		self.rows[0].value = 6
+		self.model.update(self.rows[0])
+		
+		self.assertEqual(self.names(), "dbaec")
+		self.assertEqual(self.recorder.notifications, [("changed", 2, 1)])
+	
+	def test_update_moves(self):
+		self.rows[0].value = 10
+		self.model.update(self.rows[0])
+		
+		self.assertEqual(self.names(), "dbeca")
+		self.assertEqual(self.recorder.notifications, [("moved", 2, 4)])
+	
+	def test_update_filter(self):
+		self.rows[5].value = 2
+		self.model.update(self.rows[5])
+		self.rows[3].value = -1
+		self.model.update(self.rows[3])
+		
+		self.assertEqual(self.names(), "fbaec")
+		self.assertEqual(self.recorder.notifications, [("inserted", 1, 1), ("removed", 0, 1)])
+	
+	def test_batch(self):
+		with self.model.batch():
+			self.model.add(Row("g", 4))
+			self.assertEqual(self.recorder.notifications, [])
+		
+		self.assertEqual(self.recorder.notifications, [("inserted", 2, 1)])
+	
+	def test_model_list_follows_batch(self):
+		model_list = ModelList(
+			model=self.model,
+			factory=lambda: Button(callback=None),
+			bind=lambda widget, row: setattr(widget, "label", row.name),
+			item_height=1
+		)
+		model_list.cursor = 2
+		
+		with self.model.batch():
+			self.model.add(Row("g", 2))
+			self.model.add(Row("h", 2))
+		
+		model_list.layout(Point(0, 0), Dimensions(20, 10))
+		
+		self.assertEqual(model_list.active_child.label, "a")
+		self.assertEqual([ i.label for i in model_list.children ], list(self.names()))
+	
+	def test_model_list_follows_moved_item(self):
+		model_list = ModelList(
+			model=self.model,
+			factory=lambda: Button(callback=None),
+			bind=lambda widget, row: setattr(widget, "label", row.name),
+			item_height=1
+		)
+		model_list.cursor = 2
+		
+		self.rows[0].value = 10
+		self.model.update(self.rows[0])
+		model_list.layout(Point(0, 0), Dimensions(20, 10))
+		
+		self.assertEqual(model_list.cursor, 4)
+		self.assertEqual(model_list.active_child.label, "a")
+	
+	def test_model_list_filled_by_batch(self):
+		model = SortedListModel()
+		model_list = ModelList(
+			model=model,
+			factory=lambda: Button(callback=None),
+			bind=lambda widget, item: setattr(widget, "label", str(item)),
+			item_height=1
+		)
+		
+		model.extend([1, 2, 3, 4, 5])
+		model_list.layout(Point(0, 0), Dimensions(20, 10))
+		
+		self.assertEqual(model_list.cursor, 0)
+		self.assertEqual(model_list.active_child.label, "1")
+	
+	def test_model_list_follows_change_and_removal_in_batch(self):
+		rows = [ Row(str(i), i) for i in range(0, 20) ]
+		model = SortedListModel(rows, key=lambda row: row.value)
+		model_list = ModelList(
+			model=model,
+			factory=lambda: Button(callback=None),
+			bind=lambda widget, row: setattr(widget, "label", row.name),
+			item_height=1
+		)
+		model_list.cursor = 19
+		
+		with model.batch():
+			rows[19].name = "changed"
+			model.update(rows[19])
+			model.remove(rows[0])
+		
+		model_list.layout(Point(0, 0), Dimensions(20, 10))
+		
+		self.assertEqual(model_list.cursor, 18)
+		self.assertEqual(model_list.active_child.label, "changed")
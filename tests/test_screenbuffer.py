@@ -0,0 +1,224 @@
+import os
+import re
+import sys
+import unittest
+
+from wcwidth import wcswidth
+
+from tanmatsu.geometry import Dimensions, Point
+from tanmatsu.output import OutputProfile
+from tanmatsu.screenbuffer import Screenbuffer
+from tanmatsu.widgets import TextLog
+
+
+# Applies the output of `Screenbuffer.render()` to `screen` (a list of rows of
+#   characters), ignoring styles. Just enough of a terminal to check the
+#   contents of the screen.
+def apply(screen, output):
+	(x, y) = (0, 0)
+	(top, bottom) = (0, len(screen) - 1)
+	
+	for match in re.finditer(r"\x1B\[([0-9;]*)([A-Za-z])|(.)", output.decode(), re.DOTALL):
+		if match.group(3) == "\r":
+			x = 0
+			continue
+		
+		if match.group(3) is not None:
+			screen[y][x] = match.group(3)
+			x += wcswidth(match.group(3))
+			continue
+		
+		parameters = [ int(i) for i in match.group(1).split(";") if i ]
+		n = parameters[0] if parameters else 1
+		
+		match match.group(2):
+			case "H":
+				(y, x) = (n - 1, parameters[1] - 1 if len(parameters) > 1 else 0)
+			case "G":
+				x = n - 1
+			case "A":
+				y -= n
+			case "B":
+				y += n
+			case "C":
+				x += n
+			case "D":
+				x -= n
+			case "b":
+				screen[y][x:x + n] = [ screen[y][x - 1] ] * n
+				x += n
+			case "X":
+				screen[y][x:x + n] = [ " " ] * n
+			case "K":
+				screen[y][x:] = [ " " ] * (len(screen[0]) - x)
+			case "r":
+				(top, bottom) = (parameters[0] - 1, parameters[1] - 1) if parameters else (0, len(screen) - 1)
+				(x, y) = (0, 0)
+			case "S":
+				screen[top:bottom + 1] = screen[top + n:bottom + 1] + [ [ "?" ] * len(screen[0]) for i in range(n) ]
+			case "T":
+				screen[top:bottom + 1] = [ [ "?" ] * len(screen[0]) for i in range(n) ] + screen[top:bottom + 1 - n]
+
+
+class TestRender(unittest.TestCase):
+	def setUp(self):
+		self.s = Screenbuffer(10, 6)
+		self.screen = [ [ "?" ] * 10 for i in range(6) ]
+	
+	def render(self):
+		output = self.s.render()
+		apply(self.screen, output)
+		
+		self.assertEqual(self.screen, self.s.buffer)
+		return output
+	
+	def test_unchanged_frame_is_empty(self):
+		self.s.set_string(0, 0, "Hello")
+		self.render()
+		
+		self.assertEqual(self.render(), b"")
+	
+	def test_only_changed_columns(self):
+		self.s.set_string(0, 0, "Hello")
+		self.render()
+		
+		self.s.set_string(1, 0, "a")
+		output = self.render()
+		
+		self.assertIn(b"\x1B[1;2H", output)
+		self.assertNotIn(b"H", output.replace(b"\x1B[1;2H", b""))
+	
+	def test_cursor_movement(self):
+		self.s.set_string(0, 0, "12:00:00")
+		self.s.set_string(0, 1, "12:00:00")
+		self.render()
+		
+		# The unchanged ":" between the changes is cheaper to write again than
+		#   to move past.
+		self.s.set_string(0, 0, "12:01:01")
+		self.s.set_string(0, 1, "12:01:01")
+		output = self.render()
+		
+		self.assertTrue(output.startswith(b"\x1B[1;5H"))
+		self.assertIn(b"1:01\x1B[2;5H1:01", output)
+		
+		# Further apart, the cursor is moved instead.
+		self.s.set(0, 2, "a")
+		self.s.set(6, 2, "b")
+		self.assertIn(b"a\x1B[7Gb", self.render())
+		
+		# Moving straight down is cheaper than moving to an absolute position.
+		self.s.set(0, 3, "a")
+		self.s.set(1, 5, "b")
+		self.assertIn(b"a\x1B[2Bb", self.render())
+	
+	def test_repeat_and_erase(self):
+		self.s.profile = OutputProfile(repeat=True, erase=True)
+		
+		self.s.set_string(0, 0, "=" * 10)
+		self.s.set_string(0, 1, "a" + " " * 8 + "b")
+		self.s.set_string(0, 2, "a")
+		output = self.render()
+		
+		self.assertIn(b"=\x1B[9b", output)
+		self.assertIn(b"a \x1B[7bb", output)
+		self.assertIn(b"a\x1B[K", output)
+		
+		# Unchanged spaces at the end of the row are erased along with the
+		#   changed ones.
+		self.s.set(0, 2, " ")
+		output = self.render()
+		
+		self.assertTrue(output.startswith(b"\x1B[3H"))
+		self.assertTrue(output.endswith(b"m\x1B[K"))
+	
+	def test_write(self):
+		(r, w) = os.pipe()
+		stdout = sys.stdout
+		
+		try:
+			sys.stdout = os.fdopen(w, "w")
+			
+			self.s.profile = OutputProfile(synchronized_output=True)
+			self.s.set_string(0, 0, "Hello")
+			self.s.write()
+			
+			# Nothing to write
+			self.s.write()
+			
+			sys.stdout.close()
+		finally:
+			sys.stdout = stdout
+		
+		with os.fdopen(r, "rb") as f:
+			output = f.read()
+		
+		self.assertTrue(output.startswith(b"\x1B[?2026h\x1B[?25l\x1B[1H"))
+		self.assertTrue(output.endswith(b"\x1B[?25h\x1B[?2026l"))
+		self.assertEqual(output.count(b"\x1B[?2026h"), 1)
+	
+	def test_wide_characters(self):
+		self.s.set_string(0, 0, "aあb")
+		self.s.render()
+		
+		# Changing the column covered by the second half of a wide character
+		#   outputs the whole character.
+		self.s.set(2, 0, "x")
+		output = self.s.render().decode()
+		
+		self.assertTrue(output.startswith("\x1B[1;2H"))
+		self.assertTrue(output.endswith("あ"))
+		
+		# Replacing a wide character with a narrow one outputs the column the
+		#   second half of the wide character was covering.
+		self.s.set(1, 1, "z")
+		self.s.set(0, 1, "あ")
+		self.s.render()
+		
+		self.s.set(0, 1, "x")
+		output = self.s.render().decode()
+		
+		self.assertTrue(output.startswith("\x1B[2H"))
+		self.assertTrue(output.endswith("xz"))
+	
+	def test_scroll_up(self):
+		log = TextLog(lines=[ f"line {i}" for i in range(10) ])
+		
+		def draw():
+			self.s.clear()
+			log.layout(Point(0, 0), Dimensions(10, 6))
+			log.draw(self.s)
+		
+		draw()
+		self.render()
+		
+		log.append_line("line 10")
+		draw()
+		output = self.render()
+		
+		self.assertRegex(output, rb"\x1B\[2;5r\x1B\[1S")
+		self.assertIn(b"line 10", output)
+		self.assertNotIn(b"line 9", output)
+	
+	def test_scroll_down(self):
+		for i in range(6):
+			self.s.set_string(0, i, f"row {i}")
+		self.render()
+		
+		self.s.clear()
+		for i in range(6):
+			self.s.set_string(0, i, f"row {i - 2}")
+		output = self.render()
+		
+		self.assertIn(b"\x1B[1;6r\x1B[2T", output)
+		self.assertNotIn(b"row 3", output)
+	
+	def test_resize_outputs_everything(self):
+		self.s.set_string(0, 0, "Hello")
+		self.render()
+		
+		self.s.resize(10, 6)
+		self.screen = [ [ "?" ] * 10 for i in range(6) ]
+		self.s.set_string(0, 0, "Hello")
+		
+		self.assertEqual(self.render().count(b"H"), 6 + 1)
@@ -0,0 +1,43 @@
+import unittest
+
+from tanmatsu.output import ColourDepth
+from tanmatsu.style import Style
+
+
+class TestGetDiff(unittest.TestCase):
+	def setUp(self):
+		self.plain = Style(foreground=(1, 2, 3), background=(4, 5, 6), bold=False)
+		self.bold = Style(foreground=(9, 9, 9), background=(7, 8, 9), bold=True)
+	
+	def test_merged(self):
+		self.assertEqual(self.bold.get_diff(self.plain), b"\x1B[38;2;9;9;9;48;2;7;8;9;1m")
+		self.assertEqual(self.plain.get_diff(self.plain), b"")
+	
+	def test_reset_when_shorter(self):
+		self.assertEqual(self.plain.get_diff(self.bold), b"\x1B[0;38;2;1;2;3;48;2;4;5;6m")
+		self.assertEqual(self.plain.get_diff(None), b"\x1B[0;38;2;1;2;3;48;2;4;5;6m")
+	
+	def test_no_reset_with_unset_attributes(self):
+		partial = Style(background=(4, 5, 6), bold=False)
+		
+		self.assertEqual(partial.get_diff(self.bold), b"\x1B[48;2;4;5;6;22m")
+	
+	def test_cached_by_value(self):
+		first = self.bold.get_diff(self.plain)
+		
+		self.plain.background = (7, 8, 9)
+		self.assertEqual(self.bold.get_diff(self.plain), b"\x1B[38;2;9;9;9;1m")
+		
+		self.plain.background = (4, 5, 6)
+		self.assertIs(self.bold.get_diff(self.plain), first)
+	
+	def test_colour_depth(self):
+		# Both backgrounds are nearest to the same palette entry.
+		self.assertEqual(
+			self.bold.get_diff(self.plain, ColourDepth.XTERM_256),
+			b"\x1B[38;5;232;1m",
+		)
+		self.assertEqual(
+			self.bold.get_diff(self.plain, ColourDepth.SYSTEM),
+			b"\x1B[1m",
+		)
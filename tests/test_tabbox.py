@@ -0,0 +1,130 @@
+import unittest
+
+from tanmatsu.geometry import Dimensions, Point, Rectangle
+from tanmatsu.hittest import HitIndex
+from tanmatsu.screenbuffer import Screenbuffer
+from tanmatsu.widgets import LazyTab, List, TabBox, TextBox
+
+
+class CountingTextBox(TextBox):
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.layouts = 0
+		self.draws = 0
+	
+	def layout(self, *args, **kwargs):
+		super().layout(*args, **kwargs)
+		self.layouts += 1
+	
+	def draw(self, *args, **kwargs):
+		super().draw(*args, **kwargs)
+		self.draws += 1
+
+
+class TestTabBox(unittest.TestCase):
+	def setUp(self):
+		self.constructed = []
+		
+		def factory(name):
+			def f():
+				self.constructed.append(name)
+				return TextBox(text=name)
+			return f
+		
+		self.tabbox = TabBox(children={
+			"first":    TextBox(text="first"),
+			"retained": LazyTab(factory("retained")),
+			"dropped":  LazyTab(factory("dropped"), retain=False),
+		})
+	
+	def test_lazy_tabs_are_constructed_on_activation(self):
+		self.assertEqual(self.constructed, [])
+		
+		self.tabbox.right()
+		
+		self.assertEqual(self.constructed, ["retained"])
+		self.assertEqual(self.tabbox.active_tab.text, "retained")
+	
+	def test_retain(self):
+		for i in range(0, 6):
+			self.tabbox.right()
+		
+		# Two trips around the tabs; only the tab that isn't retained is rebuilt
+		self.assertEqual(self.constructed, ["retained", "dropped", "dropped"])
+		self.assertFalse(self.tabbox.children["dropped"].constructed)
+		self.assertTrue(self.tabbox.children["retained"].constructed)
+	
+	def test_delete_active_lazy_tab(self):
+		self.tabbox.right()
+		self.tabbox.del_child_by_widget(self.tabbox.active_tab)
+		
+		self.assertEqual(list(self.tabbox.children), ["first", "dropped"])
+		self.assertEqual(self.tabbox.active_tab.text, "dropped")
+	
+	def test_delete_every_tab(self):
+		for label in list(self.tabbox.children):
+			self.tabbox.del_child_by_name(label)
+		
+		self.assertIsNone(self.tabbox.active_tab)
+		self.assertEqual(self.tabbox.focusable_children, { })
+		
+		self.tabbox.layout(Point(0, 0), Dimensions(40, 10))
+		self.tabbox.draw(Screenbuffer(40, 10), clip=Rectangle(0, 0, 40, 10))
+		
+		self.tabbox.add_child("new", TextBox(text="new"))
+		self.assertEqual(self.tabbox.active_tab.text, "new")
+	
+	def test_switching_back_reuses_layout_and_drawing(self):
+		tab = CountingTextBox(text="counted")
+		tabbox = TabBox(children={ "counted": tab, "other": TextBox(text="other") })
+		screenbuffer = Screenbuffer(40, 10)
+		screenbuffer.hit_index = HitIndex()
+		
+		def frame():
+			screenbuffer.clear()
+			screenbuffer.hit_index.clear()
+			tabbox.layout(Point(0, 0), Dimensions(40, 10))
+			tabbox.draw(screenbuffer, clip=Rectangle(0, 0, 40, 10))
+			return ([ list(i) for i in screenbuffer.buffer ], screenbuffer.hit_index.items_at(5, 5))
+		
+		drawn = frame()
+		tabbox.right()
+		frame()
+		tabbox.left()
+		
+		self.assertEqual(frame(), drawn)
+		self.assertEqual((tab.layouts, tab.draws), (1, 1))
+		
+		# Once switched to, the tab is laid out and drawn as usual
+		frame()
+		self.assertEqual((tab.layouts, tab.draws), (2, 2))
+		
+		# A tab that changed while switched away is drawn again
+		tabbox.right()
+		frame()
+		tab.text = "changed"
+		tabbox.left()
+		frame()
+		
+		self.assertEqual((tab.layouts, tab.draws), (3, 3))
+	
+	def test_hidden_tab_changed(self):
+		items = [ TextBox(text=f"item{i}", border=False) for i in range(0, 20) ]
+		lst = List(children=items, item_height=1)
+		tabbox = TabBox(children={ "list": lst, "other": TextBox(text="other") })
+		screenbuffer = Screenbuffer(20, 12)
+		
+		def frame():
+			screenbuffer.clear()
+			tabbox.layout(Point(0, 0), Dimensions(20, 12))
+			tabbox.draw(screenbuffer, clip=Rectangle(0, 0, 20, 12))
+			return "".join(screenbuffer.buffer[4][3:8])
+		
+		self.assertEqual(frame(), "item0")
+		
+		tabbox.right()
+		frame()
+		lst.scroll(delta_y=4)
+		tabbox.left()
+		
+		self.assertEqual(frame(), "item4")
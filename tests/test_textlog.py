@@ -0,0 +1,94 @@
+import unittest
+
+from tanmatsu.colour import SYSTEM_COLOURS, XTERM_256
+from tanmatsu.geometry import Dimensions, Point, Rectangle
+from tanmatsu.screenbuffer import Screenbuffer
+from tanmatsu.widgets import TextLog
+from tanmatsu.widgets.textlog import DEFAULT_SGR_STATE, parse_sgr
+
+
+class TestParseSGR(unittest.TestCase):
+	def test_plain(self):
+		(plain, spans, state) = parse_sgr("Hello!")
+		
+		self.assertEqual(plain, "Hello!")
+		self.assertEqual(spans, [("Hello!", DEFAULT_SGR_STATE)])
+		self.assertEqual(state, DEFAULT_SGR_STATE)
+	
+	def test_colours(self):
+		(plain, spans, state) = parse_sgr("a\x1B[1;31mb\x1B[38;5;196mc\x1B[48;2;1;2;3md\x1B[0me")
+		
+		self.assertEqual(plain, "abcde")
+		self.assertEqual(spans, [
+			("a", DEFAULT_SGR_STATE),
+			("b", (SYSTEM_COLOURS[1], None, True)),
+			("c", (XTERM_256[196], None, True)),
+			("d", (XTERM_256[196], (1, 2, 3), True)),
+			("e", DEFAULT_SGR_STATE),
+		])
+		self.assertEqual(state, DEFAULT_SGR_STATE)
+	
+	def test_colon_subparameters(self):
+		(_, spans, _) = parse_sgr("\x1B[38:2::1:2:3;48:5:196ma\x1B[38:2:4:5:6mb")
+		
+		self.assertEqual(spans, [
+			("a", ((1, 2, 3), XTERM_256[196], None)),
+			("b", ((4, 5, 6), XTERM_256[196], None)),
+		])
+	
+	def test_private_marker_is_ignored(self):
+		(plain, spans, _) = parse_sgr("\x1B[31m\x1B[>4;1mX")
+		
+		self.assertEqual(plain, "X")
+		self.assertEqual(spans, [("X", (SYSTEM_COLOURS[1], None, None))])
+	
+	def test_non_numeric_parameters_are_skipped(self):
+		(_, spans, _) = parse_sgr("\x1B[1;4>;31mX")
+		
+		self.assertEqual(spans, [("X", (SYSTEM_COLOURS[1], None, True))])
+	
+	def test_other_escape_sequences_are_removed(self):
+		(plain, _, _) = parse_sgr("\x1B]2;title\x07a\x1B[2Kb\x1B[10;5Hc\rd")
+		
+		self.assertEqual(plain, "abcd")
+	
+	def test_state_carries_over(self):
+		(_, _, state) = parse_sgr("\x1B[32mgreen")
+		(_, spans, _) = parse_sgr("still green", state)
+		
+		self.assertEqual(spans, [("still green", (SYSTEM_COLOURS[2], None, None))])
+
+
+class TestTextLogDraw(unittest.TestCase):
+	def test_styled_spans(self):
+		text_log = TextLog(lines=["ab\x1B[44mcd\x1B[0mef"], border=False)
+		s = Screenbuffer(6, 1)
+		
+		text_log.layout(Point(0, 0), Dimensions(6, 1))
+		text_log.draw(s, clip=Rectangle(0, 0, 6, 1))
+		
+		self.assertEqual("".join(s.buffer[0]), "abcdef")
+		self.assertEqual(
+			[ i.background == SYSTEM_COLOURS[4] for i in s.style_buffer[0] ],
+			[False, False, True, True, False, False]
+		)
+	
+	def test_lines_changed_directly(self):
+		text_log = TextLog(lines=["\x1B[44ma", "b", "c"], border=False)
+		s = Screenbuffer(1, 3)
+		
+		def draw():
+			s.clear()
+			text_log.layout(Point(0, 0), Dimensions(1, 3))
+			text_log.draw(s, clip=Rectangle(0, 0, 1, 3))
+			return [ (s.buffer[i][0], s.style_buffer[i][0].background) for i in range(3) ]
+		
+		draw()
+		
+		# The colour set in the first line no longer carries over.
+		del text_log.lines[0]
+		text_log.lines[1] = "d"
+		text_log.lines.append("e")
+		
+		self.assertEqual([ c for (c, _) in draw() ], ["b", "d", "e"])
+		self.assertNotIn(SYSTEM_COLOURS[4], [ b for (_, b) in draw() ])